@@ -24,7 +24,7 @@ python3 -m venv octoplug
 source octoplug/bin/activate
 
 # Installieren Sie Flask und grpc-tools
-pip install flask grpcio-tools
+pip install flask grpcio-tools starlette uvicorn
 
 # Klonen Sie das OctoPyPlug-Repository und installieren Sie es
 git clone git@github.com:peter91v/OctoPyPlug.git
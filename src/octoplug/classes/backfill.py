@@ -0,0 +1,85 @@
+import argparse
+import os
+import sys
+import const as const
+from classes.loghandler import LogHandler
+from classes.sensorplug import SensorPlug
+from classes.base.copyloader import CopyLoader
+
+# Konfiguriere das Logging
+log_handler = LogHandler(os.path.basename(__file__)[:-3], show_in_console=True)
+logger = log_handler.get_logger()
+
+_COLUMNS = ("STANDORTID", "TEMPERATURE", "NA_DAT")
+_KEY_COLUMNS = ("STANDORTID", "NA_DAT")
+
+
+def iter_files(paths, recursive=False):
+    """
+    Liefert alle Dateien der angegebenen Pfade, Verzeichnisse werden sortiert durchlaufen.
+    """
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+        elif os.path.isdir(path):
+            if recursive:
+                for root, dirs, files in os.walk(path):
+                    dirs.sort()
+                    for file_name in sorted(files):
+                        yield os.path.join(root, file_name)
+            else:
+                for file_name in sorted(os.listdir(path)):
+                    file_path = os.path.join(path, file_name)
+                    if os.path.isfile(file_path):
+                        yield file_path
+        else:
+            logger.warning(f"Path not found: {path}")
+
+
+def iter_rows(paths, recursive=False):
+    """
+    Liefert die Messwerte aller Dateien als Tupel (STANDORTID, TEMPERATURE, NA_DAT).
+    """
+    for file_path in iter_files(paths, recursive):
+        logger.info(f"Loading file: {file_path}")
+        yield from SensorPlug.iter_rows(file_path)
+
+
+def main():
+    """
+    Lädt Archivverzeichnisse einmalig per COPY in die Tabelle sensor.
+    Messwerte mit gleicher STANDORTID und gleichem NA_DAT werden aktualisiert statt verdoppelt.
+    """
+    parser = argparse.ArgumentParser(
+        description="Backfills archived sensor files into the database via COPY."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=[const.archive_folder],
+        help="Files or directories to load.",
+    )
+    parser.add_argument(
+        "--recursive", action="store_true", help="Descend into subdirectories."
+    )
+    parser.add_argument(
+        "--batch-rows",
+        type=int,
+        default=const.BackfillBatchRows,
+        help="Rows per COPY transaction, 0 loads everything in one transaction.",
+    )
+    args = parser.parse_args()
+
+    loader = CopyLoader("sensor", _COLUMNS, _KEY_COLUMNS)
+    try:
+        inserted, updated = loader.load(
+            iter_rows(args.paths, args.recursive), batch_rows=args.batch_rows or None
+        )
+    except Exception as e:
+        logger.exception(f"Backfill failed: {e}")
+        sys.exit(1)
+    logger.info(f"Backfill finished: {inserted} rows inserted, {updated} rows updated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import psycopg
+from psycopg import sql
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+from classes.base.databasecontrollerbase import DatabaseControllerBase
+from classes.base.databasecontroller import DB_STATEMENT_SECONDS
+
+# PostgreSQL erlaubt höchstens 65535 Parameter pro Anweisung
+_MAX_PARAMS = 65535
+
+
+class AsyncPostgresController(DatabaseControllerBase):
+    """
+    Asynchrone PostgreSQL-Anbindung über psycopg 3 und einen AsyncConnectionPool.
+
+    Alle Abfragemethoden sind Koroutinen und müssen mit await aufgerufen werden.
+    Jede Abfrage leiht sich eine eigene Verbindung aus dem Pool, Bedingungen werden
+    immer explizit übergeben, da sich parallele Koroutinen sonst die gemeinsamen
+    where_clause/params überschreiben würden.
+    """
+
+    def initialize(self, config):
+        if not self.initialized:
+            pool_config = config.get("pool", {})
+            conninfo = psycopg.conninfo.make_conninfo(
+                host=config["host"],
+                user=config["user"],
+                password=config["password"],
+                dbname=config["database"],
+            )
+            self.pool = AsyncConnectionPool(
+                conninfo,
+                min_size=pool_config.get("minconn", 1),
+                max_size=pool_config.get("maxconn", 10),
+                timeout=pool_config.get("timeout", 30),
+                kwargs={"row_factory": dict_row},
+                open=False,
+            )
+            self.initialized = True
+
+    async def open(self):
+        await self.pool.open()
+        self.Log.info("Asynchrone Datenbankverbindung hergestellt")
+
+    async def close(self):
+        await self.pool.close()
+        self.initialized = False
+
+    async def execute_query(self, query, params=None, statement="QUERY"):
+        result = None
+        try:
+            # Der Pool committet beim Verlassen des Blocks bzw. rollt bei Fehlern zurück
+            async with self.pool.connection() as connection:
+                async with connection.cursor() as cursor:
+                    with DB_STATEMENT_SECONDS.time(statement=statement):
+                        await cursor.execute(query, params)
+                        if cursor.description is not None:
+                            result = await cursor.fetchall()
+        except psycopg.Error as e:
+            self.Log.error(f"Fehler beim Ausführen der Abfrage: {e}")
+            raise e
+        return result
+
+    async def fetch_data(self, table, columns="*", where_clause=None, params=None):
+        fields = (
+            sql.SQL("*")
+            if columns == "*"
+            else sql.SQL(", ").join(
+                sql.Identifier(c.strip().upper()) for c in columns.split(",")
+            )
+        )
+        query = sql.SQL("SELECT {fields} FROM {table}").format(
+            fields=fields, table=sql.Identifier(table.upper())
+        )
+        if where_clause:
+            query += sql.SQL(" WHERE ") + sql.SQL(where_clause)
+        return await self.execute_query(query, params, statement="SELECT")
+
+    async def insert_data(self, table, columns, values):
+        filtered_columns_values = [
+            (col, val) for col, val in zip(columns, values) if val is not None
+        ]
+        if not filtered_columns_values:
+            raise ValueError("Es wurden keine Werte zum Einfügen angegeben.")
+        filtered_columns, filtered_values = zip(*filtered_columns_values)
+        return await self.insert_many(table, filtered_columns, [filtered_values])
+
+    async def upsert_data(self, table, columns, values, conflict_columns):
+        filtered_columns_values = [
+            (col, val) for col, val in zip(columns, values) if val is not None
+        ]
+        if not filtered_columns_values:
+            raise ValueError("Es wurden keine Werte zum Einfügen angegeben.")
+        filtered_columns, filtered_values = zip(*filtered_columns_values)
+        null_columns = [col for col, val in zip(columns, values) if val is None]
+        return await self.insert_many(
+            table,
+            filtered_columns,
+            [filtered_values],
+            conflict_columns,
+            null_columns=null_columns,
+        )
+
+    async def insert_many(
+        self, table, columns, rows, conflict_columns=None, null_columns=()
+    ):
+        """
+        Fügt alle Zeilen in einer Transaktion per mehrzeiligem INSERT ein und gibt
+        ein Tupel (eingefügt, aktualisiert) zurück, siehe DatabaseController.insert_many.
+        """
+        if not rows:
+            return 0, 0
+        page_size = max(1, min(1000, _MAX_PARAMS // len(columns)))
+        inserted = updated = 0
+        try:
+            async with self.pool.connection() as connection:
+                async with connection.cursor() as cursor:
+                    for start in range(0, len(rows), page_size):
+                        page = rows[start : start + page_size]
+                        with DB_STATEMENT_SECONDS.time(statement="INSERT"):
+                            await cursor.execute(
+                                self.insert_query(
+                                    table,
+                                    columns,
+                                    len(page),
+                                    conflict_columns,
+                                    null_columns,
+                                ),
+                                [value for row in page for value in row],
+                            )
+                        for row in await cursor.fetchall():
+                            if row["inserted"]:
+                                inserted += 1
+                            else:
+                                updated += 1
+        except psycopg.Error as e:
+            self.Log.error(f"Fehler beim Einfügen mehrerer Zeilen: {e}")
+            raise e
+        self.Log.info(f"{inserted} Zeilen eingefügt, {updated} Zeilen aktualisiert")
+        return inserted, updated
+
+    def insert_query(
+        self, table, columns, row_count, conflict_columns=None, null_columns=()
+    ):
+        row = sql.SQL("({})").format(
+            sql.SQL(", ").join(sql.Placeholder() * len(columns))
+        )
+        query = sql.SQL("INSERT INTO {table} ({fields}) VALUES {rows}").format(
+            table=sql.Identifier(table.upper()),
+            fields=sql.SQL(", ").join(sql.Identifier(c.upper()) for c in columns),
+            rows=sql.SQL(", ").join([row] * row_count),
+        )
+        if conflict_columns:
+            updates = [
+                sql.SQL("{col} = EXCLUDED.{col}").format(col=sql.Identifier(c.upper()))
+                for c in columns
+                if c not in conflict_columns
+            ]
+            # Nicht eingefügte Spalten ohne Wert werden beim Aktualisieren geleert
+            updates.extend(
+                sql.SQL("{col} = NULL").format(col=sql.Identifier(c.upper()))
+                for c in null_columns
+                if c not in conflict_columns
+            )
+            keys = sql.SQL(", ").join(
+                sql.Identifier(c.upper()) for c in conflict_columns
+            )
+            if updates:
+                query += sql.SQL(
+                    " ON CONFLICT ({keys}) DO UPDATE SET {updates}"
+                ).format(keys=keys, updates=sql.SQL(", ").join(updates))
+            else:
+                query += sql.SQL(" ON CONFLICT ({keys}) DO NOTHING").format(keys=keys)
+        return query + sql.SQL(" RETURNING (xmax = 0) AS inserted")
@@ -1,33 +1,62 @@
-from datetime import datetime, date, time
+from datetime import datetime
 import json
 from os import path
 import psycopg2
-import inspect
 from classes.base.databasecontroller import (
     DatabaseController,
 )
+from classes.base.fieldtable import FieldTable
+from classes.base.schemacache import SchemaCache
 from abc import ABC
 
+# Spalten, die AutoPersistent.__init__ für jede abgeleitete Klasse anlegt
+_BASE_COLUMNS = ("NA_DAT", "AE_DAT")
+
 
 class AutoPersistent(ABC):
+    # Spaltenbeschreibung der Klasse, wird in __init_subclass__ einmalig erstellt
+    _FIELDS = FieldTable(())
+
     def __init__(self):
-        self.db = DatabaseController.get_instance()
         self._NA_DAT = None
         self._AE_DAT = None
 
+    def __init_subclass__(cls, **kwargs):
+        """
+        Ermittelt die Spalten aus den Properties der Klasse in Definitionsreihenfolge,
+        gefolgt von NA_DAT und AE_DAT, falls diese keine eigene Property haben. Das
+        entspricht der Reihenfolge, in der __init__ die Attribute _<Spalte> anlegt.
+        """
+        super().__init_subclass__(**kwargs)
+        names = []
+        for klass in reversed(cls.__mro__):
+            if klass is AutoPersistent or not issubclass(klass, AutoPersistent):
+                continue
+            for name, member in vars(klass).items():
+                if isinstance(member, property) and name not in names:
+                    names.append(name)
+        names.extend(c for c in _BASE_COLUMNS if c not in names)
+        annotations = getattr(cls.__init__, "__annotations__", {})
+        cls._FIELDS = FieldTable.build(names, "_", annotations)
+
+    @property
+    def db(self):
+        # Nicht pro Objekt ablegen, sonst trägt jede Zeile eine Referenz auf den Controller
+        return DatabaseController.get_instance()
+
     def create_table(self):
-        cursor = self.db.connection.cursor()
         table_name = self.__class__.__name__.lower()
-        columns = inspect.getmembers(self.__class__, lambda x: isinstance(x, property))
-        columns = [c[0] for c in columns]
+        columns = self._FIELDS.names
         columns_str = ", ".join([f"{c} TEXT" for c in columns])
         create_table_sql = f"CREATE TABLE IF NOT EXISTS {table_name} (id SERIAL PRIMARY KEY, {columns_str})"
         print(create_table_sql)
-        cursor.execute(create_table_sql)
-        self.db.connection.commit()
+        with self.db.get_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute(create_table_sql)
+            connection.commit()
 
-    def save(self):
-        if not self.db.connection:
+    def save(self, upsert=False):
+        if not self.db.initialized:
             print(f"Error: No database connection for class {self.__class__.__name__}")
             return None
 
@@ -37,6 +66,9 @@ class AutoPersistent(ABC):
             print(f"Error: Primary key not found for table {table_name}")
             return None
 
+        if upsert:
+            return self.upsert(table_name, primary_key)
+
         # Überprüfen, ob der Eintrag bereits in der Datenbank vorhanden ist
         where_clause = f'"{primary_key}" = %s'
         params = (getattr(self, primary_key),)
@@ -45,12 +77,14 @@ class AutoPersistent(ABC):
         if existing_entry:
             # Eintrag existiert bereits, daher ein UPDATE durchführen
             self.AE_DAT = datetime.now()
-            columns = self.getColumns()
+            columns = self._FIELDS.names
             set_clause = ", ".join(
                 [f'"{col}" = %s' for col in columns if col != primary_key]
             )
             update_params = [
-                getattr(self, col) for col in columns if col != primary_key
+                value
+                for col, value in zip(columns, self.to_row())
+                if col != primary_key
             ]
             update_params.append(getattr(self, primary_key))
             try:
@@ -62,27 +96,54 @@ class AutoPersistent(ABC):
             # Eintrag existiert nicht, daher ein INSERT durchführen
             # self.NA_DAT = datetime.now() muss wieder aktiviert werden wenn alle Historische Daten verarbeitet worden sind
             columns = self.getColumns()
-            values = [getattr(self, c) for c in columns]
+            values = list(self.to_row())
             try:
                 self.db.insert_data(table_name, columns, values)
             except psycopg2.Error as e:
                 print(f"Fehler bei der Insert: {e}")
                 return None
 
+    def upsert(self, table_name, primary_key):
+        """Speichert das Objekt mit einer einzigen INSERT ... ON CONFLICT-Anweisung.
+
+        Der Konflikt wird über den Primärschlüssel erkannt, falls dieser gesetzt ist,
+        sonst über den ersten eindeutigen Schlüssel, dessen Spalten alle gesetzt sind.
+        Ohne passenden Schlüssel wird ein einfaches INSERT ausgeführt. Wie bei save()
+        werden im Konfliktfall alle Spalten außer dem Primärschlüssel überschrieben.
+        """
+        self.AE_DAT = datetime.now()
+        columns = self.getColumns()
+        values = list(self.to_row())
+        if getattr(self, primary_key) is None and primary_key in columns:
+            # Ein fehlender Primärschlüssel darf die vorhandene Zeile nicht leeren
+            index = columns.index(primary_key)
+            del columns[index], values[index]
+        conflict_columns = self.get_conflict_columns(table_name, primary_key)
+        try:
+            if conflict_columns:
+                self.db.upsert_data(table_name, columns, values, conflict_columns)
+            else:
+                self.db.insert_data(table_name, columns, values)
+        except psycopg2.Error as e:
+            print(f"Fehler beim Upsert: {e}")
+            return None
+
+    def get_conflict_columns(self, table_name, primary_key):
+        if getattr(self, primary_key) is not None:
+            return [primary_key]
+        for unique_key in SchemaCache.get_unique_keys(table_name):
+            if all(getattr(self, c) is not None for c in unique_key):
+                return list(unique_key)
+        return None
+
     def key(self, var):
         return str(var)
 
     def get_primary_key(self, table):
-        query = f"SELECT kcu.column_name FROM information_schema.table_constraints tc JOIN information_schema.key_column_usage kcu ON tc.constraint_name = kcu.constraint_name WHERE tc.table_name = '{table.upper()}' AND tc.constraint_type = 'PRIMARY KEY';"
-        result = self.db.execute_query(query)
-        if result:
-            primary_key_column = result[0]["column_name"]
-            return primary_key_column
-        else:
-            return None
+        return SchemaCache.get_primary_key(table)
 
     def load(self, id):
-        if not self.db.connection:
+        if not self.db.initialized:
             print(f"Error: No database connection for class {self.__class__.__name__}")
             return None
 
@@ -130,34 +191,21 @@ class AutoPersistent(ABC):
             print(f"Error: {primary_key} attribute not set for the instance.")
 
     def getColumns(self):
-        columns = [
-            attr.lstrip("_")
-            for attr in vars(self).keys()
-            if not attr.startswith("__") and attr not in ["db", "connection"]
-        ]
-        return columns
+        return list(self._FIELDS.names)
+
+    def to_row(self):
+        """Liefert die Spaltenwerte als Tupel in der Reihenfolge von getColumns."""
+        return self._FIELDS.to_row(self)
 
     def populate_from_dict(self, data):
+        attributes = self._FIELDS.attributes
         for key, value in data.items():
-            attr_name = f"_{key}"
-            if hasattr(self, attr_name):
+            attr_name = attributes.get(key)
+            if attr_name is not None:
                 setattr(self, attr_name, value)
 
     def to_dict(self):
-        data_dict = {}
-        for attribute, value in vars(self).items():
-            clean_attribute = attribute.lstrip("_")
-            if isinstance(value, datetime):
-                data_dict[clean_attribute] = value.strftime("%Y-%m-%d %H:%M:%S")
-            elif isinstance(value, date):
-                data_dict[clean_attribute] = value.strftime("%Y-%m-%d")
-            elif isinstance(value, time):
-                data_dict[clean_attribute] = value.strftime("%H:%M:%S")
-            elif isinstance(value, DatabaseController):
-                continue
-            else:
-                data_dict[clean_attribute] = value
-        return data_dict
+        return self._FIELDS.to_dict(self)
 
     def save_to_json(self, directory, filename=None):
         data_dict = self.to_dict()
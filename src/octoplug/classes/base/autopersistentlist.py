@@ -1,48 +1,126 @@
 from datetime import datetime, timedelta
 import json
 from os import path
+import psycopg2
 from classes.base.autopersistent import AutoPersistent
+from classes.base.columnstore import ColumnStore
 from classes.base.databasecontroller import DatabaseController
+from classes.base.schemacache import SchemaCache
 from abc import ABC, abstractmethod
 from classes.base.jsontools import CustomJSONEncoder
 import classes.const as const
 
 
 class AutoPersistentLst:
-    def __init__(self):
+    def __init__(self, columnar=False):
+        """
+        Mit columnar=True werden die Einträge spaltenweise in einem ColumnStore gehalten
+        statt als Liste von Objekten. Beim Iterieren entstehen dann schlanke Datensätze
+        der Klasse aus get_record_class, die Massenpfade (populate_from_json,
+        populate_from_readings, load_all, iter_chunks, save_batch) erzeugen gar keine
+        Objekte.
+        """
         self.db = DatabaseController.get_instance()  # Verwendung der Singleton-Instanz
-        self.items = []
+        self.columnar = columnar
+        if columnar:
+            if self.get_record_class() is None:
+                raise ValueError(
+                    f"{self.__class__.__name__} has no record class for columnar storage"
+                )
+            self.items = ColumnStore(self.get_record_class())
+        else:
+            self.items = []
 
     @abstractmethod
     def get_persistent_class(self):
         """Muss von abgeleiteten Klassen implementiert werden, um den Typ der Objekte zu definieren."""
         pass
 
-    def load_all(self):
-        """Lädt alle Einträge aus der Datenbank basierend auf dem Typ der AutoPersistent-Objekte."""
+    def get_record_class(self):
+        """Die AutoPersistentRecord-Klasse für columnar=True, vom Generator erzeugt."""
+        return None
+
+    def load_all(
+        self, where_clause=None, params=None, order_by=None, limit=None, itersize=None
+    ):
+        """
+        Lädt alle Einträge aus der Datenbank basierend auf dem Typ der AutoPersistent-Objekte.
+
+        Gelesen wird blockweise über einen serverseitigen Cursor, WHERE, ORDER BY und
+        LIMIT werden an die Datenbank übergeben, siehe DatabaseController.stream_data.
+        Für Tabellen, die nicht in den Speicher passen, iter_all oder iter_chunks
+        verwenden.
+        """
         if self.get_persistent_class is None:
             print("Fehler: Kein Typ für das Laden von Objekten angegeben.")
             return
 
+        chunks = self.stream(where_clause, params, order_by, limit, itersize)
+        if self.columnar:
+            for column_names, rows in chunks:
+                self.items.extend_rows(rows, column_names)
+            return
+        for column_names, rows in chunks:
+            self.items.extend(self.build_objects(column_names, rows))
+
+    def iter_all(
+        self, where_clause=None, params=None, order_by=None, limit=None, itersize=None
+    ):
+        """
+        Liefert die Einträge der Tabelle nacheinander, ohne sie in items aufzunehmen.
+        Mit columnar=True sind es Datensätze der Klasse aus get_record_class, sonst
+        AutoPersistent-Objekte. Im Speicher liegt immer nur ein Block von itersize Zeilen.
+        """
+        for column_names, rows in self.stream(
+            where_clause, params, order_by, limit, itersize
+        ):
+            yield from self.build_objects(column_names, rows)
+
+    def iter_chunks(
+        self, where_clause=None, params=None, order_by=None, limit=None, itersize=None
+    ):
+        """
+        Liefert die Einträge der Tabelle blockweise als ColumnStore mit höchstens itersize
+        Zeilen, ohne Objekte zu erzeugen. Setzt eine Datensatzklasse voraus.
+        """
+        record_class = self.get_record_class()
+        if record_class is None:
+            raise ValueError(
+                f"{self.__class__.__name__} has no record class for columnar storage"
+            )
+        for column_names, rows in self.stream(
+            where_clause, params, order_by, limit, itersize
+        ):
+            chunk = ColumnStore(record_class)
+            chunk.extend_rows(rows, column_names)
+            yield chunk
+
+    def stream(self, where_clause, params, order_by, limit, itersize):
         table_name = self.get_persistent_class().__name__.upper()
-        loaded_data = self.db.fetch_data(table_name)
-        column_names = self.db.get_columns(table_name)
-        # [row[0] for row in column_names] if column_names else []
-        for data in loaded_data:
-            instance = (
-                self.get_persistent_class()()
-            )  # Erstellt eine neue Instanz des Objekts
-            if isinstance(data, tuple):
-                # Hier konvertieren wir das Tuple in ein Dictionary
-                # Angenommen, das Tuple hat eine definierte Struktur
-                data_dict = self.convert_tuple_to_dict(column_names, data)
-                instance.populate_from_dict(data_dict)
-            elif isinstance(data, dict):
-                instance.populate_from_dict(data)
-            self.items.append(instance)
+        return self.db.stream_data(
+            table_name,
+            where_clause=where_clause,
+            params=params,
+            order_by=order_by,
+            limit=limit,
+            itersize=itersize,
+        )
+
+    def build_objects(self, column_names, rows):
+        """Erstellt die Objekte eines Blocks, Datensätze bei columnar=True."""
+        if self.columnar:
+            from_row = self.get_record_class().from_row
+            return [from_row(row, column_names) for row in rows]
+        persistent_class = self.get_persistent_class()
+        objects = []
+        for row in rows:
+            instance = persistent_class()  # Erstellt eine neue Instanz des Objekts
+            instance.populate_from_dict(self.convert_tuple_to_dict(column_names, row))
+            objects.append(instance)
+        return objects
 
     def convert_tuple_to_dict(self, columns, data_tuple):
-        return {str(columns[i][0]): data_tuple[i] for i in range(len(columns))}
+        return {str(columns[i]): data_tuple[i] for i in range(len(columns))}
 
     def load(self, id):
         """Lädt ein spezifisches Element basierend auf der ID."""
@@ -60,13 +138,18 @@ class AutoPersistentLst:
             return None
 
     def add(self, item, shouldsave=False):
-        if type(item).__name__ != self.get_persistent_class().__name__:
+        if type(item).__name__ != self.get_persistent_class().__name__ and not (
+            self.columnar and isinstance(item, self.get_record_class())
+        ):
             raise ValueError(
                 f"Item must be an instance of {self.get_persistent_class().__name__}"
             )
         self.items.append(item)
         if shouldsave:
-            item.save()
+            if isinstance(item, AutoPersistent):
+                item.save()
+            else:
+                item.to_persistent().save()
 
     def remove(self, id):
         item = self.get_by_id(id)
@@ -106,25 +189,97 @@ class AutoPersistentLst:
             raise IndexError("Position out of range")
 
     def get_primary_key(self, table):
-        # Funktion, um den Primärschlüssel der Tabelle zu erhalten
-        query = f"SHOW KEYS FROM {table} WHERE Key_name = 'PRIMARY'"
-        result = self.fetch_data(query)
-        if result:
-            primary_key_column = result[0][
-                "Column_name"
-            ]  # Spaltenname des Primärschlüssels
-            return primary_key_column
-        else:
-            return None
+        return SchemaCache.get_primary_key(table)
 
     def count(self):
         """Gibt die Anzahl der Objekte in der Liste zurück."""
         return len(self.items)
 
-    def save_all(self):
-        """Speichert alle Objekte in der Liste in der Datenbank."""
-        for item in self.items:
-            item.save()
+    def save_all(self, batch=False, upsert=False):
+        """Speichert alle Objekte in der Liste in der Datenbank.
+
+        Alle Objekte werden in einer Transaktion gespeichert, schlägt ein Objekt fehl,
+        wird die ganze Liste zurückgerollt. Mit batch=True werden sie per mehrzeiligem
+        INSERT gespeichert, siehe save_batch. Mit upsert=True wird jedes Objekt mit
+        einer einzigen Anweisung gespeichert, siehe AutoPersistent.upsert.
+        """
+        if batch:
+            return self.save_batch()
+        # Alle Objekte gemeinsam committen statt nach jeder einzelnen Anweisung
+        try:
+            with self.db.transaction():
+                for item in self.items:
+                    if not isinstance(item, AutoPersistent):
+                        item = item.to_persistent()
+                    item.save(upsert=upsert)
+        except psycopg2.Error as e:
+            print(f"Fehler beim Speichern der Liste: {e}")
+            return None
+
+    def save_batch(self):
+        """Speichert alle Objekte in einer Transaktion und gibt (eingefügt, aktualisiert) zurück.
+
+        Objekte ohne Primärschlüsselwert werden per mehrzeiligem INSERT angelegt, Objekte
+        mit Primärschlüsselwert per INSERT ... ON CONFLICT DO UPDATE aktualisiert, dabei
+        wird AE_DAT auf den Zeitpunkt des Speicherns gesetzt.
+        """
+        if not self.items:
+            return 0, 0
+
+        table_name = self.get_persistent_class().__name__.lower()
+        primary_key = self.get_primary_key(table_name)
+        if self.columnar:
+            columns = list(self.items.names)
+            all_rows = self.items.rows(columns)
+        else:
+            columns = self.items[0].getColumns()
+            all_rows = (item.to_row() for item in self.items)
+        key_index = columns.index(primary_key) if primary_key in columns else None
+        # Wie save() bei einem UPDATE das Änderungsdatum vorhandener Zeilen setzen
+        changed_index = columns.index("AE_DAT") if "AE_DAT" in columns else None
+        changed = datetime.now()
+        new_rows = []
+        existing_rows = []
+        for row in all_rows:
+            if key_index is None or row[key_index] is None:
+                new_rows.append(row)
+            elif changed_index is None:
+                existing_rows.append(row)
+            else:
+                existing_rows.append(
+                    row[:changed_index] + (changed,) + row[changed_index + 1 :]
+                )
+
+        inserted = updated = 0
+        try:
+            # Ein Commit für beide Anweisungen, Fehler rollen die ganze Liste zurück
+            with self.db.transaction():
+                if new_rows:
+                    indexes = self.get_filled_columns(
+                        new_rows, [i for i in range(len(columns)) if i != key_index]
+                    )
+                    inserted, _ = self.db.insert_many(
+                        table_name,
+                        [columns[i] for i in indexes],
+                        [[row[i] for i in indexes] for row in new_rows],
+                    )
+                if existing_rows:
+                    added, updated = self.db.insert_many(
+                        table_name,
+                        columns,
+                        existing_rows,
+                        conflict_columns=[primary_key],
+                    )
+                    inserted += added
+        except psycopg2.Error as e:
+            print(f"Fehler beim Speichern der Liste: {e}")
+            return None
+        return inserted, updated
+
+    def get_filled_columns(self, rows, indexes):
+        """Gibt nur die Spaltenpositionen zurück, die in mindestens einer Zeile gesetzt sind,
+        damit für die übrigen die Standardwerte der Datenbank greifen."""
+        return [i for i in indexes if any(row[i] is not None for row in rows)]
 
     def save_all_to_json(self, directory, filename=None):
         data_list = {}
@@ -172,9 +327,26 @@ class AutoPersistentLst:
         #         raise NotImplementedError(
         #             "Die Klasse muss eine `populate_from_dict` Methode implementieren."
         #         )
+        if self.columnar:
+            self.items.extend_rows(
+                persistent_class.rows_from_detailed_json(json_string),
+                persistent_class.ROW_COLUMNS,
+            )
+            return
         sensors = persistent_class.from_detailed_json(json_string)
         self.items.extend(sensors)
 
+    def populate_from_readings(self, readings):
+        """Befüllt die Liste aus typisierten Protobuf-Messwerten, ohne JSON-Umweg."""
+        persistent_class = self.get_persistent_class()
+        if self.columnar:
+            self.items.extend_rows(
+                persistent_class.rows_from_readings(readings),
+                persistent_class.ROW_COLUMNS,
+            )
+            return
+        self.items.extend(persistent_class.from_readings(readings))
+
     # def process_and_save_historical_data(self, json_string: str):
     #     data = json.loads(json_string)
     #     print(json_string)
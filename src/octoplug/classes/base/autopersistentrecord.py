@@ -0,0 +1,70 @@
+from classes.base.fieldtable import FieldTable
+from classes.base.schemacache import SchemaCache
+
+
+class AutoPersistentRecord:
+    """
+    Schlanker Datensatz zu einer AutoPersistent-Klasse für Massenpfade.
+
+    Die abgeleiteten Klassen werden vom AutoPersistentGenerator neben der eigentlichen
+    Klasse erzeugt. Sie legen ihre Felder über __slots__ fest und verzichten auf
+    __dict__, Properties und die Datenbankverbindung. Gespeichert wird über eine
+    AutoPersistentLst oder über to_persistent.
+    """
+
+    __slots__ = ()
+    # Spalten in Tabellenreihenfolge, in den abgeleiteten Klassen gleich __slots__
+    COLUMNS = ()
+    _FIELDS = FieldTable(())
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        annotations = getattr(cls.__init__, "__annotations__", {})
+        cls._FIELDS = FieldTable.build(cls.COLUMNS, "", annotations)
+
+    def get_persistent_class(self):
+        """Muss von abgeleiteten Klassen implementiert werden."""
+        raise NotImplementedError
+
+    @classmethod
+    def from_row(cls, row, columns=None):
+        """Erstellt einen Datensatz aus einem Tupel, fehlende Spalten bleiben None."""
+        record = cls.__new__(cls)
+        values = dict(zip(columns or cls.COLUMNS, row))
+        for column in cls.COLUMNS:
+            setattr(record, column, values.get(column))
+        return record
+
+    def to_row(self, columns=None):
+        if columns is None:
+            return self._FIELDS.to_row(self)
+        return tuple(getattr(self, column) for column in columns)
+
+    def to_persistent(self):
+        """Liefert ein vollwertiges AutoPersistent-Objekt mit denselben Werten."""
+        instance = self.get_persistent_class()()
+        instance.populate_from_dict(self.to_dict(raw=True))
+        return instance
+
+    def getColumns(self):
+        return list(self.COLUMNS)
+
+    def get_primary_key(self, table):
+        return SchemaCache.get_primary_key(table)
+
+    def populate_from_dict(self, data):
+        for key, value in data.items():
+            if key in self.COLUMNS:
+                setattr(self, key, value)
+
+    def to_dict(self, raw=False):
+        return self._FIELDS.to_dict(self, raw)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_row() == other.to_row()
+
+    def __repr__(self):
+        fields = ", ".join(f"{c}={getattr(self, c)!r}" for c in self.COLUMNS)
+        return f"{self.__class__.__name__}({fields})"
@@ -0,0 +1,136 @@
+from array import array
+
+# array-Typcodes für Spalten, deren Typ laut __init__-Annotation numerisch ist
+_TYPECODES = {int: "q", float: "d"}
+
+
+class ColumnStore:
+    """
+    Spaltenweiser Speicher für eine AutoPersistentLst.
+
+    Statt eines Objekts pro Zeile wird je Spalte der Datensatzklasse eine Spalte geführt.
+    Numerische Spalten (int, float) sind wie bei SensorColumns array.array-Objekte ohne
+    ein Python-Objekt pro Wert. Sobald eine solche Spalte None oder einen nicht
+    darstellbaren Wert aufnimmt, wird sie in eine Liste umgewandelt, ebenso wie alle
+    übrigen Spalten (Zeitstempel, Texte).
+
+    Nach außen verhält sich der Speicher wie die bisherige Liste items: Beim Zugriff per
+    Index oder beim Iterieren wird der jeweilige Datensatz erst dann erzeugt. Massenpfade
+    verwenden extend_rows und rows und kommen ganz ohne Objekte aus.
+    """
+
+    def __init__(self, record_class):
+        self.record_class = record_class
+        self.names = list(record_class.COLUMNS)
+        self.typecodes = {
+            field.name: _TYPECODES.get(field.type)
+            for field in record_class._FIELDS.fields
+        }
+        self.columns = {name: self.new_column(name) for name in self.names}
+
+    def new_column(self, name):
+        typecode = self.typecodes.get(name)
+        return array(typecode) if typecode else []
+
+    def to_list(self, name):
+        """Wandelt eine array-Spalte in eine Liste um, z.B. für None-Werte."""
+        column = self.columns[name] = list(self.columns[name])
+        return column
+
+    def append_value(self, name, value):
+        try:
+            self.columns[name].append(value)
+        except (TypeError, OverflowError):
+            self.to_list(name).append(value)
+
+    def extend_values(self, name, values):
+        column = self.columns[name]
+        if isinstance(column, array):
+            length = len(column)
+            try:
+                column.extend(values)
+                return
+            except (TypeError, OverflowError):
+                # array.extend behält die Werte vor dem ersten unpassenden
+                del column[length:]
+                column = self.to_list(name)
+        column.extend(values)
+
+    def __len__(self):
+        return len(self.columns[self.names[0]]) if self.names else 0
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.record_class.from_row(
+            tuple(self.columns[name][index] for name in self.names)
+        )
+
+    def __iter__(self):
+        from_row = self.record_class.from_row
+        for row in self.rows():
+            yield from_row(row)
+
+    def column(self, name):
+        """Liefert die Werte einer Spalte (array oder Liste), ohne sie zu kopieren."""
+        return self.columns[name]
+
+    def rows(self, columns=None):
+        """Liefert die Zeilen als Tupel in der Reihenfolge von columns."""
+        return zip(*(self.columns[name] for name in columns or self.names))
+
+    def values_of(self, item):
+        """Liest die Spaltenwerte aus einem Datensatz oder einem AutoPersistent-Objekt."""
+        return [getattr(item, name, None) for name in self.names]
+
+    def append(self, item):
+        for name, value in zip(self.names, self.values_of(item)):
+            self.append_value(name, value)
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def extend_rows(self, rows, columns):
+        """
+        Übernimmt Tupel in der Reihenfolge von columns. Spalten der Datensatzklasse, die in
+        columns fehlen, werden mit None aufgefüllt, unbekannte Spalten ignoriert.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        transposed = dict(zip(columns, zip(*rows)))
+        for name in self.names:
+            values = transposed.get(name)
+            self.extend_values(
+                name, values if values is not None else [None] * len(rows)
+            )
+
+    def insert(self, index, item):
+        for name, value in zip(self.names, self.values_of(item)):
+            try:
+                self.columns[name].insert(index, value)
+            except (TypeError, OverflowError):
+                self.to_list(name).insert(index, value)
+
+    def pop(self, index=-1):
+        item = self[index]
+        for name in self.names:
+            self.columns[name].pop(index)
+        return item
+
+    def index(self, item):
+        values = tuple(self.values_of(item))
+        for i, row in enumerate(self.rows()):
+            if row == values:
+                return i
+        raise ValueError(f"{item!r} is not in ColumnStore")
+
+    def remove(self, item):
+        self.pop(self.index(item))
+
+    def clear(self):
+        self.columns = {name: self.new_column(name) for name in self.names}
@@ -0,0 +1,194 @@
+import itertools
+import os
+import psycopg2
+from datetime import datetime, date, time
+from psycopg2 import sql
+from classes.base.databasecontroller import DatabaseController
+from classes.base.loghandler import LogHandler
+
+# Zusätzliche Spalte der Staging-Tabelle mit der Reihenfolge der kopierten Zeilen
+LOAD_ORDER = "_LOAD_ORDER"
+
+
+class RowStream:
+    """
+    Dateiähnliches Objekt, das Zeilen eines Iterators erst beim Lesen im
+    Textformat von COPY kodiert, damit keine Zwischenlisten entstehen.
+    """
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.buffer = ""
+        self.count = 0
+
+    def read(self, size=-1):
+        parts = [self.buffer]
+        length = len(self.buffer)
+        while size < 0 or length < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            line = "\t".join(self.format_value(value) for value in row) + "\n"
+            parts.append(line)
+            length += len(line)
+            self.count += 1
+        data = "".join(parts)
+        if size < 0:
+            self.buffer = ""
+            return data
+        self.buffer = data[size:]
+        return data[:size]
+
+    @staticmethod
+    def format_value(value):
+        if value is None:
+            return "\\N"
+        if isinstance(value, datetime):
+            return value.isoformat(sep=" ")
+        if isinstance(value, (date, time)):
+            return value.isoformat()
+        return (
+            str(value)
+            .replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+        )
+
+
+class CopyLoader:
+    """
+    Lädt große Datenmengen per COPY FROM STDIN in eine temporäre Staging-Tabelle und
+    übernimmt sie anschließend in die Zieltabelle. Zeilen, deren Schlüssel bereits
+    vorhanden sind, werden aktualisiert statt doppelt eingefügt.
+    """
+
+    Log = LogHandler(os.path.basename(__file__)[:-3], show_in_console=True).get_logger()
+
+    def __init__(self, table, columns, key_columns):
+        self.db = DatabaseController.get_instance()
+        self.table = table.upper()
+        self.stage = f"{self.table}_STAGE"
+        self.columns = [c.upper() for c in columns]
+        self.key_columns = [c.upper() for c in key_columns]
+
+    def load(self, rows, batch_rows=None):
+        """
+        Lädt alle Zeilen des Iterators, bei batch_rows in mehreren Transaktionen.
+
+        Returns:
+            tuple: (eingefügte Zeilen, aktualisierte Zeilen)
+        """
+        rows = iter(rows)
+        inserted = updated = 0
+        while True:
+            chunk = itertools.islice(rows, batch_rows) if batch_rows else rows
+            copied, added, changed = self.load_chunk(chunk)
+            inserted += added
+            updated += changed
+            if not batch_rows or copied < batch_rows:
+                break
+        return inserted, updated
+
+    def load_chunk(self, rows):
+        """
+        Kopiert die Zeilen in die Staging-Tabelle und führt sie in einer Transaktion zusammen.
+
+        Returns:
+            tuple: (kopierte Zeilen, eingefügte Zeilen, aktualisierte Zeilen)
+        """
+        stream = RowStream(rows)
+        with self.db.get_connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(self.create_stage_query())
+                    cursor.copy_expert(self.copy_query().as_string(connection), stream)
+                    if stream.count == 0:
+                        connection.rollback()
+                        return 0, 0, 0
+                    cursor.execute(self.update_query())
+                    updated = cursor.rowcount
+                    cursor.execute(self.insert_query())
+                    inserted = cursor.rowcount
+                connection.commit()
+            except psycopg2.Error as e:
+                self.Log.error(f"Fehler beim Laden per COPY: {e}")
+                connection.rollback()
+                raise e
+        self.Log.info(
+            f"{stream.count} Zeilen kopiert, {inserted} eingefügt, {updated} aktualisiert"
+        )
+        return stream.count, inserted, updated
+
+    def fields(self, columns, prefix=None):
+        if prefix:
+            return sql.SQL(", ").join(
+                sql.SQL("{}.{}").format(sql.Identifier(prefix), sql.Identifier(c))
+                for c in columns
+            )
+        return sql.SQL(", ").join(sql.Identifier(c) for c in columns)
+
+    def create_stage_query(self):
+        # Die laufende Nummer hält die Reihenfolge der Zeilen in der Ladung fest
+        return sql.SQL(
+            "CREATE TEMP TABLE {stage} ON COMMIT DROP AS "
+            "SELECT {fields} FROM {table} WITH NO DATA; "
+            "ALTER TABLE {stage} ADD COLUMN {load_order} bigserial"
+        ).format(
+            stage=sql.Identifier(self.stage),
+            fields=self.fields(self.columns),
+            table=sql.Identifier(self.table),
+            load_order=sql.Identifier(LOAD_ORDER),
+        )
+
+    def copy_query(self):
+        return sql.SQL("COPY {stage} ({fields}) FROM STDIN").format(
+            stage=sql.Identifier(self.stage), fields=self.fields(self.columns)
+        )
+
+    def distinct_stage(self):
+        # Doppelte Schlüssel innerhalb einer Ladung auf eine Zeile reduzieren, dabei
+        # gewinnt wie beim zeilenweisen Upsert die letzte Zeile der Ladung
+        return sql.SQL(
+            "SELECT DISTINCT ON ({keys}) {fields} FROM {stage} "
+            "ORDER BY {keys}, {load_order} DESC"
+        ).format(
+            keys=self.fields(self.key_columns),
+            fields=self.fields(self.columns),
+            stage=sql.Identifier(self.stage),
+            load_order=sql.Identifier(LOAD_ORDER),
+        )
+
+    def key_match(self, left, right):
+        return sql.SQL(" AND ").join(
+            sql.SQL("{l}.{c} = {r}.{c}").format(
+                l=sql.Identifier(left), r=sql.Identifier(right), c=sql.Identifier(c)
+            )
+            for c in self.key_columns
+        )
+
+    def update_query(self):
+        update_columns = [c for c in self.columns if c not in self.key_columns]
+        return sql.SQL(
+            "UPDATE {table} AS t SET {updates} FROM ({stage}) AS s WHERE {match}"
+        ).format(
+            table=sql.Identifier(self.table),
+            updates=sql.SQL(", ").join(
+                sql.SQL("{c} = s.{c}").format(c=sql.Identifier(c))
+                for c in update_columns
+            ),
+            stage=self.distinct_stage(),
+            match=self.key_match("t", "s"),
+        )
+
+    def insert_query(self):
+        return sql.SQL(
+            "INSERT INTO {table} ({fields}) SELECT {s_fields} FROM ({stage}) AS s "
+            "WHERE NOT EXISTS (SELECT 1 FROM {table} AS t WHERE {match})"
+        ).format(
+            table=sql.Identifier(self.table),
+            fields=self.fields(self.columns),
+            s_fields=self.fields(self.columns, "s"),
+            stage=self.distinct_stage(),
+            match=self.key_match("t", "s"),
+        )
@@ -1,36 +1,204 @@
+import functools
+import itertools
+import logging
 import os
+import threading
+import time
+from contextlib import contextmanager
 import psycopg2
-from psycopg2 import sql, extras
+from psycopg2 import sql, extras, pool
 from classes.base.externalfilehaendler import ExternalFileHandler
 from classes.base.loghandler import LogHandler
+from classes.base.querybuilder import QueryBuilder
+from classes.base.statementcache import CachingConnection
+import classes.const as const
+import classes.metrics as metrics
 
 ConnectionData = ExternalFileHandler().load_database_config()
 
+DB_STATEMENT_SECONDS = metrics.histogram(
+    "octoplug_db_statement_seconds",
+    "Database statement execution time by statement type.",
+    ("statement",),
+)
+STATEMENT_CACHE = metrics.counter(
+    "octoplug_db_statement_cache_total",
+    "Prepared statement cache lookups by result.",
+    ("result",),
+)
+
+# Namen der serverseitigen Cursor, eindeutig je Verbindung
+_cursor_names = itertools.count(1)
+
+
+def statement_type(query):
+    """
+    Liefert das erste Schlüsselwort einer Abfrage, ohne ein sql.Composed vorher
+    per as_string in einen String umzuwandeln.
+    """
+    while isinstance(query, sql.Composed):
+        query = query.seq[0] if query.seq else ""
+    if isinstance(query, sql.SQL):
+        query = query.string
+    words = query.split(None, 1) if isinstance(query, str) else []
+    return words[0].upper() if words else "UNKNOWN"
+
+
+@functools.lru_cache(maxsize=256)
+def insert_query(table, columns):
+    """Baut das INSERT für eine Tabelle und Spaltenfolge einmalig als sql.Composed."""
+    return sql.SQL("INSERT INTO {table} ({fields}) VALUES ({values})").format(
+        table=sql.Identifier(table),
+        fields=sql.SQL(", ").join(sql.Identifier(col.upper()) for col in columns),
+        values=sql.SQL(", ").join(sql.Placeholder() * len(columns)),
+    )
+
+
+def order_clause(order_by):
+    """
+    Baut ORDER BY aus Spaltennamen, optional mit Richtung, z.B. ["NA_DAT DESC", "ID"].
+    Die Spalten werden als Bezeichner maskiert, nur ASC und DESC sind als Richtung erlaubt.
+    """
+    if isinstance(order_by, str):
+        order_by = [order_by]
+    parts = []
+    for item in order_by:
+        column, _, direction = item.strip().partition(" ")
+        direction = direction.strip().upper()
+        if direction not in ("", "ASC", "DESC"):
+            raise ValueError(f"Invalid sort direction in {item!r}")
+        part = sql.Identifier(column.upper())
+        if direction:
+            part += sql.SQL(" " + direction)
+        parts.append(part)
+    return sql.SQL(" ORDER BY ") + sql.SQL(", ").join(parts)
+
+
+@functools.lru_cache(maxsize=256)
+def update_query(table, set_clause, where_clause):
+    query = sql.SQL("UPDATE {table} SET {set_clause}").format(
+        table=sql.Identifier(table), set_clause=sql.SQL(set_clause)
+    )
+    if where_clause:
+        query += sql.SQL(" WHERE ") + sql.SQL(where_clause)
+    return query
+
+
+@functools.lru_cache(maxsize=256)
+def delete_query(table, where_clause):
+    query = sql.SQL("DELETE FROM {table}").format(table=sql.Identifier(table))
+    if where_clause:
+        query += sql.SQL(" WHERE ") + sql.SQL(where_clause)
+    return query
+
+
+class UnitOfWork:
+    """
+    Gemeinsame Transaktion mehrerer Anweisungen auf der Verbindung des aktuellen Threads.
+
+    Ohne Grenzen wird erst am Ende des Blocks committet. Mit max_statements oder max_ms
+    (Group Commit) wird zusätzlich committet, sobald so viele schreibende Anweisungen
+    ausstehen oder die älteste davon so viele Millisekunden alt ist. Die Zeitgrenze wird
+    bei der nächsten Anweisung, bei flush und am Blockende geprüft, da die Verbindung
+    an den Thread gebunden ist.
+
+    Schlägt eine Anweisung fehl, werden alle noch nicht committeten Anweisungen
+    zurückgerollt und der Block endet mit einem psycopg2.DatabaseError.
+    """
+
+    def __init__(self, connection, max_statements=None, max_ms=None):
+        self.connection = connection
+        self.max_statements = max_statements
+        self.max_ms = max_ms
+        self.pending = 0
+        self.oldest = None
+        self.commits = 0
+        self.failed = None
+
+    def statement_done(self):
+        self.pending += 1
+        if self.oldest is None:
+            self.oldest = time.monotonic()
+        if self.due(self.max_statements, self.max_ms):
+            self.flush()
+
+    def due(self, max_statements=None, max_ms=None):
+        """
+        Prüft, ob die ausstehenden Anweisungen eine der Grenzen erreicht haben. Damit
+        kann der Aufrufer selbst an geeigneten Stellen committen, statt mitten in einer
+        zusammengehörigen Folge von Anweisungen.
+        """
+        if not self.pending:
+            return False
+        return bool(max_statements and self.pending >= max_statements) or (
+            max_ms is not None and (time.monotonic() - self.oldest) * 1000 >= max_ms
+        )
+
+    def statement_failed(self, error):
+        # Nur die Ursache behalten, spätere Fehler lauten nur noch "current transaction
+        # is aborted"
+        if self.failed is None:
+            self.failed = error
+
+    def flush(self):
+        """Committet alle ausstehenden Anweisungen, z.B. bevor ihr Empfang bestätigt wird."""
+        if self.failed is not None:
+            raise psycopg2.DatabaseError(
+                f"Unit of work rolled back after failed statement: {self.failed}"
+            )
+        # Auch ohne gezählte Anweisungen committen, z.B. nach insert_many(commit=False)
+        self.connection.commit()
+        if self.pending:
+            self.commits += 1
+            self.pending = 0
+            self.oldest = None
+
 
 class DatabaseController:
     _instance = None
+    _lock = threading.Lock()
     Log = LogHandler(os.path.basename(__file__)[:-3], show_in_console=True).get_logger()
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DatabaseController, cls).__new__(cls)
             cls._instance.initialized = False
-            cls._instance.connection = None
-            cls._instance.where_clause = ""
-            cls._instance.params = []
+            cls._instance.pool = None
+            cls._instance.local = threading.local()
         return cls._instance
 
     def initialize(self):
-        if not self.initialized:
+        with self._lock:
+            if self.initialized:
+                return
+            config = ConnectionData["postgresql"]
+            pool_config = config.get("pool", {})
+            self.minconn = pool_config.get("minconn", 1)
+            self.maxconn = pool_config.get("maxconn", 10)
+            self.checkout_timeout = pool_config.get("timeout", 30)
             try:
-                self.connection = psycopg2.connect(
-                    host=ConnectionData["postgresql"]["host"],
-                    user=ConnectionData["postgresql"]["user"],
-                    password=ConnectionData["postgresql"]["password"],
-                    database=ConnectionData["postgresql"]["database"],
+                self.pool = pool.ThreadedConnectionPool(
+                    self.minconn,
+                    self.maxconn,
+                    host=config["host"],
+                    user=config["user"],
+                    password=config["password"],
+                    database=config["database"],
+                    connection_factory=CachingConnection,
                 )
+                # ThreadedConnectionPool wirft bei Erschöpfung sofort einen Fehler,
+                # der Semaphor lässt weitere Threads stattdessen warten
+                self.slots = threading.BoundedSemaphore(self.maxconn)
+                self.stats_lock = threading.Lock()
+                self.in_use = 0
+                self.max_in_use = 0
+                self.checkouts = 0
+                self.waits = 0
+                self.wait_time = 0.0
                 self.initialized = True
-                self.Log.info("Datenbankverbindung hergestellt")
+                self.Log.info(
+                    f"Datenbankverbindung hergestellt (Pool {self.minconn}-{self.maxconn})"
+                )
             except psycopg2.Error as e:
                 self.Log.error(f"Fehler bei der Verbindung zur Datenbank: {e}")
                 self.initialized = False
@@ -43,48 +211,258 @@ class DatabaseController:
             cls._instance.initialize()
         return cls._instance
 
-    def execute_query(self, query, params=None):
-        query_string = (
-            query.as_string(self.connection)
-            if isinstance(query, sql.Composed)
-            else query
-        )
-        if isinstance(query_string, str):
-            query_type = query_string.strip().split()[0].upper()
+    @property
+    def connection(self):
+        """Die Verbindung, die der aktuelle Thread gerade ausgeliehen hat, sonst None."""
+        return getattr(self.local, "connection", None)
+
+    @contextmanager
+    def get_connection(self):
+        """
+        Leiht eine Verbindung aus dem Pool für die Dauer des Blocks aus.
+
+        Verschachtelte Aufrufe im selben Thread erhalten dieselbe Verbindung, sodass
+        mehrere Anweisungen gemeinsam committet werden können.
+        """
+        connection = self.connection
+        if connection is not None:
+            yield connection
+            return
+
+        with self.borrow_connection() as connection:
+            self.local.connection = connection
+            try:
+                yield connection
+            finally:
+                self.local.connection = None
+
+    @contextmanager
+    def borrow_connection(self):
+        """
+        Leiht eine eigene Verbindung aus dem Pool aus, ohne sie an den Thread zu binden.
+        Anweisungen über get_connection im selben Thread laufen auf einer anderen
+        Verbindung und berühren ihre Transaktion nicht.
+        """
+        started = time.monotonic()
+        if not self.slots.acquire(blocking=False):
+            if not self.slots.acquire(timeout=self.checkout_timeout):
+                raise pool.PoolError(
+                    f"Keine freie Datenbankverbindung nach {self.checkout_timeout}s"
+                )
+            with self.stats_lock:
+                self.waits += 1
+                self.wait_time += time.monotonic() - started
+        try:
+            connection = self.pool.getconn()
+        except Exception:
+            self.slots.release()
+            raise
+        with self.stats_lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+        try:
+            yield connection
+        finally:
+            if (
+                not connection.closed
+                and connection.status != psycopg2.extensions.STATUS_READY
+            ):
+                # Nicht abgeschlossene Transaktion nicht an den nächsten Thread weitergeben
+                connection.rollback()
+            self.pool.putconn(connection, close=bool(connection.closed))
+            with self.stats_lock:
+                self.in_use -= 1
+            self.slots.release()
+
+    def pool_stats(self):
+        """Gibt Kennzahlen des Verbindungspools zurück."""
+        if not self.initialized:
+            return {}
+        with self.stats_lock:
+            return {
+                "minconn": self.minconn,
+                "maxconn": self.maxconn,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_time": round(self.wait_time, 3),
+            }
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.closeall()
+        self.initialized = False
+
+    def statement_cache_stats(self):
+        """Gibt Treffer, Fehlschläge und Verdrängungen des Statement-Caches zurück."""
+        return {
+            result: int(STATEMENT_CACHE.get(result=result))
+            for result in ("hit", "miss", "evict")
+        }
+
+    def execute_query(self, query, params=None, prepare_key=None):
+        """
+        Führt eine Abfrage aus. Mit prepare_key, der die Form der Anweisung beschreibt,
+        wird sie auf der Verbindung einmalig per PREPARE angelegt und danach nur noch
+        per EXECUTE aufgerufen, siehe StatementCache.
+
+        Existiert die vorbereitete Anweisung auf dem Server nicht mehr (z.B. nach
+        DISCARD ALL), wird sie neu vorbereitet und einmal wiederholt, sofern die
+        Transaktion sonst nichts enthielt. Andernfalls schlägt die Anweisung fehl.
+        """
         params = params or self.params
         result = None
         try:
-            with self.connection.cursor(cursor_factory=extras.RealDictCursor) as cursor:
-                cursor.execute(query_string, params)
-                if query_type in ["SELECT", "SHOW"]:
-                    result = cursor.fetchall()
-                    self.Log.info(
-                        f"Query executed: {query_string}, {len(result)} rows fetched."
-                    )
-                else:
-                    self.connection.commit()
-                    self.Log.info("Abfrage erfolgreich ausgeführt")
-        except psycopg2.Error as e:
-            self.Log.error(f"Fehler beim Ausführen der Abfrage: {e}")
-            self.connection.rollback()
+            with self.get_connection() as connection:
+                query_type = statement_type(query)
+                statements = getattr(connection, "statements", None)
+                if statements is None or not statements.capacity:
+                    prepare_key = None
+                for retry in (True, False):
+                    idle = connection.status == psycopg2.extensions.STATUS_READY
+                    try:
+                        result = self.run_statement(
+                            connection, query, query_type, params, prepare_key
+                        )
+                    except psycopg2.errors.InvalidSqlStatementName as e:
+                        if prepare_key is None:
+                            self.statement_failed(connection, e)
+                            break
+                        statements.discard(prepare_key)
+                        if not (retry and idle):
+                            self.statement_failed(connection, e)
+                            break
+                        # Die Transaktion enthielt nur diese Anweisung
+                        connection.rollback()
+                        self.Log.warning(
+                            f"Vorbereitete Anweisung fehlt, wird neu angelegt: {e}"
+                        )
+                    except psycopg2.Error as e:
+                        self.statement_failed(connection, e)
+                        break
+                    else:
+                        break
+        except pool.PoolError as e:
+            self.Log.error(f"Fehler beim Ausleihen einer Verbindung: {e}")
         finally:
             self.reset_query_conditions()
 
         return result
 
+    def run_statement(self, connection, query, query_type, params, prepare_key):
+        result = None
+        statements = connection.statements if prepare_key is not None else None
+        with connection.cursor(
+            cursor_factory=extras.RealDictCursor
+        ) as cursor, DB_STATEMENT_SECONDS.time(statement=query_type):
+            if prepare_key is not None:
+                evictions = statements.evictions
+                execute, hit = statements.execute_sql(
+                    cursor, prepare_key, query, len(params or ())
+                )
+                STATEMENT_CACHE.inc(result="hit" if hit else "miss")
+                if statements.evictions != evictions:
+                    STATEMENT_CACHE.inc(result="evict")
+                cursor.execute(execute, params)
+            else:
+                cursor.execute(query, params)
+            if query_type in ["SELECT", "SHOW"]:
+                result = cursor.fetchall()
+                if self.Log.isEnabledFor(logging.DEBUG):
+                    self.Log.debug(
+                        f"Query executed: {cursor.query.decode(errors='replace')}, "
+                        f"{len(result)} rows fetched."
+                    )
+            else:
+                self.commit_statement(connection)
+                self.Log.debug("Abfrage erfolgreich ausgeführt")
+        return result
+
+    def statement_failed(self, connection, error):
+        self.Log.error(f"Fehler beim Ausführen der Abfrage: {error}")
+        if self.unit is not None:
+            # Der umgebende transaction-Block rollt alles zurück
+            self.unit.statement_failed(error)
+            raise error
+        connection.rollback()
+
+    @property
+    def unit(self):
+        """Die UnitOfWork des aktuellen Threads, sonst None."""
+        return getattr(self.local, "unit", None)
+
+    def commit_statement(self, connection):
+        """Committet eine schreibende Anweisung sofort oder überlässt es der UnitOfWork."""
+        if self.unit is not None:
+            self.unit.statement_done()
+        else:
+            connection.commit()
+
+    @contextmanager
+    def transaction(self, max_statements=None, max_ms=None):
+        """
+        Fasst alle Anweisungen des Blocks im aktuellen Thread zu einer UnitOfWork
+        zusammen. execute_query, insert_data und insert_many committen darin nicht
+        mehr einzeln. Verschachtelte Blöcke schließen sich dem äußeren an.
+
+        Mit max_statements und max_ms wird zusätzlich in Gruppen committet (Group
+        Commit für laufende Datenströme), siehe UnitOfWork.
+        """
+        if self.unit is not None:
+            yield self.unit
+            return
+        with self.get_connection() as connection:
+            unit = self.local.unit = UnitOfWork(connection, max_statements, max_ms)
+            try:
+                yield unit
+                unit.flush()
+            except psycopg2.errors.InFailedSqlTransaction:
+                connection.rollback()
+                # Folgefehler durch die eigentliche Ursache ersetzen
+                if unit.failed is not None:
+                    raise unit.failed
+                raise
+            except BaseException:
+                connection.rollback()
+                raise
+            finally:
+                self.local.unit = None
+
+    @property
+    def query_builder(self):
+        """Der QueryBuilder des aktuellen Threads für add_where und Co."""
+        builder = getattr(self.local, "query_builder", None)
+        if builder is None:
+            builder = self.local.query_builder = QueryBuilder()
+        return builder
+
+    @property
+    def where_clause(self):
+        return self.query_builder.where_clause
+
+    @property
+    def params(self):
+        return self.query_builder.params
+
+    def new_query(self):
+        """Erstellt einen eigenen QueryBuilder, der als where_clause übergeben werden kann."""
+        return QueryBuilder()
+
     def reset_query_conditions(self):
-        self.where_clause = ""
-        self.params = []
+        self.query_builder.reset()
 
     def add_where(self, key, value):
-        placeholder = "%s"
-        if self.where_clause:
-            self.where_clause += f" AND {key} = {placeholder}"
-        else:
-            self.where_clause = f"{key} = {placeholder}"
-        self.params.append(value)
+        self.query_builder.add_where(key, value)
+
+    def resolve_where(self, where_clause, params):
+        if isinstance(where_clause, QueryBuilder):
+            return where_clause.where_clause, where_clause.params
+        return where_clause, params
 
     def fetch_data(self, table, columns="*", where_clause=None, params=None):
+        where_clause, params = self.resolve_where(where_clause, params)
         if table.lower() == "information_schema.columns":
             query = f"SELECT {columns} FROM {table}"
             if where_clause or self.where_clause:
@@ -101,21 +479,100 @@ class DatabaseController:
                 query += sql.SQL(" WHERE ") + sql.SQL(where_clause or self.where_clause)
         return self.execute_query(query, params or self.params)
 
+    def stream_data(
+        self,
+        table,
+        columns="*",
+        where_clause=None,
+        params=None,
+        order_by=None,
+        limit=None,
+        itersize=None,
+    ):
+        """
+        Liest eine Tabelle über einen serverseitigen Cursor und liefert sie blockweise
+        als (Spaltennamen, Zeilen) mit höchstens itersize Tupeln je Block.
+
+        Anders als fetch_data bleibt nur ein Block im Speicher. WHERE, ORDER BY und
+        LIMIT werden an die Datenbank übergeben. Die Bedingungen werden beim Aufruf
+        übernommen, gelesen wird erst beim Iterieren.
+
+        Jeder Iterator liest auf einer eigenen, per borrow_connection ausgeliehenen
+        Verbindung, bis er erschöpft oder geschlossen ist. Commits der Schleife, etwa durch
+        save, und weitere Iteratoren im selben Thread beenden den Cursor daher nicht. Der
+        Pool muss dafür eine Verbindung mehr bereithalten. Nur innerhalb von
+        transaction() wird die Verbindung der UnitOfWork verwendet, damit deren noch nicht
+        committete Änderungen sichtbar sind. Der Cursor ist dann WITH HOLD und übersteht
+        Group Commits.
+        """
+        where_clause, params = self.resolve_where(where_clause, params)
+        where_clause = where_clause or self.where_clause
+        params = list(params or self.params)
+        self.reset_query_conditions()
+        if columns == "*":
+            fields = sql.SQL("*")
+        else:
+            fields = sql.SQL(", ").join(sql.Identifier(col.upper()) for col in columns)
+        query = sql.SQL("SELECT {fields} FROM {table}").format(
+            fields=fields, table=sql.Identifier(table.upper())
+        )
+        if where_clause:
+            query += sql.SQL(" WHERE ") + sql.SQL(where_clause)
+        if order_by:
+            query += order_clause(order_by)
+        if limit is not None:
+            query += sql.SQL(" LIMIT %s")
+            params.append(limit)
+        return self._stream_query(query, params, itersize or const.StreamItersize)
+
+    def _stream_query(self, query, params, itersize):
+        unit = self.unit
+        if unit is not None:
+            borrowed = self.get_connection()
+        else:
+            borrowed = self.borrow_connection()
+        with borrowed as connection:
+            try:
+                with connection.cursor(
+                    name=f"octo_stream_{next(_cursor_names)}",
+                    withhold=unit is not None,
+                ) as cursor:
+                    cursor.itersize = itersize
+                    with DB_STATEMENT_SECONDS.time(statement="SELECT"):
+                        cursor.execute(query, params)
+                    names = None
+                    while True:
+                        rows = cursor.fetchmany(itersize)
+                        if not rows:
+                            break
+                        if names is None:
+                            names = [column[0] for column in cursor.description]
+                        yield names, rows
+            except psycopg2.Error as e:
+                self.Log.error(f"Fehler beim Lesen über den Cursor: {e}")
+                if unit is not None:
+                    unit.statement_failed(e)
+                raise
+
     def update_data(self, table, set_clause, where_clause=None, params=None):
+        where_clause, params = self.resolve_where(where_clause, params)
         table = table.upper()
-        query = sql.SQL("UPDATE {table} SET {set_clause}").format(
-            table=sql.Identifier(table), set_clause=sql.SQL(set_clause)
+        where_clause = where_clause or self.where_clause
+        self.execute_query(
+            update_query(table, set_clause, where_clause),
+            params or self.params,
+            prepare_key=("UPDATE", table, set_clause, where_clause),
         )
-        if where_clause or self.where_clause:
-            query += sql.SQL(" WHERE ") + sql.SQL(where_clause or self.where_clause)
-        self.execute_query(query, params or self.params)
 
     def delete_data(self, table, where_clause=None, params=None):
+        where_clause, params = self.resolve_where(where_clause, params)
         table = table.upper()
-        query = sql.SQL("DELETE FROM {table}").format(table=sql.Identifier(table))
-        if where_clause or self.where_clause:
-            query += sql.SQL(" WHERE ") + sql.SQL(where_clause or self.where_clause)
-        self.execute_query(query, params or self.params)
+        where_clause = where_clause or self.where_clause
+        self.execute_query(
+            delete_query(table, where_clause),
+            params or self.params,
+            prepare_key=("DELETE", table, where_clause),
+        )
 
     def insert_data(self, table, columns, values):
         filtered_columns_values = [
@@ -124,14 +581,105 @@ class DatabaseController:
         if not filtered_columns_values:
             raise ValueError("Es wurden keine Werte zum Einfügen angegeben.")
         filtered_columns, filtered_values = zip(*filtered_columns_values)
-        formatted_columns = [sql.Identifier(col.upper()) for col in filtered_columns]
-        placeholders = sql.SQL(", ").join(sql.Placeholder() * len(filtered_values))
-        query = sql.SQL("INSERT INTO {table} ({fields}) VALUES ({values})").format(
+        table = table.upper()
+        self.execute_query(
+            insert_query(table, filtered_columns),
+            filtered_values,
+            prepare_key=("INSERT", table, filtered_columns),
+        )
+
+    def insert_many(
+        self,
+        table,
+        columns,
+        rows,
+        conflict_columns=None,
+        commit=True,
+        null_columns=(),
+    ):
+        """
+        Fügt mehrere Zeilen mit einem mehrzeiligen INSERT ... VALUES ein.
+
+        Mit conflict_columns werden bereits vorhandene Zeilen per ON CONFLICT DO UPDATE
+        aktualisiert, dabei werden die Spalten aus null_columns, die nicht eingefügt
+        werden, auf NULL gesetzt. Mit commit=False bleibt die Transaktion offen, der Aufrufer muss
+        dann innerhalb von get_connection committen. Innerhalb von transaction
+        übernimmt die UnitOfWork den Commit. Gibt ein Tupel (eingefügt, aktualisiert)
+        zurück.
+        """
+        if not rows:
+            return 0, 0
+        query = sql.SQL("INSERT INTO {table} ({fields}) VALUES %s").format(
             table=sql.Identifier(table.upper()),
-            fields=sql.SQL(", ").join(formatted_columns),
-            values=placeholders,
+            fields=sql.SQL(", ").join(sql.Identifier(c.upper()) for c in columns),
+        )
+        if conflict_columns:
+            updates = [
+                sql.SQL("{col} = EXCLUDED.{col}").format(col=sql.Identifier(c.upper()))
+                for c in columns
+                if c not in conflict_columns
+            ]
+            updates.extend(
+                sql.SQL("{col} = NULL").format(col=sql.Identifier(c.upper()))
+                for c in null_columns
+                if c not in conflict_columns
+            )
+            conflict_target = sql.SQL(", ").join(
+                sql.Identifier(c.upper()) for c in conflict_columns
+            )
+            if updates:
+                query += sql.SQL(
+                    " ON CONFLICT ({keys}) DO UPDATE SET {updates}"
+                ).format(keys=conflict_target, updates=sql.SQL(", ").join(updates))
+            else:
+                query += sql.SQL(" ON CONFLICT ({keys}) DO NOTHING").format(
+                    keys=conflict_target
+                )
+        # xmax = 0 gilt nur für neu eingefügte Zeilen, nicht für per Upsert aktualisierte
+        query += sql.SQL(" RETURNING (xmax = 0) AS inserted")
+        with self.get_connection() as connection:
+            try:
+                with connection.cursor() as cursor, DB_STATEMENT_SECONDS.time(
+                    statement="INSERT"
+                ):
+                    result = extras.execute_values(cursor, query, rows, fetch=True)
+                if commit:
+                    self.commit_statement(connection)
+            except psycopg2.Error as e:
+                self.Log.error(f"Fehler beim Einfügen mehrerer Zeilen: {e}")
+                if self.unit is not None:
+                    self.unit.statement_failed(e)
+                else:
+                    connection.rollback()
+                raise e
+        inserted = sum(1 for row in result if row[0])
+        updated = len(result) - inserted
+        self.Log.info(f"{inserted} Zeilen eingefügt, {updated} Zeilen aktualisiert")
+        return inserted, updated
+
+    def upsert_data(self, table, columns, values, conflict_columns):
+        """
+        Fügt eine Zeile ein oder aktualisiert sie bei einem Konflikt auf conflict_columns,
+        in einer einzigen INSERT ... ON CONFLICT DO UPDATE-Anweisung.
+
+        Eingefügt werden nur die Spalten mit Wert, damit Standardwerte der Datenbank
+        greifen. Beim Aktualisieren werden alle Spalten übernommen, Spalten ohne Wert
+        werden dabei auf NULL gesetzt. Gibt ein Tupel (eingefügt, aktualisiert) zurück.
+        """
+        filtered_columns_values = [
+            (col, val) for col, val in zip(columns, values) if val is not None
+        ]
+        if not filtered_columns_values:
+            raise ValueError("Es wurden keine Werte zum Einfügen angegeben.")
+        filtered_columns, filtered_values = zip(*filtered_columns_values)
+        null_columns = [col for col, val in zip(columns, values) if val is None]
+        return self.insert_many(
+            table,
+            filtered_columns,
+            [filtered_values],
+            conflict_columns,
+            null_columns=null_columns,
         )
-        self.execute_query(query, filtered_values)
 
     def get_columns(self, table_name, data_type=False):
         columns = "COLUMN_NAME, DATA_TYPE" if data_type else "COLUMN_NAME"
@@ -1,6 +1,6 @@
 import os
-from src.persistent.classes.base.externalfilehaendler import ExternalFileHandler
-from src.persistent.classes.base.loghandler import LogHandler
+from classes.base.externalfilehaendler import ExternalFileHandler
+from classes.base.loghandler import LogHandler
 
 
 class DatabaseControllerBase:
@@ -21,21 +21,30 @@ class DatabaseControllerBase:
     def get_instance(cls, db_type="postgresql"):
         if cls._instance is None:
             # Standardmäßig PostgreSQL verwenden
-            config = cls.Config.get(db_type)
+            # Der asynchrone Controller verwendet dieselbe Konfiguration wie PostgreSQL
+            config = cls.Config.get(
+                "postgresql" if db_type == "postgresql_async" else db_type
+            )
 
             if config is None:
                 raise ValueError(f"No configuration found for database type: {db_type}")
 
             if db_type == "mysql":
-                from src.persistent.classes.base.mysqlcontroller import MySQLController
+                from classes.base.mysqlcontroller import MySQLController
 
                 cls._instance = MySQLController()
             elif db_type == "postgresql":
-                from src.persistent.classes.base.postgrescontroller import (
+                from classes.base.postgrescontroller import (
                     PostgresController,
                 )
 
                 cls._instance = PostgresController()
+            elif db_type == "postgresql_async":
+                from classes.base.asyncpostgrescontroller import (
+                    AsyncPostgresController,
+                )
+
+                cls._instance = AsyncPostgresController()
             else:
                 raise ValueError("Unsupported database type")
 
@@ -105,3 +114,6 @@ class DatabaseControllerBase:
 
     def insert_data(self, table, columns, values):
         raise NotImplementedError("Subclasses should implement this method")
+
+    def upsert_data(self, table, columns, values, conflict_columns):
+        raise NotImplementedError("Subclasses should implement this method")
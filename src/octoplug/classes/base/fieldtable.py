@@ -0,0 +1,81 @@
+from collections import namedtuple
+from datetime import datetime, date, time
+import operator
+
+# Spaltenname, Attribut am Objekt, Python-Typ aus der __init__-Signatur, Serialisierer
+Field = namedtuple("Field", ("name", "attribute", "type", "serialize"))
+
+# Typen, deren Werte unverändert in JSON übernommen werden können
+_PLAIN_TYPES = (int, float, str, bool, bytes, dict)
+
+
+def serialize_value(value):
+    """Wandelt Datums- und Zeitwerte in die bisherigen Textformate, alles andere bleibt."""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, time):
+        return value.strftime("%H:%M:%S")
+    return value
+
+
+def serializer_for(python_type):
+    """
+    Liefert den Serialisierer für einen Spaltentyp oder None, wenn der Wert unverändert
+    bleibt. Unbekannte oder fehlende Typen prüfen den Wert zur Laufzeit.
+    """
+    if isinstance(python_type, type) and issubclass(python_type, _PLAIN_TYPES):
+        return None
+    return serialize_value
+
+
+class FieldTable:
+    """
+    Einmal pro Klasse erstellte Beschreibung der Spalten einer AutoPersistent- oder
+    AutoPersistentRecord-Klasse: Reihenfolge, Attributnamen, Typen und Serialisierer.
+
+    to_row liest alle Werte mit einem vorab erzeugten operator.attrgetter aus, sodass
+    getColumns, to_dict und die Speicherpfade weder vars() noch isinstance-Ketten pro
+    Aufruf durchlaufen.
+    """
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self.names = tuple(field.name for field in self.fields)
+        self.attributes = {field.name: field.attribute for field in self.fields}
+        # Nur Spalten mit Serialisierer werden in to_dict einzeln nachbearbeitet
+        self.serialized = tuple(
+            (index, field.name, field.serialize)
+            for index, field in enumerate(self.fields)
+            if field.serialize is not None
+        )
+        if not self.fields:
+            self.to_row = lambda obj: ()
+        elif len(self.fields) == 1:
+            getter = operator.attrgetter(self.fields[0].attribute)
+            self.to_row = lambda obj: (getter(obj),)
+        else:
+            self.to_row = operator.attrgetter(*(f.attribute for f in self.fields))
+
+    @classmethod
+    def build(cls, names, prefix, annotations):
+        """Erstellt die Tabelle aus Spaltennamen und den Annotationen von __init__."""
+        fields = []
+        for name in names:
+            python_type = annotations.get(name)
+            fields.append(
+                Field(name, f"{prefix}{name}", python_type, serializer_for(python_type))
+            )
+        return cls(fields)
+
+    def to_dict(self, obj, raw=False):
+        values = self.to_row(obj)
+        data_dict = dict(zip(self.names, values))
+        if not raw:
+            for index, name, serialize in self.serialized:
+                data_dict[name] = serialize(values[index])
+        return data_dict
+
+    def __len__(self):
+        return len(self.fields)
@@ -1,5 +1,5 @@
 import mysql.connector
-from src.persistent.classes.base.databasecontrollerbase import DatabaseControllerBase
+from classes.base.databasecontrollerbase import DatabaseControllerBase
 
 
 class MySQLController(DatabaseControllerBase):
@@ -45,3 +45,31 @@ class MySQLController(DatabaseControllerBase):
         placeholders = ", ".join(["%s"] * len(values))
         query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
         self.execute_query(query, values)
+
+    def upsert_data(self, table, columns, values, conflict_columns):
+        filtered_columns_values = [
+            (col, val) for col, val in zip(columns, values) if val is not None
+        ]
+        if not filtered_columns_values:
+            raise ValueError("Es wurden keine Werte zum Einfügen angegeben.")
+        filtered_columns, filtered_values = zip(*filtered_columns_values)
+        # MySQL erkennt den Konflikt selbst über PRIMARY KEY oder UNIQUE-Indizes
+        update_columns = [c for c in filtered_columns if c not in conflict_columns]
+        # Spalten ohne Wert werden nicht eingefügt, beim Aktualisieren aber geleert
+        null_columns = [
+            col
+            for col, val in zip(columns, values)
+            if val is None and col not in conflict_columns
+        ]
+        if not update_columns and not null_columns:
+            update_columns = list(conflict_columns[:1])
+        placeholders = ", ".join(["%s"] * len(filtered_values))
+        updates = ", ".join(
+            [f"{col} = VALUES({col})" for col in update_columns]
+            + [f"{col} = NULL" for col in null_columns]
+        )
+        query = (
+            f"INSERT INTO {table} ({', '.join(filtered_columns)}) VALUES ({placeholders}) "
+            f"ON DUPLICATE KEY UPDATE {updates}"
+        )
+        self.execute_query(query, filtered_values)
@@ -1,6 +1,7 @@
+from contextlib import contextmanager
 import psycopg2
 from psycopg2 import sql, extras
-from src.persistent.classes.base.databasecontrollerbase import DatabaseControllerBase
+from classes.base.databasecontrollerbase import DatabaseControllerBase
 
 
 class PostgresController(DatabaseControllerBase):
@@ -40,16 +41,53 @@ class PostgresController(DatabaseControllerBase):
                 else:
                     if query_type == "INSERT":
                         result = cursor.fetchone()  # Return the ID of the inserted row
-                    self.connection.commit()
+                    if not getattr(self, "in_transaction", False):
+                        self.connection.commit()
                     self.Log.info("Abfrage erfolgreich ausgeführt")
         except psycopg2.Error as e:
             self.Log.error(f"Fehler beim Ausführen der Abfrage: {e}")
-            self.connection.rollback()
+            if not getattr(self, "in_transaction", False):
+                self.connection.rollback()
+            else:
+                # transaction() rollt den ganzen Block zurück, auch wenn der Aufrufer
+                # den Fehler abfängt
+                self.transaction_failed = self.transaction_failed or e
             raise e
         finally:
             self.reset_query_conditions()
         return result
 
+    @contextmanager
+    def transaction(self):
+        """
+        Führt alle Anweisungen des Blocks in einer Transaktion aus und committet erst am
+        Ende. Bei einem Fehler wird die ganze Transaktion zurückgerollt.
+        """
+        if getattr(self, "in_transaction", False):
+            yield self
+            return
+        self.in_transaction = True
+        self.transaction_failed = None
+        try:
+            yield self
+            if self.transaction_failed is not None:
+                raise psycopg2.DatabaseError(
+                    f"Transaction rolled back after failed statement: "
+                    f"{self.transaction_failed}"
+                )
+            self.connection.commit()
+        except psycopg2.errors.InFailedSqlTransaction:
+            self.connection.rollback()
+            # Folgefehler durch die eigentliche Ursache ersetzen
+            if self.transaction_failed is not None:
+                raise self.transaction_failed
+            raise
+        except BaseException:
+            self.connection.rollback()
+            raise
+        finally:
+            self.in_transaction = False
+
     def insert_data(self, table, columns, values):
         filtered_columns_values = [
             (col, val) for col, val in zip(columns, values) if val is not None
@@ -67,3 +105,48 @@ class PostgresController(DatabaseControllerBase):
             values=placeholders,
         )
         return self.execute_query(query, filtered_values)
+
+    def upsert_data(self, table, columns, values, conflict_columns):
+        filtered_columns_values = [
+            (col, val) for col, val in zip(columns, values) if val is not None
+        ]
+        if not filtered_columns_values:
+            raise ValueError("Es wurden keine Werte zum Einfügen angegeben.")
+        filtered_columns, filtered_values = zip(*filtered_columns_values)
+        update_columns = [c for c in filtered_columns if c not in conflict_columns]
+        # Spalten ohne Wert werden nicht eingefügt, beim Aktualisieren aber geleert
+        null_columns = [
+            col
+            for col, val in zip(columns, values)
+            if val is None and col not in conflict_columns
+        ]
+        query = sql.SQL(
+            "INSERT INTO {table} ({fields}) VALUES ({values}) ON CONFLICT ({keys}) "
+        ).format(
+            table=sql.Identifier(table.upper()),
+            fields=sql.SQL(", ").join(
+                sql.Identifier(col.upper()) for col in filtered_columns
+            ),
+            values=sql.SQL(", ").join(sql.Placeholder() * len(filtered_values)),
+            keys=sql.SQL(", ").join(
+                sql.Identifier(col.upper()) for col in conflict_columns
+            ),
+        )
+        if update_columns or null_columns:
+            updates = [
+                sql.SQL("{col} = EXCLUDED.{col}").format(
+                    col=sql.Identifier(col.upper())
+                )
+                for col in update_columns
+            ]
+            updates.extend(
+                sql.SQL("{col} = NULL").format(col=sql.Identifier(col.upper()))
+                for col in null_columns
+            )
+            query += sql.SQL("DO UPDATE SET {updates}").format(
+                updates=sql.SQL(", ").join(updates)
+            )
+        else:
+            query += sql.SQL("DO NOTHING")
+        query += sql.SQL(" RETURNING id")
+        return self.execute_query(query, filtered_values)
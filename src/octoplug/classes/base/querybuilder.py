@@ -0,0 +1,24 @@
+class QueryBuilder:
+    """
+    Sammelt WHERE-Bedingungen und Parameter für eine einzelne Abfrage.
+
+    Jede Anfrage verwendet ihr eigenes Objekt, sodass sich parallele Threads
+    ihre Bedingungen nicht gegenseitig überschreiben.
+    """
+
+    def __init__(self):
+        self.where_clause = ""
+        self.params = []
+
+    def add_where(self, key, value):
+        placeholder = "%s"
+        if self.where_clause:
+            self.where_clause += f" AND {key} = {placeholder}"
+        else:
+            self.where_clause = f"{key} = {placeholder}"
+        self.params.append(value)
+        return self
+
+    def reset(self):
+        self.where_clause = ""
+        self.params = []
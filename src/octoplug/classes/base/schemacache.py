@@ -0,0 +1,116 @@
+import os
+import threading
+from classes.base.databasecontroller import DatabaseController
+from classes.base.loghandler import LogHandler
+
+
+class TableSchema:
+    """Primärschlüssel, eindeutige Schlüssel, Spaltennamen und Datentypen einer Tabelle."""
+
+    def __init__(self, table, primary_key, columns, data_types, unique_keys=()):
+        self.table = table
+        self.primary_key = primary_key
+        self.columns = columns
+        self.data_types = data_types
+        self.unique_keys = unique_keys
+
+
+class SchemaCache:
+    """
+    Prozessweiter Zwischenspeicher für Tabellen-Metadaten.
+
+    Primärschlüssel, Spalten und Datentypen ändern sich zur Laufzeit nicht und werden
+    deshalb nur einmal pro Tabelle aus dem information_schema gelesen. Nach einer
+    Schemaänderung muss der Eintrag mit invalidate verworfen werden.
+    """
+
+    Log = LogHandler(os.path.basename(__file__)[:-3], show_in_console=True).get_logger()
+    _tables = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, table):
+        key = table.upper()
+        schema = cls._tables.get(key)
+        if schema is None:
+            with cls._lock:
+                schema = cls._tables.get(key)
+                if schema is None:
+                    schema = cls.load(key)
+                    # Nicht vorhandene Tabellen nicht zwischenspeichern
+                    if schema.columns:
+                        cls._tables[key] = schema
+        return schema
+
+    @classmethod
+    def load(cls, table):
+        db = DatabaseController.get_instance()
+        rows = db.execute_query(
+            "SELECT kcu.column_name FROM information_schema.table_constraints tc "
+            "JOIN information_schema.key_column_usage kcu "
+            "ON tc.constraint_name = kcu.constraint_name "
+            "WHERE tc.table_name = %s AND tc.constraint_type = 'PRIMARY KEY'",
+            (table,),
+        )
+        primary_key = rows[0]["column_name"] if rows else None
+        rows = db.execute_query(
+            "SELECT tc.constraint_name, kcu.column_name "
+            "FROM information_schema.table_constraints tc "
+            "JOIN information_schema.key_column_usage kcu "
+            "ON tc.constraint_name = kcu.constraint_name "
+            "WHERE tc.table_name = %s AND tc.constraint_type = 'UNIQUE' "
+            "ORDER BY tc.constraint_name, kcu.ordinal_position",
+            (table,),
+        )
+        unique_keys = {}
+        for row in rows or []:
+            unique_keys.setdefault(row["constraint_name"], []).append(
+                row["column_name"]
+            )
+        rows = db.execute_query(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_name = %s ORDER BY ordinal_position",
+            (table,),
+        )
+        rows = rows or []
+        columns = tuple(row["column_name"] for row in rows)
+        data_types = {row["column_name"]: row["data_type"] for row in rows}
+        cls.Log.info(f"Schema für {table} geladen: {len(columns)} Spalten")
+        return TableSchema(
+            table,
+            primary_key,
+            columns,
+            data_types,
+            tuple(tuple(key) for key in unique_keys.values()),
+        )
+
+    @classmethod
+    def get_primary_key(cls, table):
+        return cls.get(table).primary_key
+
+    @classmethod
+    def get_unique_keys(cls, table):
+        return cls.get(table).unique_keys
+
+    @classmethod
+    def get_columns(cls, table):
+        return cls.get(table).columns
+
+    @classmethod
+    def get_data_types(cls, table):
+        return cls.get(table).data_types
+
+    @classmethod
+    def invalidate(cls, table=None):
+        """Verwirft die Metadaten einer Tabelle oder, ohne Angabe, aller Tabellen."""
+        with cls._lock:
+            if table is None:
+                cls._tables.clear()
+            else:
+                cls._tables.pop(table.upper(), None)
+
+    @classmethod
+    def warm_up(cls, tables):
+        """Lädt die Metadaten der angegebenen Tabellen vorab, z.B. beim Serverstart."""
+        for table in tables:
+            cls.get(table)
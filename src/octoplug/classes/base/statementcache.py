@@ -0,0 +1,81 @@
+import itertools
+import re
+from collections import OrderedDict
+import psycopg2.extensions
+from psycopg2 import sql
+import classes.const as const
+
+# %% ist in psycopg2 ein maskiertes Prozentzeichen, %s ein Parameter
+_PLACEHOLDER_RE = re.compile(r"%%|%s")
+
+
+def to_positional(query_string):
+    """Ersetzt die psycopg2-Platzhalter %s durch $1, $2, ... für PREPARE."""
+    counter = itertools.count(1)
+    return _PLACEHOLDER_RE.sub(
+        lambda match: "%" if match.group() == "%%" else f"${next(counter)}",
+        query_string,
+    )
+
+
+class StatementCache:
+    """
+    Serverseitig vorbereitete Anweisungen einer einzelnen Verbindung.
+
+    Der Schlüssel beschreibt die Form einer Anweisung, z.B. ("INSERT", Tabelle, Spalten).
+    Beim ersten Auftreten wird die Anweisung per PREPARE angelegt, danach nur noch per
+    EXECUTE mit den neuen Werten aufgerufen, sodass PostgreSQL sie weder neu parst noch
+    neu plant. Bei mehr als capacity Formen wird die am längsten unbenutzte per
+    DEALLOCATE freigegeben.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        # Schlüssel -> EXECUTE-Anweisung als fertiger String
+        self.statements = OrderedDict()
+        self.names = itertools.count(1)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def execute_sql(self, cursor, key, query, param_count):
+        """
+        Liefert die EXECUTE-Anweisung für key und bereitet sie bei Bedarf vor.
+        Gibt (EXECUTE-String, Treffer) zurück.
+        """
+        execute = self.statements.get(key)
+        if execute is not None:
+            self.statements.move_to_end(key)
+            self.hits += 1
+            return execute, True
+
+        name = sql.Identifier(f"octo_stmt_{next(self.names)}")
+        prepare = sql.SQL("PREPARE {name} AS ").format(name=name).as_string(cursor)
+        cursor.execute(prepare + to_positional(sql.Composed([query]).as_string(cursor)))
+        execute = sql.SQL("EXECUTE {name}").format(name=name)
+        if param_count:
+            execute += sql.SQL(" ({params})").format(
+                params=sql.SQL(", ").join(sql.Placeholder() * param_count)
+            )
+        execute = execute.as_string(cursor)
+        self.statements[key] = execute
+        self.misses += 1
+
+        if len(self.statements) > self.capacity:
+            _, evicted = self.statements.popitem(last=False)
+            # "EXECUTE <name> (...)" -> Name der Anweisung
+            cursor.execute("DEALLOCATE " + evicted.split()[1])
+            self.evictions += 1
+        return execute, False
+
+    def discard(self, key):
+        """Vergisst eine Form, z.B. nachdem ihr EXECUTE fehlgeschlagen ist."""
+        self.statements.pop(key, None)
+
+
+class CachingConnection(psycopg2.extensions.connection):
+    """psycopg2-Verbindung mit eigenem StatementCache, als connection_factory des Pools."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.statements = StatementCache(const.StatementCacheSize)
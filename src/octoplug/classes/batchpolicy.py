@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+import classes.const as const
+from classes.loghandler import LogHandler
+
+log_handler = LogHandler(os.path.basename(__file__)[:-3])
+logger = log_handler.get_logger()
+
+
+class BatchPolicy:
+    """
+    Entscheidet, wann ein gesammelter Block an den Server gesendet wird.
+
+    Ein Block wird abgeschlossen, sobald eine der gesetzten Grenzen erreicht ist:
+    max_rows Einträge, max_bytes Bytes oder max_latency_ms Millisekunden seit dem
+    ersten Eintrag. Nicht gesetzte Grenzen (None) werden ignoriert.
+    """
+
+    def __init__(self, max_rows=None, max_bytes=None, max_latency_ms=None):
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_latency_ms = max_latency_ms
+
+    def should_flush(self, rows, size, started):
+        if self.max_rows is not None and rows >= self.max_rows:
+            return True
+        if self.max_bytes is not None and size >= self.max_bytes:
+            return True
+        if self.max_latency_ms is not None:
+            return (time.monotonic() - started) * 1000 >= self.max_latency_ms
+        return False
+
+    def record_ack(self, rows, seconds):
+        """Wird nach jeder Serverbestätigung mit Blockgröße und Antwortzeit aufgerufen."""
+
+    def batches(self, items, measure):
+        """
+        Fasst die Elemente aus items zu Listen zusammen. measure liefert für jedes Element
+        ein Tupel (Einträge, Bytes).
+        """
+        buffer = []
+        rows = size = 0
+        started = None
+        for item in items:
+            if not buffer:
+                started = time.monotonic()
+            buffer.append(item)
+            item_rows, item_size = measure(item)
+            rows += item_rows
+            size += item_size
+            if self.should_flush(rows, size, started):
+                yield buffer
+                buffer = []
+                rows = size = 0
+        if buffer:
+            yield buffer
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Erzeugt eine Richtlinie aus einem Dictionary wie const.BatchPolicy.
+        max_bytes gilt in jedem Modus als Obergrenze für die Nachrichtengröße.
+        """
+        mode = config.get("mode", "rows")
+        max_bytes = config.get("bytes")
+        if mode == "rows":
+            return cls(max_rows=config["rows"], max_bytes=max_bytes)
+        if mode == "bytes":
+            return cls(max_bytes=max_bytes)
+        if mode == "latency":
+            return cls(
+                max_rows=config.get("max_rows"),
+                max_bytes=max_bytes,
+                max_latency_ms=config["latency_ms"],
+            )
+        if mode == "adaptive":
+            return AdaptiveBatchPolicy(
+                rows=config["rows"],
+                min_rows=config["min_rows"],
+                max_rows=config["max_rows"],
+                target_ack_ms=config["target_ack_ms"],
+                max_bytes=max_bytes,
+            )
+        raise ValueError(f"Unsupported batch policy mode: {mode}")
+
+
+class AdaptiveBatchPolicy(BatchPolicy):
+    """
+    Verdoppelt die Blockgröße, solange der Server schneller als target_ack_ms bestätigt,
+    und halbiert sie, sobald die Bestätigung länger dauert. Die Blockgröße bleibt
+    zwischen min_rows und max_rows.
+    """
+
+    def __init__(self, rows, min_rows, max_rows, target_ack_ms, max_bytes=None):
+        super().__init__(max_rows=rows, max_bytes=max_bytes)
+        self.min_rows = min_rows
+        self.upper_rows = max_rows
+        self.target_ack_ms = target_ack_ms
+        self.lock = threading.Lock()
+
+    def record_ack(self, rows, seconds):
+        # Nur volle Blöcke aussagekräftig, der Rest am Dateiende ist meist kleiner
+        if rows < self.max_rows:
+            return
+        with self.lock:
+            if seconds * 1000 <= self.target_ack_ms:
+                new_rows = min(self.max_rows * 2, self.upper_rows)
+            else:
+                new_rows = max(self.max_rows // 2, self.min_rows)
+            if new_rows != self.max_rows:
+                logger.info(
+                    f"Batch size {self.max_rows} -> {new_rows} rows "
+                    f"(ack {seconds * 1000:.0f} ms, target {self.target_ack_ms} ms)"
+                )
+                self.max_rows = new_rows
+
+
+_policies = {}
+_policies_lock = threading.Lock()
+
+
+def get_batch_policy(file_path):
+    """
+    Liefert die Richtlinie für das Verzeichnis der Datei. const.BatchPolicyOverrides
+    überschreibt einzelne Werte aus const.BatchPolicy pro Eingangsverzeichnis. Die
+    Richtlinie wird pro Verzeichnis wiederverwendet, damit der adaptive Modus seinen
+    Zustand über mehrere Dateien hinweg behält.
+    """
+    directory = os.path.normcase(os.path.dirname(os.path.abspath(file_path)))
+    with _policies_lock:
+        policy = _policies.get(directory)
+        if policy is None:
+            config = dict(const.BatchPolicy)
+            for path, overrides in const.BatchPolicyOverrides.items():
+                if os.path.normcase(os.path.abspath(path)) == directory:
+                    config.update(overrides)
+            policy = BatchPolicy.from_config(config)
+            _policies[directory] = policy
+    return policy
@@ -0,0 +1,70 @@
+import contextlib
+import os
+import sqlite3
+import time
+from classes.loghandler import LogHandler
+
+log_handler = LogHandler(os.path.basename(__file__)[:-3])
+logger = log_handler.get_logger()
+
+
+class CheckpointStore:
+    """
+    Speichert pro Eingangsdatei den Byte-Offset hinter dem letzten bestätigten Block.
+
+    Die Datei wird über Inode, Größe und Änderungszeit identifiziert, sodass eine neue
+    Datei mit gleichem Namen nicht an einem alten Offset fortgesetzt wird. Jede Operation
+    öffnet eine eigene SQLite-Verbindung, damit die Klasse aus Worker-Threads und
+    -Prozessen gleichzeitig verwendet werden kann.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self.connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                "file_key TEXT PRIMARY KEY, path TEXT NOT NULL, "
+                "byte_offset INTEGER NOT NULL, batch INTEGER NOT NULL, "
+                "updated REAL NOT NULL)"
+            )
+
+    @contextlib.contextmanager
+    def connect(self):
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def file_key(file_path):
+        stat = os.stat(file_path)
+        return f"{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def get(self, file_key):
+        """Liefert (Byte-Offset, Anzahl bestätigter Blöcke), für neue Dateien (0, 0)."""
+        with self.connect() as connection:
+            row = connection.execute(
+                "SELECT byte_offset, batch FROM checkpoints WHERE file_key = ?",
+                (file_key,),
+            ).fetchone()
+        return row if row else (0, 0)
+
+    def save(self, file_key, file_path, offset, batch):
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT INTO checkpoints (file_key, path, byte_offset, batch, updated) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (file_key) DO UPDATE SET "
+                "path = excluded.path, byte_offset = excluded.byte_offset, "
+                "batch = excluded.batch, updated = excluded.updated",
+                (file_key, file_path, offset, batch, time.time()),
+            )
+
+    def remove(self, file_key):
+        with self.connect() as connection:
+            connection.execute(
+                "DELETE FROM checkpoints WHERE file_key = ?", (file_key,)
+            )
@@ -13,3 +13,66 @@ CONFIG_PATH = ProjectPath + "/src/config/config.txt"
 
 python_executable = ProjectPath + "/OctoVenv/Scripts/python.exe"
 octo_client_path = ProjectPath + "/src/octoplug/octopyplug/octo_client.py"
+
+# Transport zum OctoServer: "protobuf" (typisierte Messwerte), "inprocess" (JSON über
+# gepoolte gRPC-Kanäle), "stream" (ein JSON-Nachrichtenstrom pro Datei) oder "subprocess"
+ClientTransport = "protobuf"
+ClientPoolSize = 4
+ClientTimeout = 30
+ClientRetries = 3
+RestClientPoolSize = 4  # gRPC-Kanäle des REST-Dienstes zum OctoServer
+RestRpcTimeout = 5  # Sekunden bis eine REST-Anfrage mit 504 abgebrochen wird
+RestWorkers = 4  # Worker-Prozesse der ASGI-Variante (rest_service.octoplugasgi)
+RestBatchWindowMs = 5  # Zeitfenster, in dem POST-Anfragen zu einem OctoMessage-Aufruf zusammengefasst werden
+RestBatchMaxRows = 5000  # Messwerte, ab denen ein Block sofort gesendet wird
+StreamAckInterval = 10  # Bestätigung nach jeweils N Stream-Nachrichten
+GroupCommitStatements = 100  # Stream-Daten spätestens nach N Anweisungen committen
+GroupCommitMs = 200  # ... oder wenn die älteste offene Anweisung so alt ist (ms)
+BackfillBatchRows = 500000  # Zeilen pro COPY-Transaktion beim Backfill
+SchemaWarmupTables = ["sensor"]  # Tabellen, deren Metadaten beim Serverstart geladen werden
+StatementCacheSize = 64  # Vorbereitete Anweisungen pro Datenbankverbindung, 0 = aus
+StreamItersize = 2000  # Zeilen pro Block beim Lesen über serverseitige Cursor
+AsyncMaxConcurrentRpcs = None  # Obergrenze gleichzeitiger RPCs im --async-Modus, None = unbegrenzt
+DataListenerWorkers = 4  # Anzahl paralleler Worker im datalistener
+DataListenerWorkerMode = "thread"  # "thread" oder "process"
+DataListenerQueueSize = 1000  # Wartende Dateien, ab denen der Observer blockiert
+DataListenerStatsInterval = 60  # Sekunden zwischen zwei Log-Ausgaben der Warteschlangenwerte
+DataListenerQuietPeriod = 2.0  # Sekunden ohne Größen-/Zeitänderung, nach denen eine Datei als fertig gilt
+DataListenerPollInterval = 0.5  # Prüfintervall der Stabilitätsprüfung in Sekunden
+MmapChunkBytes = 16 << 10  # Bytes pro geparstem Block beim Einlesen per mmap
+
+# Wann ein Block an den Server gesendet wird. mode: "rows" (feste Anzahl), "bytes"
+# (Nutzdatengröße), "latency" (spätestens latency_ms nach dem ersten Eintrag) oder
+# "adaptive" (wächst von rows bis max_rows, solange die Bestätigung unter target_ack_ms
+# bleibt). Einträge sind Zeilen, beim protobuf-Transport einzelne Messwerte. bytes
+# begrenzt in jedem Modus die Nachrichtengröße (gRPC-Standardlimit 4 MiB).
+BatchPolicy = {
+    "mode": "rows",
+    "rows": 1000,
+    "bytes": 3 << 20,
+    "latency_ms": 1000,
+    "min_rows": 100,
+    "max_rows": 50000,
+    "target_ack_ms": 250,
+}
+# Abweichende Werte pro Eingangsverzeichnis, z.B. {input_folder: {"mode": "adaptive"}}
+BatchPolicyOverrides = {}
+
+# Dauerhafter Zwischenspeicher zwischen datalistener und OctoServer (pids/spool.db)
+SpoolEnabled = True
+SpoolSendEntries = 50  # Höchstens so viele Spool-Einträge pro Sendevorgang
+SpoolSendBytes = 3 << 20  # Höchstens so viele Bytes pro zusammengeführter Nachricht
+SpoolRetryBase = 0.5  # Erste Wartezeit in Sekunden nach einem Fehlschlag, danach verdoppelt
+SpoolRetryMax = 60  # Längste Wartezeit zwischen zwei Versuchen in Sekunden
+SpoolMaxAttempts = 5  # Ablehnungen durch den Server, nach denen ein Eintrag nach dead_letter wandert
+
+# Lokale Ports der /metrics-Endpunkte je Prozess, 0 deaktiviert den Endpunkt.
+# Die REST-API stellt /metrics auf ihrem eigenen Port bereit.
+MetricsPorts = {"datalistener": 9101, "octo_server": 9102}
+
+LogLevel = "INFO"  # "DEBUG" schreibt zusätzlich Rohdaten, JSON-Nutzdaten und SQL-Abfragen
+LogAsync = True  # Dateizugriffe über QueueHandler/QueueListener in einem Hintergrund-Thread
+LogRotation = "time"  # "time" (täglich um Mitternacht), "size" oder "none" (eine Datei pro Starttag)
+LogMaxBytes = 50 << 20  # Dateigröße für LogRotation = "size"
+LogBackupCount = 30  # Anzahl aufbewahrter rotierter Dateien
+RestartAtMidnight = False  # datalistener täglich neu starten; für die Log-Rotation nicht mehr nötig
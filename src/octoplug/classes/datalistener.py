@@ -11,6 +11,11 @@ import const as const
 import psutil
 from classes.loghandler import LogHandler
 from classes.sensorplug import SensorPlug  # Importieren Sie die SensorPlug-Klasse
+from classes.filequeue import FileWorkQueue
+from classes.filereadiness import ReadinessTracker
+from classes.checkpointstore import CheckpointStore
+from classes.spool import SpoolQueue, SpoolSender
+import classes.metrics as metrics
 
 try:
     if os.name == "nt":
@@ -40,6 +45,19 @@ elif setproctitle:
 # PID-Datei definieren
 PID_DIR = os.path.join(os.path.dirname(__file__), "pids")
 PID_FILE = os.path.join(PID_DIR, "datalistener.pid")
+CHECKPOINT_FILE = os.path.join(PID_DIR, "checkpoints.db")
+SPOOL_FILE = os.path.join(PID_DIR, "spool.db")
+
+# Fortschritt pro Datei, damit nach Absturz oder Neustart nicht von vorne begonnen wird
+checkpoints = CheckpointStore(CHECKPOINT_FILE)
+
+# Geparste Blöcke werden dauerhaft zwischengespeichert und vom SpoolSender zugestellt,
+# auf Modulebene, damit auch Worker-Prozesse in den Spool schreiben
+spool = SpoolQueue(SPOOL_FILE) if const.SpoolEnabled else None
+SensorPlug.spool = spool
+
+# Warteschlange, über die Observer und Startscan Dateien an die Worker übergeben
+work_queue = None
 
 
 def check_if_running():
@@ -104,13 +122,36 @@ def move_to_archive(file_path):
 class FileHandler(FileSystemEventHandler):
     """
     Behandelt Dateisystem-Events, die von einem Watchdog-Observer erfasst werden.
+    Neue Dateien werden erst nach dem Schließen, dem Verschieben ins Verzeichnis oder
+    dem Ablauf der Ruhezeit des ReadinessTracker verarbeitet.
     """
 
+    def __init__(self, tracker, directory):
+        super().__init__()
+        self.tracker = tracker
+        self.directory = os.path.abspath(directory)
+
     def on_created(self, event):
         if event.is_directory:
             return
         logger.info(f"New file detected: {event.src_path}")
-        process_file(event.src_path)
+        self.tracker.watch(event.src_path)
+
+    def on_closed(self, event):
+        if event.is_directory:
+            return
+        logger.info(f"File closed after writing: {event.src_path}")
+        self.tracker.mark_ready(event.src_path)
+
+    def on_moved(self, event):
+        if event.is_directory:
+            return
+        self.tracker.forget(event.src_path)
+        # Nur Dateien, die innerhalb des überwachten Verzeichnisses landen, z.B. nach
+        # dem Umbenennen einer temporären Datei; das Archivieren verschiebt nach außen
+        if os.path.dirname(os.path.abspath(event.dest_path)) == self.directory:
+            logger.info(f"File moved into place: {event.dest_path}")
+            self.tracker.mark_ready(event.dest_path)
 
 
 def process_file(file_path):
@@ -118,40 +159,38 @@ def process_file(file_path):
     Verarbeitet die neu erstellte Datei, konvertiert deren Inhalt und sendet ihn an einen externen Prozess.
     """
     logger.info(f"Processing file: {file_path}")
+    if not os.path.isfile(file_path):
+        # Bereits verarbeitet und archiviert, z.B. nach einem erneuten on_closed
+        logger.info(f"Skipping missing file: {file_path}")
+        return
     if not wait_for_file_access(file_path):
         logger.error(f"Failed to access file {file_path}: Permission denied")
         return
 
     try:
-        SensorPlug.process_file(
-            file_path
-        )  # Übergabe der Datei zur Verarbeitung an SensorPlug
+        file_key = checkpoints.file_key(file_path)
+        # Übergabe der Datei zur Verarbeitung an SensorPlug
+        if not SensorPlug.process_file(file_path, checkpoints):
+            # Datei bleibt liegen und wird beim nächsten Start ab dem Checkpoint fortgesetzt
+            logger.error(f"File not fully acknowledged, keeping it: {file_path}")
+            return
         logger.info(f"Finished processing file: {file_path}")
-
-        # Kurze Verzögerung einfügen, um sicherzustellen, dass die Datei nicht mehr verwendet wird
-        time.sleep(1)
         move_to_archive(file_path)
+        checkpoints.remove(file_key)
     except Exception as e:
         logger.error(f"Failed to process file {file_path}: {e}")
 
 
-def process_existing_files(directory):
+def process_existing_files(directory, tracker):
     """
-    Diese Funktion verarbeitet alle vorhandenen Dateien im Verzeichnis und überprüft dann,
-    ob während der Verarbeitung neue Dateien hinzugekommen sind.
-    Dies wird in einer Schleife wiederholt, bis keine neuen Dateien mehr gefunden werden.
-
+    Übergibt alle vorhandenen Dateien im Verzeichnis an den ReadinessTracker.
+    Der Observer läuft zu diesem Zeitpunkt bereits, sodass währenddessen hinzugekommene
+    Dateien über on_created erfasst werden. Doppelt gemeldete Pfade verwirft die Warteschlange.
     """
-    while True:
-        files_processed = False
-        for file_name in os.listdir(directory):
-            file_path = os.path.join(directory, file_name)
-            if os.path.isfile(file_path):
-                process_file(file_path)
-                files_processed = True
-
-        if not files_processed:
-            break
+    for file_name in sorted(os.listdir(directory)):
+        file_path = os.path.join(directory, file_name)
+        if os.path.isfile(file_path):
+            tracker.submit_existing(file_path)
 
 
 def restart_program():
@@ -161,7 +200,12 @@ def restart_program():
     """
     try:
         logger.info("Restarting the program...")
+        # Bereits eingereihte Dateien abarbeiten, damit keine Datei halb verarbeitet zurückbleibt
+        if work_queue is not None:
+            work_queue.stop()
         remove_pid_file()
+        # os.execl überspringt atexit, daher die Log-Warteschlange vorher leeren
+        LogHandler.shutdown()
         python = sys.executable
         os.execl(python, python, *sys.argv)
     except Exception as e:
@@ -186,23 +230,73 @@ def schedule_restart_at_midnight():
 if __name__ == "__main__":
     check_if_running()
 
-    # Verarbeite vorhandene Dateien im Verzeichnis
-    process_existing_files(const.input_folder)
-
-    # Plane den Neustart um Mitternacht, unteranderem ist es nötig damit die Logs neu erstellt werden mit der richtige Datum
-    schedule_restart_at_midnight()
+    work_queue = FileWorkQueue(
+        process_file,
+        workers=const.DataListenerWorkers,
+        max_size=const.DataListenerQueueSize,
+        mode=const.DataListenerWorkerMode,
+    )
+    work_queue.start()
+    metrics.gauge(
+        "octoplug_queue_depth", "Files waiting in the datalistener work queue."
+    ).set_function(work_queue.queue.qsize)
+    metrics.gauge(
+        "octoplug_queue_active", "Files currently being processed."
+    ).set_function(lambda: work_queue.active)
+    sender = None
+    if spool is not None:
+        sender = SpoolSender(
+            spool,
+            SensorPlug.send_spooled,
+            batch_entries=const.SpoolSendEntries,
+            batch_bytes=const.SpoolSendBytes,
+            base_backoff=const.SpoolRetryBase,
+            max_backoff=const.SpoolRetryMax,
+            max_attempts=const.SpoolMaxAttempts,
+        )
+        sender.start()
+        metrics.gauge(
+            "octoplug_spool_depth", "Entries waiting in the durable spool."
+        ).set_function(lambda: spool.stats()["depth"])
+        metrics.gauge(
+            "octoplug_spool_oldest_age_seconds", "Age of the oldest spooled entry."
+        ).set_function(lambda: spool.stats()["oldest_age"])
+    metrics.start_http_server(const.MetricsPorts.get("datalistener"))
+    tracker = ReadinessTracker(
+        work_queue.submit,
+        quiet_period=const.DataListenerQuietPeriod,
+        poll_interval=const.DataListenerPollInterval,
+    )
+    tracker.start()
 
-    event_handler = FileHandler()
+    event_handler = FileHandler(tracker, const.input_folder)
     observer = Observer()
     observer.schedule(event_handler, const.input_folder, recursive=False)
     observer.start()
     logger.info(f"Monitoring directory: {const.input_folder}")
 
+    # Verarbeite vorhandene Dateien im Verzeichnis
+    process_existing_files(const.input_folder, tracker)
+
+    # Die Logs rotieren selbst um Mitternacht, der tägliche Neustart ist nur noch optional
+    if const.RestartAtMidnight:
+        schedule_restart_at_midnight()
+
     try:
+        last_stats = time.time()
         while True:
             time.sleep(1)
+            if time.time() - last_stats >= const.DataListenerStatsInterval:
+                logger.info(f"Queue stats: {work_queue.stats()}")
+                if spool is not None:
+                    logger.info(f"Spool stats: {spool.stats()}")
+                last_stats = time.time()
     except KeyboardInterrupt:
         logger.info("Monitoring stopped by user")
         observer.stop()
     observer.join()
+    tracker.stop()
+    work_queue.stop()
+    if sender is not None:
+        sender.stop()
     remove_pid_file()
@@ -0,0 +1,151 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from classes.loghandler import LogHandler
+import classes.metrics as metrics
+
+log_handler = LogHandler(os.path.basename(__file__)[:-3])
+logger = log_handler.get_logger()
+
+# Markiert das Ende der Warteschlange für die Worker-Threads
+_STOP = object()
+
+FILE_SECONDS = metrics.histogram(
+    "octoplug_file_seconds",
+    "Time from file detection until processing and archiving finished.",
+)
+FILES_PROCESSED = metrics.counter(
+    "octoplug_files_total", "Files handled by the worker pool.", ("result",)
+)
+
+
+class FileWorkQueue:
+    """
+    Begrenzte Warteschlange für eingehende Dateien, die von einem Worker-Pool abgearbeitet wird.
+
+    submit blockiert, sobald max_size Dateien warten, und bremst damit den Aufrufer
+    (Watchdog-Observer oder Startscan) aus. Ein Pfad, der bereits wartet oder gerade
+    verarbeitet wird, wird kein zweites Mal eingereiht.
+
+    Im Modus "thread" ruft jeder Worker-Thread den Handler direkt auf, im Modus "process"
+    reicht er die Datei an einen ProcessPoolExecutor gleicher Größe weiter. Der Handler
+    muss dann eine Funktion auf Modulebene sein, damit er serialisiert werden kann.
+    """
+
+    def __init__(self, handler, workers=4, max_size=1000, mode="thread"):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unsupported worker mode: {mode}")
+        self.handler = handler
+        self.workers = workers
+        self.mode = mode
+        self.queue = queue.Queue(maxsize=max_size)
+        # Pfad -> monotoner Zeitpunkt der Erkennung
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.threads = []
+        self.executor = None
+        self.submitted = 0
+        self.duplicates = 0
+        self.processed = 0
+        self.failed = 0
+        self.active = 0
+        self.max_depth = 0
+
+    def start(self):
+        if self.mode == "process":
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self.work, name=f"filequeue-{i}", daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+        logger.info(
+            f"Started {self.workers} {self.mode} workers, queue size {self.queue.maxsize}"
+        )
+
+    def submit(self, file_path, detected_at=None):
+        """
+        Reiht eine Datei ein und gibt False zurück, wenn sie bereits eingereiht ist.
+        Blockiert, solange die Warteschlange voll ist. detected_at ist der monotone
+        Zeitpunkt, zu dem die Datei erkannt wurde, und dient der Laufzeitmessung.
+        """
+        file_path = os.path.abspath(file_path)
+        with self.lock:
+            if file_path in self.pending:
+                self.duplicates += 1
+                return False
+            self.pending[file_path] = (
+                time.monotonic() if detected_at is None else detected_at
+            )
+            self.submitted += 1
+        if self.queue.full():
+            logger.warning(
+                f"Queue full ({self.queue.maxsize} files), waiting to enqueue {file_path}"
+            )
+        self.queue.put(file_path)
+        with self.lock:
+            self.max_depth = max(self.max_depth, self.queue.qsize())
+        return True
+
+    def work(self):
+        while True:
+            file_path = self.queue.get()
+            if file_path is _STOP:
+                self.queue.task_done()
+                return
+            with self.lock:
+                self.active += 1
+            try:
+                if self.executor is not None:
+                    self.executor.submit(self.handler, file_path).result()
+                else:
+                    self.handler(file_path)
+                with self.lock:
+                    self.processed += 1
+                FILES_PROCESSED.inc(result="ok")
+            except Exception as e:
+                logger.error(f"Worker failed on {file_path}: {e}")
+                with self.lock:
+                    self.failed += 1
+                FILES_PROCESSED.inc(result="failed")
+            finally:
+                with self.lock:
+                    self.active -= 1
+                    detected_at = self.pending.pop(file_path)
+                FILE_SECONDS.observe(time.monotonic() - detected_at)
+                self.queue.task_done()
+
+    def stats(self):
+        """Liefert Kennzahlen zur Warteschlange als Dictionary."""
+        with self.lock:
+            return {
+                "depth": self.queue.qsize(),
+                "max_depth": self.max_depth,
+                "capacity": self.queue.maxsize,
+                "active": self.active,
+                "submitted": self.submitted,
+                "duplicates": self.duplicates,
+                "processed": self.processed,
+                "failed": self.failed,
+            }
+
+    def join(self):
+        """Wartet, bis alle eingereihten Dateien verarbeitet sind."""
+        self.queue.join()
+
+    def stop(self, wait=True):
+        """
+        Beendet die Worker, nachdem die bereits eingereihten Dateien abgearbeitet sind.
+        """
+        for _ in self.threads:
+            self.queue.put(_STOP)
+        if wait:
+            for thread in self.threads:
+                thread.join()
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait)
+        self.threads = []
+        logger.info(f"Stopped workers: {self.stats()}")
@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from classes.loghandler import LogHandler
+
+log_handler = LogHandler(os.path.basename(__file__)[:-3])
+logger = log_handler.get_logger()
+
+
+class ReadinessTracker:
+    """
+    Entscheidet, wann eine neu angelegte Datei vollständig geschrieben ist.
+
+    Bevorzugt werden die Watchdog-Events on_closed (inotify IN_CLOSE_WRITE) und on_moved
+    (atomares Umbenennen ins Verzeichnis), die mark_ready direkt auslösen. Für Plattformen
+    ohne diese Events oder Erzeuger, die die Datei nicht sauber schließen, prüft ein
+    Hintergrund-Thread Größe und Änderungszeit: Bleiben beide quiet_period Sekunden
+    unverändert, gilt die Datei als fertig.
+
+    on_ready wird mit dem Pfad und dem monotonen Zeitpunkt der ersten Erkennung aufgerufen.
+    """
+
+    def __init__(self, on_ready, quiet_period=2.0, poll_interval=0.5):
+        self.on_ready = on_ready
+        self.quiet_period = quiet_period
+        self.poll_interval = poll_interval
+        # Pfad -> (Größe, Änderungszeit, letzte beobachtete Änderung, erste Erkennung)
+        self.tracked = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(
+            target=self.poll, name="filereadiness", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def watch(self, file_path):
+        """Beobachtet eine Datei, bis sie als fertig gemeldet oder als stabil erkannt wird."""
+        file_path = os.path.abspath(file_path)
+        stat = self.stat(file_path)
+        if stat is None:
+            return
+        with self.lock:
+            if file_path not in self.tracked:
+                now = time.monotonic()
+                self.tracked[file_path] = (*stat, now, now)
+
+    def mark_ready(self, file_path):
+        """Meldet eine Datei sofort als fertig, z.B. nach on_closed oder on_moved."""
+        file_path = os.path.abspath(file_path)
+        with self.lock:
+            entry = self.tracked.pop(file_path, None)
+        self.on_ready(file_path, entry[3] if entry else time.monotonic())
+
+    def submit_existing(self, file_path):
+        """
+        Übergibt eine beim Start vorgefundene Datei. Ist sie seit quiet_period Sekunden
+        unverändert, wird sie sofort übergeben, sonst weiter beobachtet.
+        """
+        stat = self.stat(file_path)
+        if stat is None:
+            return
+        if time.time() - stat[1] >= self.quiet_period:
+            self.mark_ready(file_path)
+        else:
+            self.watch(file_path)
+
+    def forget(self, file_path):
+        with self.lock:
+            self.tracked.pop(os.path.abspath(file_path), None)
+
+    @staticmethod
+    def stat(file_path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime
+
+    def poll(self):
+        while not self.stop_event.wait(self.poll_interval):
+            now = time.monotonic()
+            ready = []
+            with self.lock:
+                items = list(self.tracked.items())
+            for file_path, (size, mtime, changed_at, detected_at) in items:
+                stat = self.stat(file_path)
+                with self.lock:
+                    if file_path not in self.tracked:
+                        continue
+                    if stat is None:
+                        # Datei wurde gelöscht oder verschoben
+                        del self.tracked[file_path]
+                    elif stat != (size, mtime):
+                        self.tracked[file_path] = (*stat, now, detected_at)
+                    elif now - changed_at >= self.quiet_period:
+                        del self.tracked[file_path]
+                        ready.append((file_path, detected_at))
+            for file_path, detected_at in ready:
+                logger.info(f"File stable for {self.quiet_period}s: {file_path}")
+                self.on_ready(file_path, detected_at)
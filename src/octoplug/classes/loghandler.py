@@ -1,29 +1,233 @@
+import atexit
 import logging
+import logging.handlers
 import os
 import datetime
+import queue
+import threading
 import classes.const as const
 
 
+class _DispatchHandler(logging.Handler):
+    """
+    Verteilt die Einträge aus der gemeinsamen Warteschlange an die Datei- und
+    Konsolen-Handler des jeweiligen Loggers.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.targets = {}
+
+    def add_target(self, log_name, handler):
+        self.targets.setdefault(log_name, []).append(handler)
+
+    def handle(self, record):
+        for handler in self.targets.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def emit(self, record):
+        self.handle(record)
+
+    def close(self):
+        for handlers in self.targets.values():
+            for handler in handlers:
+                handler.close()
+        super().close()
+
+
+class _ParentRotationMixin:
+    """
+    Rotiert nur im Prozess, der den Handler angelegt hat. Nach einem fork schreiben die
+    Worker-Prozesse nur noch und öffnen die Datei neu, sobald der Elternprozess sie
+    rotiert hat. Sonst rotiert jeder Worker selbst und kann dabei die gerade rotierte
+    Datei eines anderen löschen.
+    """
+
+    follow_only = False
+
+    def shouldRollover(self, record):
+        if self.follow_only:
+            self.reopen_if_rotated()
+            return False
+        return super().shouldRollover(record)
+
+    def reopen_if_rotated(self):
+        if self.stream is None:
+            return
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            current = None
+        opened = os.fstat(self.stream.fileno())
+        if current is None or (current.st_dev, current.st_ino) != (
+            opened.st_dev,
+            opened.st_ino,
+        ):
+            self.stream.close()
+            self.stream = self._open()
+
+
+class _DatedRotatingFileHandler(
+    _ParentRotationMixin, logging.handlers.TimedRotatingFileHandler
+):
+    """
+    Tägliche Rotation, die rotierte Dateien wie bisher als <name>_<datum>.log ablegt.
+    getFilesToDelete sucht nach diesem Muster, die Vorlage erkennt nur <name>.log.<datum>.
+    """
+
+    def __init__(self, filename, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.namer = self.rotated_name
+
+    def rotated_name(self, default_name):
+        suffix = default_name.rsplit(".", 1)[-1]
+        return f"{self.baseFilename[:-4]}_{suffix}.log"
+
+    def getFilesToDelete(self):
+        dir_name, base_name = os.path.split(self.baseFilename)
+        prefix = f"{base_name[:-4]}_"
+        rotated = sorted(
+            os.path.join(dir_name, file_name)
+            for file_name in os.listdir(dir_name)
+            if file_name.startswith(prefix)
+            and file_name.endswith(".log")
+            and self.extMatch.match(file_name[len(prefix) : -4])
+        )
+        if len(rotated) <= self.backupCount:
+            return []
+        return rotated[: len(rotated) - self.backupCount]
+
+
+class _SizeRotatingFileHandler(
+    _ParentRotationMixin, logging.handlers.RotatingFileHandler
+):
+    pass
+
+
 class LogHandler:
-    def __init__(self, log_name, show_in_console=False):
+    """
+    Richtet einen Logger mit Datei- und optionaler Konsolenausgabe ein.
+
+    Mit const.LogAsync schreibt der Logger nur in eine Warteschlange, ein gemeinsamer
+    QueueListener-Thread übernimmt die Dateizugriffe. const.LogRotation wählt zwischen
+    täglicher Rotation um Mitternacht ("time"), Rotation nach Größe ("size") und einer
+    Datei pro Starttag ohne Rotation ("none", bisheriges Verhalten).
+    """
+
+    _queue = None
+    _listener = None
+    _dispatcher = None
+    _queue_handlers = []
+    _rotating_handlers = []
+    _fork_hook = False
+    _lock = threading.Lock()
+
+    def __init__(self, log_name, show_in_console=False, log_dir=None):
         self.logger = logging.getLogger(log_name)
-        self.logger.setLevel(logging.INFO)
+        self.logger.setLevel(const.LogLevel)
         if not self.logger.handlers:  # Überprüfe, ob der Logger bereits Handler hat
-            self.log_dir = const.LogPath
+            self.log_dir = log_dir or const.LogPath
             self.setup_logger(log_name, show_in_console)
 
     def setup_logger(self, log_name, show_in_console):
         formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-        current_datetime = datetime.datetime.now().strftime("%Y-%m-%d")
-        log_filename = os.path.join(self.log_dir, f"{log_name}_{current_datetime}.log")
-        file_handler = logging.FileHandler(log_filename)
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
-
+        handlers = [self.create_file_handler(log_name)]
         if show_in_console:
-            console_handler = logging.StreamHandler()
-            console_handler.setFormatter(formatter)
-            self.logger.addHandler(console_handler)
+            handlers.append(logging.StreamHandler())
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        if const.LogAsync:
+            dispatcher = self.get_dispatcher()
+            for handler in handlers:
+                dispatcher.add_target(log_name, handler)
+            queue_handler = logging.handlers.QueueHandler(LogHandler._queue)
+            LogHandler._queue_handlers.append(queue_handler)
+            self.logger.addHandler(queue_handler)
+        else:
+            for handler in handlers:
+                self.logger.addHandler(handler)
+
+    def create_file_handler(self, log_name):
+        if const.LogRotation == "time":
+            handler = _DatedRotatingFileHandler(
+                os.path.join(self.log_dir, f"{log_name}.log"),
+                when="midnight",
+                backupCount=const.LogBackupCount,
+            )
+        elif const.LogRotation == "size":
+            handler = _SizeRotatingFileHandler(
+                os.path.join(self.log_dir, f"{log_name}.log"),
+                maxBytes=const.LogMaxBytes,
+                backupCount=const.LogBackupCount,
+            )
+        else:
+            current_datetime = datetime.datetime.now().strftime("%Y-%m-%d")
+            return logging.FileHandler(
+                os.path.join(self.log_dir, f"{log_name}_{current_datetime}.log")
+            )
+        LogHandler.register_fork_hook()
+        LogHandler._rotating_handlers.append(handler)
+        return handler
+
+    @staticmethod
+    def register_fork_hook():
+        with LogHandler._lock:
+            if not LogHandler._fork_hook and hasattr(os, "register_at_fork"):
+                os.register_at_fork(after_in_child=LogHandler.after_fork)
+                LogHandler._fork_hook = True
+
+    @staticmethod
+    def after_fork():
+        """Im Kindprozess: eigener Listener, Rotation bleibt dem Elternprozess überlassen."""
+        LogHandler._lock = threading.Lock()
+        for handler in LogHandler._rotating_handlers:
+            handler.follow_only = True
+        LogHandler.restart_listener()
+
+    @staticmethod
+    def get_dispatcher():
+        """
+        Startet beim ersten Aufruf die gemeinsame Warteschlange samt Listener-Thread.
+        Bewusst über LogHandler statt cls, damit Unterklassen dieselbe Warteschlange nutzen.
+        """
+        with LogHandler._lock:
+            if LogHandler._listener is None:
+                LogHandler._queue = queue.SimpleQueue()
+                LogHandler._dispatcher = _DispatchHandler()
+                LogHandler._listener = logging.handlers.QueueListener(
+                    LogHandler._queue, LogHandler._dispatcher
+                )
+                LogHandler._listener.start()
+                atexit.register(LogHandler.shutdown)
+        # Threads überleben fork nicht, Worker-Prozesse brauchen einen eigenen Listener
+        LogHandler.register_fork_hook()
+        return LogHandler._dispatcher
+
+    @staticmethod
+    def restart_listener():
+        """
+        Startet im Kindprozess einen eigenen Listener auf einer neuen Warteschlange, damit
+        vom Elternprozess noch nicht geschriebene Einträge nicht doppelt landen.
+        """
+        if LogHandler._listener is not None:
+            LogHandler._queue = queue.SimpleQueue()
+            for queue_handler in LogHandler._queue_handlers:
+                queue_handler.queue = LogHandler._queue
+            LogHandler._listener = logging.handlers.QueueListener(
+                LogHandler._queue, LogHandler._dispatcher
+            )
+            LogHandler._listener.start()
+
+    @staticmethod
+    def shutdown():
+        """Schreibt alle noch wartenden Einträge und beendet den Listener-Thread."""
+        with LogHandler._lock:
+            if LogHandler._listener is not None:
+                LogHandler._listener.stop()
+                LogHandler._dispatcher.close()
+                LogHandler._listener = None
 
     def get_logger(self):
         return self.logger
@@ -0,0 +1,99 @@
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from classes.sensorparser import SensorColumns, SensorParser
+
+_BOM = b"\xef\xbb\xbf"
+
+
+class MappedFile:
+    """
+    Bildet eine Datei schreibgeschützt in den Speicher ab und zerlegt sie an Zeilengrenzen.
+
+    Bereiche werden als (start, end)-Offsets geliefert und direkt auf dem mmap geparst,
+    es werden keine Kopien der Datei angelegt. Ein UTF-8-BOM am Dateianfang wird
+    übersprungen; CRLF-Zeilenenden behandelt der Parser.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.file = None
+        self.buffer = b""
+        self.start = 0
+
+    def __enter__(self):
+        self.file = open(self.file_path, "rb")
+        # Leere Dateien lassen sich nicht abbilden
+        if os.fstat(self.file.fileno()).st_size > 0:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.buffer[: len(_BOM)] == _BOM:
+                self.start = len(_BOM)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self.buffer = b""
+        self.file.close()
+        self.file = None
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def line_end(self, offset):
+        """Liefert den Offset hinter dem nächsten Zeilenumbruch ab offset bzw. das Dateiende."""
+        if offset >= len(self.buffer):
+            return len(self.buffer)
+        position = self.buffer.find(b"\n", offset)
+        return len(self.buffer) if position == -1 else position + 1
+
+    def chunks(self, chunk_size, start=None, end=None):
+        """
+        Liefert aufeinanderfolgende Bereiche (start, end) von etwa chunk_size Bytes, die
+        jeweils an einer Zeilengrenze enden.
+        """
+        position = self.start if start is None else max(start, self.start)
+        end = len(self.buffer) if end is None else end
+        while position < end:
+            chunk_end = min(self.line_end(position + chunk_size - 1), end)
+            yield position, chunk_end
+            position = chunk_end
+
+    def split(self, parts):
+        """Teilt die Datei in höchstens parts etwa gleich große Bereiche an Zeilengrenzen."""
+        size = len(self.buffer) - self.start
+        if size <= 0:
+            return []
+        step = max(1, -(-size // parts))
+        return list(self.chunks(step))
+
+    def parse(self, start, end, parser=None):
+        """Parst einen Bereich der abgebildeten Datei."""
+        return (parser or SensorParser()).parse(self.buffer, start, end)
+
+
+def parse_range(file_path, start, end):
+    """Parst einen Byte-Bereich einer Datei; läuft in einem eigenen Prozess."""
+    with MappedFile(file_path) as mapped:
+        return mapped.parse(start, end)
+
+
+def parse_parallel(file_path, workers):
+    """
+    Teilt eine große Datei in workers Bereiche und parst diese parallel in eigenen Prozessen.
+    Jeder Prozess bildet die Datei selbst ab, übertragen werden nur die Ergebnis-Spalten.
+    """
+    with MappedFile(file_path) as mapped:
+        ranges = mapped.split(workers)
+    columns = SensorColumns()
+    if len(ranges) <= 1:
+        for start, end in ranges:
+            columns.extend(parse_range(file_path, start, end))
+        return columns
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = [
+            executor.submit(parse_range, file_path, start, end) for start, end in ranges
+        ]
+        for part in parts:
+            columns.extend(part.result())
+    return columns
@@ -1,10 +1,13 @@
 from classes.base.autopersistent import AutoPersistent
-from datetime import datetime as dt
+from classes.base.autopersistentrecord import AutoPersistentRecord
+from datetime import datetime as dt, timedelta
 from typing import List, Type
 import json
 
 
 class sensor(AutoPersistent):
+    # Spalten der Tupel aus rows_from_detailed_json und rows_from_readings
+    ROW_COLUMNS = ("STANDORTID", "TEMPERATURE", "NA_DAT")
 
     def __init__(
         self,
@@ -68,8 +71,24 @@ class sensor(AutoPersistent):
 
     @classmethod
     def from_detailed_json(cls, json_string: str) -> List["sensor"]:
+        return [cls.from_row(row) for row in cls.rows_from_detailed_json(json_string)]
+
+    @classmethod
+    def from_readings(cls, readings) -> List["sensor"]:
+        """Erstellt Sensor-Objekte direkt aus octo_pb2.SensorReading-Nachrichten."""
+        return [cls.from_row(row) for row in cls.rows_from_readings(readings)]
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "sensor":
+        sensor = cls()
+        sensor.populate_from_dict(dict(zip(cls.ROW_COLUMNS, row)))
+        return sensor
+
+    @classmethod
+    def rows_from_detailed_json(cls, json_string: str) -> List[tuple]:
+        """Liefert die Messwerte als Tupel in der Reihenfolge von ROW_COLUMNS, ohne Objekte zu erzeugen."""
         data = json.loads(json_string)
-        sensors = []
+        rows = []
 
         if not isinstance(data, dict):
             raise ValueError("JSON must represent a dictionary of objects")
@@ -79,17 +98,28 @@ class sensor(AutoPersistent):
                 raise ValueError("Each entry in the JSON must be a list of objects")
 
             for item in items:
-                sensor_data = {
-                    "STANDORTID": item["STANDORTID"],
-                    "TEMPERATURE": item["grad"],
-                    "NA_DAT": f"{item['datum']} {item['zeit']}",
-                    # "AE_DAT": item.get("AE_DAT"),
-                }
-                sensor = cls()
-                sensor.populate_from_dict(sensor_data)
-                sensors.append(sensor)
-
-        return sensors
+                rows.append(
+                    (
+                        item["STANDORTID"],
+                        item["grad"],
+                        f"{item['datum']} {item['zeit']}",
+                    )
+                )
+
+        return rows
+
+    @classmethod
+    def rows_from_readings(cls, readings) -> List[tuple]:
+        """Liefert octo_pb2.SensorReading-Nachrichten als Tupel in der Reihenfolge von ROW_COLUMNS."""
+        epoch = dt(1970, 1, 1)
+        return [
+            (
+                reading.standort_id,
+                reading.temperature,
+                epoch + timedelta(seconds=reading.timestamp),
+            )
+            for reading in readings
+        ]
 
     # def from_detailed_json(cls, json_string: str) -> List["sensor"]:
     #     data = json.loads(json_string)
@@ -131,3 +161,25 @@ class sensor(AutoPersistent):
     #         sensors.append(sensor)
 
     #     return sensors
+
+
+class sensorrecord(AutoPersistentRecord):
+    __slots__ = ("ID", "STANDORTID", "TEMPERATURE", "NA_DAT", "AE_DAT")
+    COLUMNS = __slots__
+
+    def __init__(
+        self,
+        ID: int = None,
+        STANDORTID: int = None,
+        TEMPERATURE: float = None,
+        NA_DAT: dt = None,
+        AE_DAT: dt = None,
+    ):
+        self.ID = ID
+        self.STANDORTID = STANDORTID
+        self.TEMPERATURE = TEMPERATURE
+        self.NA_DAT = NA_DAT
+        self.AE_DAT = AE_DAT
+
+    def get_persistent_class(self):
+        return sensor
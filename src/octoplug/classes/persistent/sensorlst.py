@@ -1,15 +1,18 @@
 from classes.base.autopersistentlist import AutoPersistentLst
-from classes.persistent.sensor import sensor
+from classes.persistent.sensor import sensor, sensorrecord
 
 
 class sensorlst(AutoPersistentLst):
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, columnar=False):
+        super().__init__(columnar)
 
     def get_persistent_class(self):
         return sensor
 
+    def get_record_class(self):
+        return sensorrecord
+
     def add(self, sensor):
         self.add(sensor)
 
@@ -0,0 +1,145 @@
+import calendar
+import os
+import re
+import time as clock_time
+from array import array
+from datetime import date, time
+from classes.loghandler import LogHandler
+import classes.metrics as metrics
+
+# Konfiguriere das Logging
+log_handler = LogHandler(os.path.basename(__file__)[:-3])
+logger = log_handler.get_logger()
+
+PARSE_SECONDS = metrics.histogram(
+    "octoplug_parse_seconds", "Time to parse one block of sensor lines."
+)
+PARSE_LINE_SECONDS = metrics.histogram(
+    "octoplug_parse_line_seconds",
+    "Average parse time per line within a block.",
+    buckets=(1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 1e-3),
+)
+PARSED_LINES = metrics.counter(
+    "octoplug_parsed_lines_total", "Parsed sensor lines by result.", ("result",)
+)
+
+# Nicht leere Zeile; UTF-8-Folgebytes enthalten nie \n, daher ist die Trennung auf Bytes sicher
+_LINE_SCAN_RE = re.compile(rb"[^\n]+")
+# datum|zeit|{messwerte}, optional mit \r am Zeilenende
+_LINE_RE = re.compile(rb"([^|]*)\|([^|]*)\|\{([^{}]*)\}\s*")
+# 'standortid': temperatur bzw. "standortid": temperatur
+_PAIR = rb"""\s*['"](-?\d+)['"]\s*:\s*['"]?(-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)['"]?\s*"""
+_PAIR_RE = re.compile(_PAIR)
+_BODY_RE = re.compile(rb"(?:%s(?:,%s)*)?\s*" % (_PAIR, _PAIR))
+
+
+class SensorColumns:
+    """
+    Messwerte in Spaltenform: STANDORTID, Temperatur und Messzeitpunkt als Unix-Zeit in
+    Sekunden (UTC-naiv wie SensorReading.timestamp).
+
+    Die Spalten sind array.array-Objekte und unterstützen das Buffer-Protokoll, sodass
+    sie bei Bedarf ohne Kopie mit numpy.frombuffer weiterverarbeitet werden können.
+    """
+
+    __slots__ = ("standort_ids", "temperatures", "timestamps")
+
+    def __init__(self):
+        self.standort_ids = array("i")
+        self.temperatures = array("d")
+        self.timestamps = array("q")
+
+    def __len__(self):
+        return len(self.standort_ids)
+
+    def extend(self, other):
+        self.standort_ids.extend(other.standort_ids)
+        self.temperatures.extend(other.temperatures)
+        self.timestamps.extend(other.timestamps)
+
+    def rows(self):
+        """Liefert die Messwerte zeilenweise als Tupel (STANDORTID, Temperatur, Unix-Zeit)."""
+        return zip(self.standort_ids, self.temperatures, self.timestamps)
+
+
+class SensorParser:
+    """
+    Zerlegt ganze Dateien bzw. Byte-Blöcke des Formats datum|zeit|{json} in einem Durchlauf.
+
+    Im Gegensatz zu SensorPlug.convert wird weder json.loads noch str.replace pro Zeile
+    ausgeführt; die Messwerte werden per regulärem Ausdruck direkt aus den Bytes gelesen
+    und der Tagesanteil der Zeitstempel wird pro Datum nur einmal berechnet.
+    """
+
+    def __init__(self):
+        self.day_cache = {}
+
+    def parse(self, data, start=0, end=None):
+        """
+        Zerlegt einen Byte-Block aus vollständigen Zeilen und gibt SensorColumns zurück.
+        Fehlerhafte Zeilen werden protokolliert und übersprungen.
+
+        data kann bytes oder ein beliebiges Buffer-Objekt wie ein mmap sein; mit start und
+        end wird nur der angegebene Bereich gelesen, ohne ihn vorher herauszukopieren.
+        """
+        columns = SensorColumns()
+        standort_ids = columns.standort_ids
+        temperatures = columns.temperatures
+        timestamps = columns.timestamps
+        line_match = _LINE_RE.fullmatch
+        body_match = _BODY_RE.fullmatch
+        find_pairs = _PAIR_RE.findall
+        if end is None:
+            end = len(data)
+        started = clock_time.perf_counter()
+        lines = errors = 0
+        for line_scan in _LINE_SCAN_RE.finditer(data, start, end):
+            line = line_scan.group()
+            if not line.strip():
+                continue
+            lines += 1
+            match = line_match(line)
+            try:
+                if match is None:
+                    raise ValueError(
+                        f"Line does not contain exactly 3 parts: {line.decode(errors='replace')}"
+                    )
+                datum, zeit, body = match.groups()
+                if body_match(body) is None:
+                    raise ValueError(
+                        f"Invalid measurements: {body.decode(errors='replace')}"
+                    )
+                pairs = find_pairs(body)
+                timestamp = self.to_timestamp(datum, zeit)
+            except ValueError as e:
+                logger.error(f"Error parsing line: {line.decode(errors='replace')}")
+                logger.error(f"Exception: {e}")
+                errors += 1
+                continue
+            for sensor_id, temperature in pairs:
+                standort_ids.append(int(sensor_id))
+                temperatures.append(float(temperature))
+                timestamps.append(timestamp)
+        elapsed = clock_time.perf_counter() - started
+        PARSE_SECONDS.observe(elapsed)
+        if lines:
+            PARSE_LINE_SECONDS.observe(elapsed / lines)
+            PARSED_LINES.inc(lines - errors, result="ok")
+        if errors:
+            PARSED_LINES.inc(errors, result="error")
+        return columns
+
+    def parse_file(self, file_path):
+        """Liest eine Datei vollständig ein und zerlegt sie mit parse."""
+        with open(file_path, "rb") as file:
+            return self.parse(file.read())
+
+    def to_timestamp(self, datum, zeit):
+        day = self.day_cache.get(datum)
+        if day is None:
+            day = calendar.timegm(
+                date.fromisoformat(datum.decode().strip()).timetuple()
+            )
+            self.day_cache[datum] = day
+        clock = time.fromisoformat(zeit.decode().strip())
+        return day + clock.hour * 3600 + clock.minute * 60 + clock.second
@@ -1,16 +1,34 @@
+import calendar
 import json
 import os
 import subprocess
 import logging
+import time
+from datetime import datetime
+import grpc
 import const as const
 from classes.loghandler import LogHandler
+from classes.batchpolicy import get_batch_policy
+from classes.mmapreader import MappedFile
+from classes.sensorparser import SensorColumns
+from classes.spool import DeliveryError
+from octopyplug.octo_clientpool import OctoClientPool
+import octopyplug.octo_pb2 as octo_pb2
 
 
 # Konfiguriere das Logging
 log_handler = LogHandler(os.path.basename(__file__)[:-3])
 logger = log_handler.get_logger()
+# Fehler, nach denen derselbe Spool-Eintrag später erneut gesendet werden kann
+_TRANSIENT_STATUS_CODES = (
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+)
 
 class SensorPlug:
+    # Optionaler SpoolQueue; ist er gesetzt, werden Blöcke dort abgelegt statt direkt gesendet
+    spool = None
+
     @classmethod
     def convert(cls, line):
         try:
@@ -44,29 +62,169 @@ class SensorPlug:
             return None
 
     @classmethod
-    def process_file(cls, file_path):
+    def to_rows(cls, line):
+        """
+        Zerlegt eine Zeile in Tupel (STANDORTID, Temperatur, Messzeitpunkt).
+        """
+        try:
+            parts = line.split("|")
+            if len(parts) != 3:
+                raise ValueError(f"Line does not contain exactly 3 parts: {line}")
+
+            measured_at = datetime.fromisoformat(f"{parts[0]} {parts[1]}")
+            measurements = json.loads(parts[2].replace("'", '"'))
+            return [
+                (int(sensor_id), float(temperature), measured_at)
+                for sensor_id, temperature in measurements.items()
+            ]
+        except ValueError as e:
+            logger.error(f"Error parsing line: {line}")
+            logger.error(f"Exception: {e}")
+            return []
+
+    @classmethod
+    def to_readings(cls, line):
+        """
+        Zerlegt eine Zeile direkt in SensorReading-Nachrichten, ohne JSON zu erzeugen.
+        """
+        return [
+            octo_pb2.SensorReading(
+                standort_id=standort_id,
+                temperature=temperature,
+                timestamp=calendar.timegm(measured_at.timetuple()),
+            )
+            for standort_id, temperature, measured_at in cls.to_rows(line)
+        ]
+
+    @classmethod
+    def iter_rows(cls, file_path):
+        """
+        Liefert alle Messwerte einer Datei zeilenweise als Tupel, ohne Zwischenlisten aufzubauen.
+        """
+        with open(file_path, "r") as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    yield from cls.to_rows(line)
+
+    @classmethod
+    def process_file(cls, file_path, checkpoints=None):
         """
         Verarbeitet die neu erstellte Datei, konvertiert deren Inhalt und sendet ihn an einen externen Prozess.
+
+        Mit einem CheckpointStore wird nach jedem bestätigten Block der Byte-Offset
+        gespeichert und eine unterbrochene Datei ab dort fortgesetzt. Gibt True zurück,
+        wenn alle Blöcke vom Server bestätigt wurden.
         """
         logger.info(f"Processing file: {file_path}")
 
         try:
-            with open(file_path, "r") as file:
-                buffer = []
-                for line in file:
-                    buffer.append(line.strip())
-                    if len(buffer) == 5:
-                        cls.process_lines(buffer)
-                        buffer.clear()
-                if buffer:
-                    cls.process_lines(buffer)
+            file_key = checkpoints.file_key(file_path) if checkpoints else None
+            offset, batch = checkpoints.get(file_key) if checkpoints else (0, 0)
+            if offset:
+                logger.info(
+                    f"Resuming {file_path} at byte {offset} after {batch} batches"
+                )
+
+            def on_ack(end):
+                nonlocal batch
+                batch += 1
+                if checkpoints:
+                    checkpoints.save(file_key, file_path, end, batch)
+
+            policy = get_batch_policy(file_path)
+            if const.ClientTransport == "protobuf":
+                return cls.process_mapped(file_path, policy, offset, on_ack)
+            with open(file_path, "rb") as file:
+                file.seek(offset)
+                if const.ClientTransport == "stream" and cls.spool is None:
+                    # Der Stream bestätigt erst am Ende die gesamte Datei
+                    return cls.stream_batches(
+                        lines for lines, _ in cls.read_batches(file, policy)
+                    )
+                for buffer, end in cls.read_batches(file, policy):
+                    started = time.monotonic()
+                    if not cls.process_lines(buffer):
+                        return False
+                    policy.record_ack(len(buffer), time.monotonic() - started)
+                    on_ack(end)
+            return True
         except Exception as e:
             logger.error(f"Failed to process file {file_path}: {e}")
+            return False
 
     @classmethod
-    def process_lines(cls, lines):
+    def process_mapped(cls, file_path, policy, offset=0, on_ack=None):
         """
-        Verarbeitet eine Liste von Zeilen und sendet sie an einen externen Prozess.
+        Bildet die Datei per mmap ab, parst sie ab offset in Blöcken von const.MmapChunkBytes
+        Bytes und sendet die Messwerte gemäß der BatchPolicy als SensorBatch an den Server.
+        on_ack wird nach jeder Bestätigung mit dem Byte-Offset hinter dem Block aufgerufen.
+        Bricht beim ersten nicht bestätigten Block ab und gibt dann False zurück.
+        """
+        with MappedFile(file_path) as mapped:
+            parts = (
+                (mapped.parse(start, end), start, end)
+                for start, end in mapped.chunks(const.MmapChunkBytes, start=offset)
+            )
+            for batch in policy.batches(
+                parts, lambda part: (len(part[0]), part[2] - part[1])
+            ):
+                end = batch[-1][2]
+                columns = SensorColumns()
+                for part, _, _ in batch:
+                    columns.extend(part)
+                if len(columns):
+                    started = time.monotonic()
+                    batch = cls.build_batch_from_columns(columns)
+                    if cls.spool is not None:
+                        cls.spool.put("batch", batch.SerializeToString(), len(columns))
+                    else:
+                        ack = OctoClientPool.get_instance().send_batch(batch)
+                        if ack is None:
+                            logger.error(
+                                f"Failed to send {len(columns)} rows of {file_path}"
+                            )
+                            return False
+                        logger.info(f"Server persisted {ack.rows_persisted} rows")
+                    policy.record_ack(len(columns), time.monotonic() - started)
+                if on_ack:
+                    on_ack(end)
+        return True
+
+    @classmethod
+    def build_batch_from_columns(cls, columns):
+        """
+        Konvertiert SensorColumns in eine SensorBatch-Nachricht.
+        """
+        batch = octo_pb2.SensorBatch()
+        batch.readings.extend(
+            octo_pb2.SensorReading(
+                standort_id=standort_id, temperature=temperature, timestamp=timestamp
+            )
+            for standort_id, temperature, timestamp in columns.rows()
+        )
+        return batch
+
+    @classmethod
+    def read_batches(cls, file, policy):
+        """
+        Liefert die Zeilen der binär geöffneten Datei in Blöcken, deren Größe die
+        BatchPolicy bestimmt, jeweils als Tupel (Zeilen, Byte-Offset hinter dem Block).
+        """
+
+        def lines():
+            offset = file.tell()
+            for raw in file:
+                offset += len(raw)
+                yield raw.decode("utf-8-sig").strip(), offset
+
+        for batch in policy.batches(lines(), lambda item: (1, len(item[0]))):
+            yield [line for line, _ in batch], batch[-1][1]
+
+    @classmethod
+    def build_payload(cls, lines):
+        """
+        Konvertiert eine Liste von Zeilen in einen gemeinsamen JSON-String.
         """
         combined_data = {}
         for line in lines:
@@ -79,10 +237,129 @@ class SensorPlug:
                     combined_data[key].extend(value)
 
         json_payload = json.dumps(combined_data)
-        logger.info(f"Processing lines: {lines}")
-        logger.info(f"Converted JSON data: {json_payload}")
-        if not cls.run_subprocess(json_payload):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Processing lines: {lines}")
+            logger.debug(f"Converted JSON data: {json_payload}")
+        return json_payload
+
+    @classmethod
+    def process_lines(cls, lines):
+        """
+        Verarbeitet eine Liste von Zeilen und sendet sie an einen externen Prozess.
+        """
+        json_payload = cls.build_payload(lines)
+        if cls.spool is not None:
+            cls.spool.put("json", json_payload.encode(), len(lines))
+            return True
+        if not cls.send(json_payload):
             logger.error(f"Failed to process lines: {lines}")
+            return False
+        return True
+
+    @classmethod
+    def build_batch(cls, lines):
+        """
+        Konvertiert eine Liste von Zeilen in eine SensorBatch-Nachricht.
+        """
+        batch = octo_pb2.SensorBatch()
+        for line in lines:
+            batch.readings.extend(cls.to_readings(line))
+        return batch
+
+    @classmethod
+    def process_readings(cls, lines):
+        """
+        Verarbeitet eine Liste von Zeilen und sendet sie als typisierte Messwerte an den Server.
+        """
+        batch = cls.build_batch(lines)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Processing lines: {lines}")
+        ack = OctoClientPool.get_instance().send_batch(batch)
+        if ack is None:
+            logger.error(f"Failed to process lines: {lines}")
+            return False
+        logger.info(f"Server persisted {ack.rows_persisted} rows")
+        return True
+
+    @classmethod
+    def stream_batches(cls, batches):
+        """
+        Sendet alle Blöcke einer Datei über einen einzigen Stream-Aufruf an den Server.
+        """
+        payloads = (cls.build_payload(lines) for lines in batches)
+        ack = OctoClientPool.get_instance().stream_messages(payloads)
+        if ack is None:
+            logger.error("Failed to stream batches to server")
+            return False
+        logger.info(f"Stream finished: {ack.sequence} batches, {ack.total_rows} rows")
+        return True
+
+    @classmethod
+    def send_spooled(cls, kind, payloads):
+        """
+        Sendet Einträge aus dem Spool und gibt die Anzahl der bestätigten Einträge zurück.
+        SensorBatch-Einträge werden zu einer Nachricht zusammengeführt.
+
+        Raises:
+            DeliveryError: Mit der Anzahl der trotzdem bestätigten Einträge und ob der
+                Fehler vorübergehend ist (UNAVAILABLE, DEADLINE_EXCEEDED) oder eine
+                Ablehnung durch den Server.
+        """
+        pool = OctoClientPool.get_instance()
+        delivered = 0
+        try:
+            if kind == "batch":
+                batch = octo_pb2.SensorBatch()
+                for payload in payloads:
+                    batch.MergeFromString(payload)
+                ack = pool.call("OctoSensorBatch", batch)
+                logger.info(f"Server persisted {ack.rows_persisted} spooled rows")
+                return len(payloads)
+            json_strings = [payload.decode() for payload in payloads]
+            if const.ClientTransport == "stream":
+                # Bis zur letzten Bestätigung hat der Server alle Nachrichten committet
+                for ack in pool.stream_acks(json_strings):
+                    delivered = ack.sequence
+                return len(payloads)
+            if const.ClientTransport == "subprocess":
+                # Der Unterprozess meldet keinen Statuscode, Fehler gelten als vorübergehend
+                for delivered, json_string in enumerate(json_strings):
+                    if not cls.run_subprocess(json_string):
+                        return delivered
+                return len(payloads)
+            for json_string in json_strings:
+                response = pool.call(
+                    "OctoMessage", octo_pb2.OctoRequest(json_message=json_string)
+                )
+                logger.info(f"Server response: {response.json_message}")
+                delivered += 1
+            return len(payloads)
+        except grpc.RpcError as e:
+            raise DeliveryError(
+                f"RPC failed with status: {e.code()}, details: {e.details()}",
+                delivered=delivered,
+                transient=e.code() in _TRANSIENT_STATUS_CODES,
+            ) from e
+
+    @classmethod
+    def send(cls, json_string: str):
+        """
+        Sendet den JSON-String über den in const.ClientTransport konfigurierten Transport.
+        """
+        if const.ClientTransport == "subprocess":
+            return cls.run_subprocess(json_string)
+        return cls.run_inprocess(json_string)
+
+    @classmethod
+    def run_inprocess(cls, json_string: str):
+        """
+        Sendet den JSON-String direkt über einen gepoolten gRPC-Kanal an den Server.
+        """
+        response = OctoClientPool.get_instance().send_message(json_string)
+        if response is None:
+            return False
+        logger.info(f"Server response: {response.json_message}")
+        return True
 
     @classmethod
     def run_subprocess(cls, json_string: str):
@@ -0,0 +1,271 @@
+import contextlib
+import os
+import sqlite3
+import threading
+import time
+from classes.loghandler import LogHandler
+import classes.metrics as metrics
+
+log_handler = LogHandler(os.path.basename(__file__)[:-3])
+logger = log_handler.get_logger()
+
+DEAD_LETTERS = metrics.counter(
+    "octoplug_spool_dead_letters_total",
+    "Spooled entries moved to the dead-letter table after repeated rejections.",
+    ("kind",),
+)
+
+
+class DeliveryError(Exception):
+    """
+    Zustellung von Spool-Einträgen fehlgeschlagen.
+
+    delivered gibt an, wie viele Einträge (von vorne gezählt) der Server trotzdem bestätigt
+    hat. transient unterscheidet vorübergehende Fehler (Server nicht erreichbar, Zeitlimit)
+    von Ablehnungen, die sich mit denselben Daten wiederholen können.
+    """
+
+    def __init__(self, message, delivered=0, transient=True):
+        super().__init__(message)
+        self.delivered = delivered
+        self.transient = transient
+
+
+class SpoolQueue:
+    """
+    Dauerhafte Warteschlange für Nachrichten an den OctoServer in einer SQLite-Datenbank
+    im WAL-Modus.
+
+    put schreibt einen Eintrag und kehrt erst nach dem Commit zurück, danach gilt er als
+    sicher abgelegt. Einträge werden in Einfügereihenfolge gelesen und erst mit ack
+    gelöscht, sodass sie Serverausfälle und Neustarts überstehen. Jede Operation öffnet
+    eine eigene Verbindung, Worker-Threads und -Prozesse können gleichzeitig schreiben.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.available = threading.Event()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self.connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS spool ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, "
+                "payload BLOB NOT NULL, rows INTEGER NOT NULL, created REAL NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS dead_letter ("
+                "id INTEGER PRIMARY KEY, kind TEXT NOT NULL, payload BLOB NOT NULL, "
+                "rows INTEGER NOT NULL, created REAL NOT NULL, attempts INTEGER NOT NULL, "
+                "failed REAL NOT NULL, error TEXT)"
+            )
+
+    @contextlib.contextmanager
+    def connect(self):
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def put(self, kind, payload, rows):
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT INTO spool (kind, payload, rows, created) VALUES (?, ?, ?, ?)",
+                (kind, payload, rows, time.time()),
+            )
+        self.available.set()
+
+    def peek(self, limit, max_bytes):
+        """
+        Liefert die ältesten Einträge gleicher Art als Liste von
+        (id, kind, payload, rows, attempts), höchstens limit Einträge bzw. max_bytes Bytes,
+        aber immer mindestens einen.
+        """
+        with self.connect() as connection:
+            rows = connection.execute(
+                "SELECT id, kind, payload, rows, attempts FROM spool ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+        entries = []
+        size = 0
+        for entry in rows:
+            if entries and (
+                entry[1] != entries[0][1] or size + len(entry[2]) > max_bytes
+            ):
+                break
+            entries.append(entry)
+            size += len(entry[2])
+        return entries
+
+    def ack(self, ids):
+        with self.connect() as connection:
+            connection.executemany(
+                "DELETE FROM spool WHERE id = ?", [(entry_id,) for entry_id in ids]
+            )
+
+    def record_failure(self, ids):
+        with self.connect() as connection:
+            connection.executemany(
+                "UPDATE spool SET attempts = attempts + 1 WHERE id = ?",
+                [(entry_id,) for entry_id in ids],
+            )
+
+    def dead_letter(self, entry_id, error):
+        """Verschiebt einen Eintrag, den der Server wiederholt abgelehnt hat, in dead_letter."""
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT INTO dead_letter "
+                "SELECT id, kind, payload, rows, created, attempts, ?, ? "
+                "FROM spool WHERE id = ?",
+                (time.time(), str(error), entry_id),
+            )
+            connection.execute("DELETE FROM spool WHERE id = ?", (entry_id,))
+
+    def stats(self):
+        """Liefert Anzahl, Messwerte, Bytes und Alter des ältesten Eintrags in Sekunden."""
+        with self.connect() as connection:
+            depth, rows, size, oldest, attempts = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(rows), 0), "
+                "COALESCE(SUM(LENGTH(payload)), 0), MIN(created), "
+                "COALESCE(MAX(attempts), 0) FROM spool"
+            ).fetchone()
+            (dead_letters,) = connection.execute(
+                "SELECT COUNT(*) FROM dead_letter"
+            ).fetchone()
+        return {
+            "depth": depth,
+            "rows": rows,
+            "bytes": size,
+            "oldest_age": round(time.time() - oldest, 3) if oldest else 0.0,
+            "max_attempts": attempts,
+            "dead_letters": dead_letters,
+        }
+
+
+class SpoolSender:
+    """
+    Hintergrund-Thread, der den Spool zum Server leert.
+
+    deliver(kind, payloads) sendet eine Gruppe von Einträgen und gibt zurück, wie viele
+    davon (von vorne gezählt) bestätigt wurden, oder wirft einen DeliveryError. Nach einem
+    vorübergehenden Fehler wartet der Thread exponentiell länger bis höchstens max_backoff
+    Sekunden. Lehnt der Server eine zusammengeführte Gruppe ab, wird sie halbiert und
+    erneut gesendet, bis der abgelehnte Eintrag allein steht. Dieser wandert nach
+    max_attempts Ablehnungen in die Tabelle dead_letter, damit er die nachfolgenden
+    Einträge nicht dauerhaft blockiert.
+    """
+
+    def __init__(
+        self,
+        spool,
+        deliver,
+        batch_entries=50,
+        batch_bytes=3 << 20,
+        poll_interval=1.0,
+        base_backoff=0.5,
+        max_backoff=60.0,
+        max_attempts=5,
+    ):
+        self.spool = spool
+        self.deliver = deliver
+        self.batch_entries = batch_entries
+        self.batch_bytes = batch_bytes
+        self.poll_interval = poll_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.failures = 0
+        self.sent_entries = 0
+        self.sent_rows = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="spoolsender", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.spool.available.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        while not self.stop_event.is_set():
+            # Vor dem Lesen zurücksetzen, damit kein put zwischen Lesen und Warten verloren geht
+            self.spool.available.clear()
+            try:
+                entries = self.spool.peek(self.batch_entries, self.batch_bytes)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to read spool: {e}")
+                entries = []
+            if not entries:
+                # Neue Einträge aus diesem Prozess wecken den Thread sofort, Einträge aus
+                # Worker-Prozessen spätestens nach poll_interval
+                self.spool.available.wait(self.poll_interval)
+                continue
+            self.send(entries)
+
+    def send(self, entries):
+        """
+        Sendet die Einträge und löscht die bestätigten. Gibt False zurück, wenn der Thread
+        nach einem Fehlschlag gewartet hat und die übrigen Einträge neu lesen soll.
+        """
+        kind = entries[0][1]
+        try:
+            delivered = self.deliver(kind, [entry[2] for entry in entries])
+            error, transient = "not acknowledged", True
+        except DeliveryError as e:
+            delivered, error, transient = e.delivered, e, e.transient
+        except Exception as e:
+            delivered, error, transient = 0, e, True
+        if delivered:
+            self.spool.ack([entry[0] for entry in entries[:delivered]])
+            self.sent_entries += delivered
+            self.sent_rows += sum(entry[3] for entry in entries[:delivered])
+            self.failures = 0
+        remaining = entries[delivered:]
+        if not remaining:
+            return True
+        logger.error(
+            f"Failed to deliver {len(remaining)} spooled {kind} entries: {error}"
+        )
+        if not transient:
+            if len(remaining) > 1:
+                # Abgelehnten Eintrag eingrenzen, statt dieselbe Gruppe erneut zu senden
+                half = len(remaining) // 2
+                return self.send(remaining[:half]) and self.send(remaining[half:])
+            if self.reject(remaining[0], error):
+                return True
+        self.back_off()
+        return False
+
+    def reject(self, entry, error):
+        """
+        Zählt eine Ablehnung des Eintrags und verschiebt ihn nach max_attempts in
+        dead_letter. Gibt True zurück, wenn er verschoben wurde.
+        """
+        entry_id, kind, _, rows, attempts = entry
+        if attempts + 1 < self.max_attempts:
+            self.spool.record_failure([entry_id])
+            return False
+        self.spool.dead_letter(entry_id, error)
+        DEAD_LETTERS.inc(kind=kind)
+        logger.error(
+            f"Moved spooled {kind} entry {entry_id} ({rows} rows) to dead_letter "
+            f"after {attempts + 1} rejections: {error}"
+        )
+        return True
+
+    def back_off(self):
+        self.failures += 1
+        backoff = min(self.base_backoff * 2 ** (self.failures - 1), self.max_backoff)
+        logger.warning(
+            f"Spool delivery failed, retrying in {backoff:.1f}s "
+            f"(attempt {self.failures})"
+        )
+        self.stop_event.wait(backoff)
@@ -79,16 +79,16 @@ class AutoPersistentGenerator:
     def add_imports(self):
         """Fügt den Imports von DBController und datetime hinzu."""
         if self.IsList:
-            return f"from src.persistent.classes.base.autopersistentlist import AutoPersistentLst\nfrom src.persistent.classes.persistent.{self.name.lower()} import {self.name.lower()} \n\n"
+            return f"from src.persistent.classes.base.autopersistentlist import AutoPersistentLst\nfrom src.persistent.classes.persistent.{self.name.lower()} import {self.name.lower()}, {self.name.lower()}record \n\n"
         else:
-            return "from src.persistent.classes.base.autopersistent import AutoPersistent\nfrom datetime import datetime as dt\n\n"
+            return "from src.persistent.classes.base.autopersistent import AutoPersistent\nfrom src.persistent.classes.base.autopersistentrecord import AutoPersistentRecord\nfrom datetime import datetime as dt\n\n"
 
     def generate_class(self, columns):
         if self.IsList:
             self.class_definition.append(self.add_imports())
             self.class_definition.append(f"class {self.name}Lst(AutoPersistentLst):\n")
-            self.class_definition.append("    def __init__(self):\n")
-            self.class_definition.append("        super().__init__()\n")
+            self.class_definition.append("    def __init__(self, columnar=False):\n")
+            self.class_definition.append("        super().__init__(columnar)\n")
             self.generate_methods()
         else:
             self.class_definition.append(self.add_imports())
@@ -96,6 +96,7 @@ class AutoPersistentGenerator:
             self.class_definition.append("    def __init__(self,\n")
             self.add_columns(columns)
             self.generate_getter_and_setter(columns)
+            self.generate_record_class(columns)
 
     def add_columns(self, columns):
         """Adds class variables for each column in the given dictionary."""
@@ -134,11 +135,36 @@ class AutoPersistentGenerator:
                 f"    @{colname}.setter\n    def {colname}(self, value):\n        self._{colname} = value\n"
             )
 
+    def generate_record_class(self, columns):
+        """
+        Erzeugt den schlanken Datensatz {name}record mit __slots__ für Massenpfade und die
+        spaltenweise Speicherung der Liste.
+        """
+        slots = ", ".join(f'"{col[0]}"' for col in columns)
+        self.class_definition.append(
+            f"\nclass {self.name}record(AutoPersistentRecord):\n"
+            f"    __slots__ = ({slots}{',' if len(columns) == 1 else ''})\n"
+            "    COLUMNS = __slots__\n"
+        )
+        self.class_definition.append("    def __init__(self,\n")
+        for col in columns:
+            column_type = self.map_column_type(col[1])
+            self.class_definition.append(f"        {col[0]}: {column_type} = None,")
+        self.class_definition.append("    ):")
+        for col in columns:
+            self.class_definition.append(f"        self.{col[0]} = {col[0]}")
+        self.class_definition.append(
+            f"\n    def get_persistent_class(self):\n        return {self.name}\n"
+        )
+
     def generate_methods(self):
         """Generates methods to manage a list of persistent objects."""
         self.class_definition.append(
             f"    def get_persistent_class(self):\n        return {self.name}\n"
         )
+        self.class_definition.append(
+            f"    def get_record_class(self):\n        return {self.name}record\n"
+        )
         self.class_definition.append(
             f"    def add(self, {self.name}):\n        self.add({self.name})\n"
         )
@@ -0,0 +1,68 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from classes.sensorplug import SensorPlug
+from classes.sensorparser import SensorParser
+
+
+def generate_lines(count, sensors):
+    """
+    Erzeugt Testzeilen im Format datum|zeit|{'standortid': temperatur, ...}.
+    """
+    start = datetime(2024, 1, 1)
+    lines = []
+    for i in range(count):
+        measured_at = start + timedelta(seconds=i * 10)
+        measurements = ", ".join(
+            f"'{sensor_id}': {random.uniform(-20, 40):.2f}"
+            for sensor_id in range(1, sensors + 1)
+        )
+        lines.append(
+            f"{measured_at:%Y-%m-%d}|{measured_at:%H:%M:%S}|{{{measurements}}}"
+        )
+    return lines
+
+
+def benchmark(name, func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{name:<20} {best * 1000:10.1f} ms  {rows / best:14,.0f} rows/s")
+    return best
+
+
+def main():
+    """
+    Vergleicht SensorPlug.convert (Zeile für Zeile) mit SensorParser.parse (ganzer Block).
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the batch sensor parser against SensorPlug.convert."
+    )
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--sensors", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    lines = generate_lines(args.lines, args.sensors)
+    data = "\n".join(lines).encode()
+
+    def run_convert():
+        for line in lines:
+            SensorPlug.convert(line)
+        return args.lines * args.sensors
+
+    def run_parser():
+        return len(SensorParser().parse(data))
+
+    print(f"{args.lines} lines, {args.sensors} sensors per line")
+    baseline = benchmark("SensorPlug.convert", run_convert, args.repeat)
+    batch = benchmark("SensorParser.parse", run_parser, args.repeat)
+    print(f"Speedup: {baseline / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
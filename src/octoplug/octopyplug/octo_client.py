@@ -2,18 +2,30 @@
 import argparse
 from datetime import datetime
 import os
+import time
 import grpc
 import json  # Stellen Sie sicher, dass das json-Modul importiert ist
-import _credentials
+try:
+    import _credentials
+except ImportError:
+    import octopyplug._credentials as _credentials
 import octopyplug.octo_pb2 as octo_pb2
 import octopyplug.octo_pb2_grpc as octo_pb2_grpc
 from classes.loghandler import LogHandler
 import classes.const as const
+import classes.metrics as metrics
 
 log_handler = LogHandler(os.path.basename(__file__)[:-3])
 logger = log_handler.get_logger()
 _SERVER_ADDR_TEMPLATE = "192.168.178.48:%d"
-_CLIENT_REQUEST_TYPES = ["SendMessage", "GetFormat", "History"]
+_CLIENT_REQUEST_TYPES = ["SendMessage", "GetFormat", "History", "Stream"]
+
+RPC_SECONDS = metrics.histogram(
+    "octoplug_rpc_seconds", "Client-side gRPC call latency.", ("method",)
+)
+RPC_ERRORS = metrics.counter(
+    "octoplug_rpc_errors_total", "Failed client-side gRPC calls.", ("method", "code")
+)
 
 
 def create_client_channel(addr: str) -> grpc.Channel:
@@ -72,13 +84,12 @@ def is_file_recent(file_path: str, days: int = 5) -> bool:
 
 
 def run(channel: grpc.Channel, json_msg: dict, type: str) -> any:
-    stub = octo_pb2_grpc.MessageServiceStub(channel)
-    metadata = [("authorization", "Bearer test_token")]
-    response = None  # Initialisieren Sie die Variable response
+    """
+    Sendet eine Anfrage des angegebenen Typs über den übergebenen Kanal an den Server.
 
     Args:
         channel (grpc.Channel): Der gRPC-Kanal.
-        json_message (dict): Die zu sendende Nachricht, verpackt als JSON.
+        json_msg (dict): Die zu sendende Nachricht, verpackt als JSON.
         type (str): Der Typ der Anfrage, z.B. 'SendMessage' oder 'GetFormat'.
 
     Returns:
@@ -89,8 +100,9 @@ def run(channel: grpc.Channel, json_msg: dict, type: str) -> any:
         Exception: Allgemeine Fehler während der Ausführung werden erfasst und geloggt.
     """
     stub = octo_pb2_grpc.MessageServiceStub(channel)
-    json_string = json.dumps(json_message)
-    logger.info(f"Running {type} request with data: {json_string}")
+    metadata = [("authorization", "Bearer test_token")]
+    response = None
+    started = time.perf_counter()
     try:
         if type == "SendMessage":
             json_string = json.dumps(json_msg)
@@ -118,15 +130,62 @@ def run(channel: grpc.Channel, json_msg: dict, type: str) -> any:
                 with open("dataschema.json", "r") as file:
                     response = octo_pb2.OctoResponse(json_message=file.read())
                 logger.info(f"Received response: {response.json_message}")
-            return response
+        return response
 
     except grpc.RpcError as e:
+        RPC_ERRORS.inc(method=type, code=e.code().name)
         logger.error(f"RPC failed with status: {e.code()}, details: {e.details()}")
         print(f"RPC failed: {e.code()}, {e.details()}")
         return None
     except Exception as e:
         logger.error(f"Unexpected error during '{type}' request: {e}")
         return None
+    finally:
+        RPC_SECONDS.observe(time.perf_counter() - started, method=type)
+
+
+def run_stream(channel: grpc.Channel, json_messages) -> any:
+    """
+    Sendet beliebig viele Nachrichten über einen einzigen OctoMessageStream-Aufruf.
+
+    Args:
+        channel (grpc.Channel): Der gRPC-Kanal.
+        json_messages: Iterable von JSON-Strings, die nacheinander gesendet werden.
+
+    Returns:
+        octo_pb2.OctoAck: Die letzte Bestätigung des Servers oder None bei einem Fehler.
+    """
+    stub = octo_pb2_grpc.MessageServiceStub(channel)
+    metadata = [("authorization", "Bearer test_token")]
+    return stream_messages(stub, json_messages, metadata)
+
+
+def stream_messages(stub, json_messages, metadata, timeout=None) -> any:
+    """
+    Streamt die JSON-Strings an den Server und loggt die periodischen Bestätigungen.
+
+    Returns:
+        octo_pb2.OctoAck: Die letzte Bestätigung des Servers oder None bei einem Fehler.
+    """
+    requests = (
+        octo_pb2.OctoRequest(json_message=json_string) for json_string in json_messages
+    )
+    last_ack = None
+    started = time.perf_counter()
+    try:
+        for ack in stub.OctoMessageStream(requests, metadata=metadata, timeout=timeout):
+            logger.info(
+                f"Stream ack: sequence={ack.sequence}, rows={ack.rows_persisted}, "
+                f"total={ack.total_rows}, status={ack.status}"
+            )
+            last_ack = ack
+        return last_ack
+    except grpc.RpcError as e:
+        RPC_ERRORS.inc(method="OctoMessageStream", code=e.code().name)
+        logger.error(f"Stream failed with status: {e.code()}, details: {e.details()}")
+        return None
+    finally:
+        RPC_SECONDS.observe(time.perf_counter() - started, method="OctoMessageStream")
 
 
 def main():
@@ -158,7 +217,13 @@ def main():
     try:
         address = f"{_SERVER_ADDR_TEMPLATE % args.port}"
         channel = create_client_channel(address)
-        response = run(channel, args.json_message, args.type)
+        if args.type == "Stream":
+            messages = args.json_message
+            if not isinstance(messages, list):
+                messages = [messages]
+            response = run_stream(channel, (json.dumps(m) for m in messages))
+        else:
+            response = run(channel, args.json_message, args.type)
         logger.info(f"Final response: {response}")
         print(response)
     except KeyboardInterrupt:
@@ -0,0 +1,199 @@
+# octo_clientpool.py
+import itertools
+import os
+import threading
+import time
+import grpc
+import octopyplug.octo_client as octo_client
+import octopyplug.octo_pb2 as octo_pb2
+import octopyplug.octo_pb2_grpc as octo_pb2_grpc
+import classes.const as const
+from classes.loghandler import LogHandler
+
+log_handler = LogHandler(os.path.basename(__file__)[:-3])
+logger = log_handler.get_logger()
+_METADATA = [("authorization", "Bearer test_token")]
+_RECONNECT_STATUS_CODES = (grpc.StatusCode.UNAVAILABLE,)
+
+
+class PooledChannel:
+    """
+    Ein einzelner, langlebiger sicherer Kanal samt Stub, der bei Bedarf neu aufgebaut wird.
+    """
+
+    def __init__(self, address: str):
+        self.address = address
+        self.lock = threading.Lock()
+        self.channel = None
+        self.stub = None
+
+    def get_stub(self) -> octo_pb2_grpc.MessageServiceStub:
+        with self.lock:
+            if self.stub is None:
+                self.channel = octo_client.create_client_channel(self.address)
+                self.stub = octo_pb2_grpc.MessageServiceStub(self.channel)
+                logger.info(f"Opened channel to {self.address}")
+            return self.stub
+
+    def reset(self):
+        with self.lock:
+            if self.channel is not None:
+                try:
+                    self.channel.close()
+                except Exception as e:
+                    logger.warning(f"Failed to close channel to {self.address}: {e}")
+            self.channel = None
+            self.stub = None
+
+
+class OctoClientPool:
+    """
+    Prozessweiter Pool sicherer gRPC-Kanäle zum OctoServer.
+
+    Die Kanäle werden einmalig über `octo_client.create_client_channel` aufgebaut und
+    reihum verwendet, sodass pro Nachricht weder ein Interpreter gestartet noch ein
+    TLS-Handshake durchgeführt werden muss. Ist der Server nicht erreichbar, wird der
+    betroffene Kanal verworfen und die Anfrage auf einem neu aufgebauten Kanal wiederholt.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, address=None, size=None, timeout=None, retries=None):
+        self.address = address or octo_client._SERVER_ADDR_TEMPLATE % const.ServerPort
+        self.size = size or const.ClientPoolSize
+        self.timeout = timeout or const.ClientTimeout
+        self.retries = const.ClientRetries if retries is None else retries
+        self.channels = [PooledChannel(self.address) for _ in range(self.size)]
+        self._counter = itertools.count()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _next_channel(self) -> PooledChannel:
+        return self.channels[next(self._counter) % self.size]
+
+    def call(self, method_name: str, request):
+        """
+        Ruft eine Methode des MessageServiceStub auf einem Kanal aus dem Pool auf.
+
+        Args:
+            method_name (str): Name der RPC-Methode, z.B. 'OctoMessage'.
+            request: Die Protobuf-Anfrage.
+
+        Returns:
+            Die Antwort des Servers.
+
+        Raises:
+            grpc.RpcError: Wenn die Anfrage auch nach allen Wiederholungen fehlschlägt.
+        """
+        attempt = 0
+        while True:
+            pooled = self._next_channel()
+            started = time.perf_counter()
+            try:
+                stub = pooled.get_stub()
+                return getattr(stub, method_name)(
+                    request, metadata=_METADATA, timeout=self.timeout
+                )
+            except grpc.RpcError as e:
+                octo_client.RPC_ERRORS.inc(method=method_name, code=e.code().name)
+                if e.code() not in _RECONNECT_STATUS_CODES or attempt >= self.retries:
+                    raise
+                attempt += 1
+                logger.warning(
+                    f"RPC {method_name} failed with {e.code()}, reconnecting "
+                    f"(attempt {attempt}/{self.retries})"
+                )
+                pooled.reset()
+                time.sleep(min(0.1 * 2**attempt, 2.0))
+            finally:
+                octo_client.RPC_SECONDS.observe(
+                    time.perf_counter() - started, method=method_name
+                )
+
+    def send_message(self, json_string: str):
+        """
+        Sendet einen JSON-String per OctoMessage an den Server.
+
+        Returns:
+            octo_pb2.OctoResponse: Die Antwort des Servers oder None bei einem Fehler.
+        """
+        try:
+            request = octo_pb2.OctoRequest(json_message=json_string)
+            return self.call("OctoMessage", request)
+        except grpc.RpcError as e:
+            logger.error(f"RPC failed with status: {e.code()}, details: {e.details()}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error while sending message: {e}")
+            return None
+
+    def send_batch(self, batch: octo_pb2.SensorBatch):
+        """
+        Sendet typisierte Messwerte per OctoSensorBatch an den Server.
+
+        Returns:
+            octo_pb2.OctoAck: Die Bestätigung des Servers oder None bei einem Fehler.
+        """
+        try:
+            return self.call("OctoSensorBatch", batch)
+        except grpc.RpcError as e:
+            logger.error(f"RPC failed with status: {e.code()}, details: {e.details()}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error while sending batch: {e}")
+            return None
+
+    def stream_messages(self, json_strings):
+        """
+        Sendet alle JSON-Strings über einen einzigen OctoMessageStream-Aufruf.
+
+        Ein abgebrochener Strom wird nicht wiederholt, da der Server bereits
+        bestätigte Nachrichten gespeichert hat.
+
+        Returns:
+            octo_pb2.OctoAck: Die letzte Bestätigung des Servers oder None bei einem Fehler.
+        """
+        pooled = self._next_channel()
+        try:
+            stub = pooled.get_stub()
+        except Exception as e:
+            logger.error(f"Unexpected error while opening stream: {e}")
+            return None
+        ack = octo_client.stream_messages(stub, json_strings, _METADATA)
+        if ack is None:
+            pooled.reset()
+        return ack
+
+    def stream_acks(self, json_strings):
+        """
+        Sendet alle JSON-Strings über einen OctoMessageStream-Aufruf und liefert die
+        Bestätigungen des Servers. Anders als stream_messages wird ein Fehler als
+        grpc.RpcError weitergereicht, damit der Aufrufer die bereits bestätigten
+        Nachrichten und den Statuscode auswerten kann.
+        """
+        pooled = self._next_channel()
+        requests = (
+            octo_pb2.OctoRequest(json_message=json_string)
+            for json_string in json_strings
+        )
+        started = time.perf_counter()
+        try:
+            yield from pooled.get_stub().OctoMessageStream(requests, metadata=_METADATA)
+        except grpc.RpcError as e:
+            octo_client.RPC_ERRORS.inc(method="OctoMessageStream", code=e.code().name)
+            pooled.reset()
+            raise
+        finally:
+            octo_client.RPC_SECONDS.observe(
+                time.perf_counter() - started, method="OctoMessageStream"
+            )
+
+    def close(self):
+        for pooled in self.channels:
+            pooled.reset()
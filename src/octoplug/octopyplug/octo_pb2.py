@@ -14,7 +14,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nocto.proto\x12\x04octo\"#\n\x0bOctoRequest\x12\x14\n\x0cjson_message\x18\x01 \x01(\t\"2\n\x0cOctoResponse\x12\x14\n\x0cjson_message\x18\x01 \x01(\t\x12\x0c\n\x04test\x18\x02 \x01(\t\"\x10\n\x0eGetDataRequest2\x85\x01\n\x0eMessageService\x12\x36\n\x0bOctoMessage\x12\x11.octo.OctoRequest\x1a\x12.octo.OctoResponse\"\x00\x12;\n\rGetDataFormat\x12\x14.octo.GetDataRequest\x1a\x12.octo.OctoResponse\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nocto.proto\x12\x04octo\"#\n\x0bOctoRequest\x12\x14\n\x0cjson_message\x18\x01 \x01(\t\"2\n\x0cOctoResponse\x12\x14\n\x0cjson_message\x18\x01 \x01(\t\x12\x0c\n\x04test\x18\x02 \x01(\t\"\x10\n\x0eGetDataRequest\"W\n\x07OctoAck\x12\x10\n\x08sequence\x18\x01 \x01(\x03\x12\x16\n\x0erows_persisted\x18\x02 \x01(\x03\x12\x12\n\ntotal_rows\x18\x03 \x01(\x03\x12\x0e\n\x06status\x18\x04 \x01(\t\"L\n\rSensorReading\x12\x13\n\x0bstandort_id\x18\x01 \x01(\x05\x12\x13\n\x0btemperature\x18\x02 \x01(\x01\x12\x11\n\ttimestamp\x18\x03 \x01(\x03\"4\n\x0bSensorBatch\x12%\n\x08readings\x18\x01 \x03(\x0b\x32\x13.octo.SensorReading2\xf9\x01\n\x0eMessageService\x12\x36\n\x0bOctoMessage\x12\x11.octo.OctoRequest\x1a\x12.octo.OctoResponse\"\x00\x12;\n\rGetDataFormat\x12\x14.octo.GetDataRequest\x1a\x12.octo.OctoResponse\"\x00\x12;\n\x11OctoMessageStream\x12\x11.octo.OctoRequest\x1a\r.octo.OctoAck\"\x00(\x01\x30\x01\x12\x35\n\x0fOctoSensorBatch\x12\x11.octo.SensorBatch\x1a\r.octo.OctoAck\"\x00\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -27,6 +27,12 @@ if _descriptor._USE_C_DESCRIPTORS == False:
   _globals['_OCTORESPONSE']._serialized_end=107
   _globals['_GETDATAREQUEST']._serialized_start=109
   _globals['_GETDATAREQUEST']._serialized_end=125
-  _globals['_MESSAGESERVICE']._serialized_start=128
-  _globals['_MESSAGESERVICE']._serialized_end=261
+  _globals['_OCTOACK']._serialized_start=127
+  _globals['_OCTOACK']._serialized_end=214
+  _globals['_SENSORREADING']._serialized_start=216
+  _globals['_SENSORREADING']._serialized_end=292
+  _globals['_SENSORBATCH']._serialized_start=294
+  _globals['_SENSORBATCH']._serialized_end=346
+  _globals['_MESSAGESERVICE']._serialized_start=349
+  _globals['_MESSAGESERVICE']._serialized_end=598
 # @@protoc_insertion_point(module_scope)
@@ -1,6 +1,7 @@
+from google.protobuf.internal import containers as _containers
 from google.protobuf import descriptor as _descriptor
 from google.protobuf import message as _message
-from typing import ClassVar as _ClassVar, Optional as _Optional
+from typing import ClassVar as _ClassVar, Iterable as _Iterable, Mapping as _Mapping, Optional as _Optional, Union as _Union
 
 DESCRIPTOR: _descriptor.FileDescriptor
 
@@ -21,3 +22,31 @@ class OctoResponse(_message.Message):
 class GetDataRequest(_message.Message):
     __slots__ = ()
     def __init__(self) -> None: ...
+
+class OctoAck(_message.Message):
+    __slots__ = ("sequence", "rows_persisted", "total_rows", "status")
+    SEQUENCE_FIELD_NUMBER: _ClassVar[int]
+    ROWS_PERSISTED_FIELD_NUMBER: _ClassVar[int]
+    TOTAL_ROWS_FIELD_NUMBER: _ClassVar[int]
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    sequence: int
+    rows_persisted: int
+    total_rows: int
+    status: str
+    def __init__(self, sequence: _Optional[int] = ..., rows_persisted: _Optional[int] = ..., total_rows: _Optional[int] = ..., status: _Optional[str] = ...) -> None: ...
+
+class SensorReading(_message.Message):
+    __slots__ = ("standort_id", "temperature", "timestamp")
+    STANDORT_ID_FIELD_NUMBER: _ClassVar[int]
+    TEMPERATURE_FIELD_NUMBER: _ClassVar[int]
+    TIMESTAMP_FIELD_NUMBER: _ClassVar[int]
+    standort_id: int
+    temperature: float
+    timestamp: int
+    def __init__(self, standort_id: _Optional[int] = ..., temperature: _Optional[float] = ..., timestamp: _Optional[int] = ...) -> None: ...
+
+class SensorBatch(_message.Message):
+    __slots__ = ("readings",)
+    READINGS_FIELD_NUMBER: _ClassVar[int]
+    readings: _containers.RepeatedCompositeFieldContainer[SensorReading]
+    def __init__(self, readings: _Optional[_Iterable[_Union[SensorReading, _Mapping]]] = ...) -> None: ...
@@ -24,6 +24,16 @@ class MessageServiceStub(object):
             request_serializer=octo__pb2.GetDataRequest.SerializeToString,
             response_deserializer=octo__pb2.OctoResponse.FromString,
         )
+        self.OctoMessageStream = channel.stream_stream(
+            "/octo.MessageService/OctoMessageStream",
+            request_serializer=octo__pb2.OctoRequest.SerializeToString,
+            response_deserializer=octo__pb2.OctoAck.FromString,
+        )
+        self.OctoSensorBatch = channel.unary_unary(
+            "/octo.MessageService/OctoSensorBatch",
+            request_serializer=octo__pb2.SensorBatch.SerializeToString,
+            response_deserializer=octo__pb2.OctoAck.FromString,
+        )
 
 
 class MessageServiceServicer(object):
@@ -41,6 +51,18 @@ class MessageServiceServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def OctoMessageStream(self, request_iterator, context):
+        """Nimmt einen Strom von Nachrichten entgegen und bestätigt periodisch die gespeicherten Zeilen"""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def OctoSensorBatch(self, request, context):
+        """Nimmt Sensordaten als typisierte Nachrichten statt als JSON entgegen"""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
 
 def add_MessageServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -54,6 +76,16 @@ def add_MessageServiceServicer_to_server(servicer, server):
             request_deserializer=octo__pb2.GetDataRequest.FromString,
             response_serializer=octo__pb2.OctoResponse.SerializeToString,
         ),
+        "OctoMessageStream": grpc.stream_stream_rpc_method_handler(
+            servicer.OctoMessageStream,
+            request_deserializer=octo__pb2.OctoRequest.FromString,
+            response_serializer=octo__pb2.OctoAck.SerializeToString,
+        ),
+        "OctoSensorBatch": grpc.unary_unary_rpc_method_handler(
+            servicer.OctoSensorBatch,
+            request_deserializer=octo__pb2.SensorBatch.FromString,
+            response_serializer=octo__pb2.OctoAck.SerializeToString,
+        ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
         "octo.MessageService", rpc_method_handlers
@@ -122,3 +154,61 @@ class MessageService(object):
             timeout,
             metadata,
         )
+
+    @staticmethod
+    def OctoMessageStream(
+        request_iterator,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            "/octo.MessageService/OctoMessageStream",
+            octo__pb2.OctoRequest.SerializeToString,
+            octo__pb2.OctoAck.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
+
+    @staticmethod
+    def OctoSensorBatch(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/octo.MessageService/OctoSensorBatch",
+            octo__pb2.SensorBatch.SerializeToString,
+            octo__pb2.OctoAck.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+        )
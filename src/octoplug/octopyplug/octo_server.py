@@ -1,11 +1,15 @@
 # octo_server.py
 import argparse
+import asyncio
 from concurrent import futures
 import contextlib
+import functools
 import grpc
+import logging
 import os
 import signal
 import sys
+import time
 import json
 import _credentials
 import octopyplug.octo_pb2 as octo_pb2
@@ -15,16 +19,85 @@ from classes.loghandler import LogHandler
 import classes.persistent.sensorlst as SensorLst
 import classes.persistent.sensor as Sensor
 import classes.base.databasecontroller as DBController
+from classes.base.schemacache import SchemaCache
+from classes.base.databasecontrollerbase import DatabaseControllerBase
+import classes.metrics as metrics
 
 _LISTEN_ADDRESS_TEMPLATE = "0.0.0.0:%d"
 _AUTH_HEADER_KEY = "authorization"
 _AUTH_HEADER_VALUE = "Bearer test_token"
+_STREAM_METHODS = ("/octo.MessageService/OctoMessageStream",)
+# Clients, die diese Metadaten mit "1" senden, erhalten in der OctoMessage-Antwort
+# zusätzlich die Anzahl eingefügter und aktualisierter Zeilen als JSON
+_REPLY_COUNTS_KEY = "x-octo-reply-counts"
+_MESSAGE_REPLY = "Message received successfully"
+_DATA_FORMAT = {
+    "id": "",
+    "text": "",
+    "status": 0,
+    "grad": 0,
+    "class": "",
+    "loc": "",
+    "datum": "",
+    "zeit": "",
+    "sid": "",
+    "code": 0,
+}
 
 log_handler = LogHandler(os.path.basename(__file__)[:-3])
 logger = log_handler.get_logger()
 
 db_controller = DBController.DatabaseController()
 
+HANDLER_SECONDS = metrics.histogram(
+    "octoplug_handler_seconds", "Server-side gRPC handler time.", ("method",)
+)
+ROWS_PERSISTED = metrics.counter(
+    "octoplug_rows_persisted_total", "Rows written to the database.", ("result",)
+)
+
+
+def _timed(handler):
+    """Erfasst die Laufzeit eines unären Handlers in HANDLER_SECONDS."""
+
+    @functools.wraps(handler)
+    def wrapper(self, request, context):
+        with HANDLER_SECONDS.time(method=handler.__name__):
+            return handler(self, request, context)
+
+    return wrapper
+
+
+def _timed_async(handler):
+    """Wie _timed, für die Koroutinen des AsyncMessageService."""
+
+    @functools.wraps(handler)
+    async def wrapper(self, request, context):
+        with HANDLER_SECONDS.time(method=handler.__name__):
+            return await handler(self, request, context)
+
+    return wrapper
+
+
+def _message_response(context, inserted, updated):
+    """
+    Antwort auf OctoMessage. Ohne Opt-in bleibt es beim bisherigen Text, damit ältere
+    Clients die Antwort unverändert auswerten können.
+    """
+    metadata = dict(context.invocation_metadata() or ())
+    if metadata.get(_REPLY_COUNTS_KEY) != "1":
+        return octo_pb2.OctoResponse(json_message=_MESSAGE_REPLY)
+    return octo_pb2.OctoResponse(
+        json_message=json.dumps(
+            {"message": _MESSAGE_REPLY, "inserted": inserted, "updated": updated}
+        )
+    )
+
+
+def _count_rows(inserted, updated):
+    ROWS_PERSISTED.inc(inserted, result="inserted")
+    ROWS_PERSISTED.inc(updated, result="updated")
+
 
 class SignatureValidationInterceptor(grpc.ServerInterceptor):
     def __init__(self):
@@ -32,6 +105,9 @@ class SignatureValidationInterceptor(grpc.ServerInterceptor):
         self._abort_handler = grpc.unary_unary_rpc_method_handler(
             self._abort_with_unauthenticated
         )
+        self._stream_abort_handler = grpc.stream_stream_rpc_method_handler(
+            self._abort_with_unauthenticated
+        )
 
     def _abort_with_unauthenticated(self, request, context):
         context.abort(grpc.StatusCode.UNAUTHENTICATED, "Invalid signature")
@@ -44,56 +120,281 @@ class SignatureValidationInterceptor(grpc.ServerInterceptor):
             logger.info("Authorization header validated successfully.")
         except Exception as e:
             logger.exception("Failed to validate signature: %s", str(e))
+        if handler_call_details.method in _STREAM_METHODS:
+            return self._stream_abort_handler
         return self._abort_handler
 
 
 class MessageService(octo_pb2_grpc.MessageServiceServicer):
-    def OctoMessage(self, request, context):
-        # sensor_instance = Sensor.sensor()
-        # sensor_instance.STANDORTID = (102,)
-        # sensor_instance.TEMPERATURE = (25.1,)
-        # sensor_instance.save()
-        # sensor_instance.save_to_json(const.DataPath)
-        sensorlist = SensorLst.sensorlst()
+    def persist(self, sensorlist) -> tuple:
+        """
+        Speichert alle Sensoren der Liste in einer Transaktion.
+
+        Returns:
+            tuple: (eingefügte Zeilen, aktualisierte Zeilen)
+        """
+        result = sensorlist.save_all(batch=True)
+        if result is None:
+            raise RuntimeError(f"Failed to persist {sensorlist.count()} rows")
+        inserted, updated = result
+        _count_rows(inserted, updated)
+        logger.info(
+            "Persisted %d rows: %d inserted, %d updated",
+            inserted + updated,
+            inserted,
+            updated,
+        )
+        return inserted, updated
+
+    def persist_json(self, json_message: str) -> int:
+        """
+        Speichert die Sensordaten eines JSON-Strings und gibt die Anzahl der Zeilen zurück.
+        """
+        sensorlist = SensorLst.sensorlst(columnar=True)
+        sensorlist.populate_from_json(json_message)
+        return sum(self.persist(sensorlist))
 
-        json_message = json.loads(request.json_message)
-        logger.info("json_message: %s", json_message)
+    @_timed
+    def OctoMessage(self, request, context):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received message from client: %s", request.json_message)
 
+        sensorlist = SensorLst.sensorlst(columnar=True)
         sensorlist.populate_from_json(request.json_message)
-        # sensorlist.process_and_save_historical_data(request.json_message)
-        logger.info("sensorlst: %s", sensorlist)
-
-        sensorlist.save_all()
-        count = sensorlist.count()
-        logger.info("count: %s", count)
-        # sensorlist.load_all()
-        # sensorlist.save_all_to_json(const.DataPath)
-        logger.info("Received message from client: %s", json_message)
-        response = octo_pb2.OctoResponse(json_message="Message received successfully")
+        try:
+            inserted, updated = self.persist(sensorlist)
+        except Exception as e:
+            logger.exception("Failed to persist message: %s", e)
+            context.abort(grpc.StatusCode.INTERNAL, "Failed to persist message")
+        response = _message_response(context, inserted, updated)
         logger.info(f"Sending response back to client: {response.json_message}")
         return response
 
+    @_timed
+    def OctoSensorBatch(self, request, context):
+        """
+        Speichert typisierte Messwerte ohne JSON-Umweg und bestätigt die Anzahl der Zeilen.
+        """
+        try:
+            sensorlist = SensorLst.sensorlst(columnar=True)
+            sensorlist.populate_from_readings(request.readings)
+            count = sum(self.persist(sensorlist))
+        except Exception as e:
+            logger.exception("Failed to persist sensor batch: %s", e)
+            context.abort(grpc.StatusCode.INTERNAL, "Failed to persist sensor batch")
+        return octo_pb2.OctoAck(
+            sequence=1, rows_persisted=count, total_rows=count, status="OK"
+        )
+
+    def OctoMessageStream(self, request_iterator, context):
+        """
+        Speichert die Nachrichten des Stroms und sendet alle const.StreamAckInterval
+        Nachrichten sowie am Ende eine Bestätigung.
+
+        Die Nachrichten werden in Gruppen committet statt einzeln, aber nur zwischen zwei
+        Nachrichten und immer zusammen mit einer Bestätigung. So sind bestätigte Zeilen
+        dauerhaft gespeichert und committete Zeilen bestätigt, ein Client wiederholt nach
+        einem Abbruch keine bereits gespeicherten Nachrichten. Erreichen die offenen
+        Anweisungen const.GroupCommitStatements oder const.GroupCommitMs, wird auch vor
+        dem nächsten regulären Intervall bestätigt.
+        """
+        started = time.perf_counter()
+        sequence = 0
+        pending_rows = 0
+        total_rows = 0
+        with db_controller.transaction() as unit:
+            for request in request_iterator:
+                sequence += 1
+                try:
+                    rows = self.persist_json(request.json_message)
+                except Exception as e:
+                    logger.exception(
+                        "Failed to persist stream message %d: %s", sequence, e
+                    )
+                    context.abort(
+                        grpc.StatusCode.INTERNAL,
+                        f"Failed to persist message {sequence} after "
+                        f"{total_rows - pending_rows} acknowledged rows",
+                    )
+                pending_rows += rows
+                total_rows += rows
+                if sequence % const.StreamAckInterval == 0 or unit.due(
+                    const.GroupCommitStatements, const.GroupCommitMs
+                ):
+                    unit.flush()
+                    yield octo_pb2.OctoAck(
+                        sequence=sequence,
+                        rows_persisted=pending_rows,
+                        total_rows=total_rows,
+                        status="OK",
+                    )
+                    pending_rows = 0
+            unit.flush()
+        logger.info(
+            f"Stream finished: {sequence} messages, {total_rows} rows, "
+            f"{unit.commits} commits"
+        )
+        HANDLER_SECONDS.observe(
+            time.perf_counter() - started, method="OctoMessageStream"
+        )
+        yield octo_pb2.OctoAck(
+            sequence=sequence,
+            rows_persisted=pending_rows,
+            total_rows=total_rows,
+            status="DONE",
+        )
+
+    @_timed
     def GetDataFormat(self, request, context):
         try:
-            json_format = {
-                "id": "",
-                "text": "",
-                "status": 0,
-                "grad": 0,
-                "class": "",
-                "loc": "",
-                "datum": "",
-                "zeit": "",
-                "sid": "",
-                "code": 0,
-            }
             logger.info("Generated JSON format successfully.")
-            return octo_pb2.OctoResponse(json_message=json.dumps(json_format))
+            return octo_pb2.OctoResponse(json_message=json.dumps(_DATA_FORMAT))
         except Exception as e:
             logger.exception("Failed to generate data format: %s", str(e))
             context.abort(grpc.StatusCode.INTERNAL, "Failed to provide data format")
 
 
+class AsyncSignatureValidationInterceptor(grpc.aio.ServerInterceptor):
+    def __init__(self):
+        super().__init__()
+        self._abort_handler = grpc.unary_unary_rpc_method_handler(
+            self._abort_with_unauthenticated
+        )
+        self._stream_abort_handler = grpc.stream_stream_rpc_method_handler(
+            self._abort_with_unauthenticated
+        )
+
+    async def _abort_with_unauthenticated(self, request, context):
+        await context.abort(grpc.StatusCode.UNAUTHENTICATED, "Invalid signature")
+
+    async def intercept_service(self, continuation, handler_call_details):
+        try:
+            metadata = dict(handler_call_details.invocation_metadata)
+            if metadata.get(_AUTH_HEADER_KEY) == _AUTH_HEADER_VALUE:
+                return await continuation(handler_call_details)
+        except Exception as e:
+            logger.exception("Failed to validate signature: %s", str(e))
+        if handler_call_details.method in _STREAM_METHODS:
+            return self._stream_abort_handler
+        return self._abort_handler
+
+
+class AsyncMessageService(octo_pb2_grpc.MessageServiceServicer):
+    """
+    Asynchrone Variante des MessageService für den grpc.aio-Server.
+
+    Die Handler erzeugen keine sensor-Objekte, sondern schreiben die Messwerte als
+    Tupel über den AsyncPostgresController, sodass kein Thread pro Anfrage blockiert.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def persist_rows(self, rows) -> tuple:
+        inserted, updated = await self.db.insert_many(
+            "sensor", Sensor.sensor.ROW_COLUMNS, rows
+        )
+        _count_rows(inserted, updated)
+        logger.info(
+            "Persisted %d rows: %d inserted, %d updated",
+            inserted + updated,
+            inserted,
+            updated,
+        )
+        return inserted, updated
+
+    @_timed_async
+    async def OctoMessage(self, request, context):
+        try:
+            rows = Sensor.sensor.rows_from_detailed_json(request.json_message)
+            inserted, updated = await self.persist_rows(rows)
+        except Exception as e:
+            logger.exception("Failed to persist message: %s", e)
+            await context.abort(grpc.StatusCode.INTERNAL, "Failed to persist message")
+        return _message_response(context, inserted, updated)
+
+    @_timed_async
+    async def OctoSensorBatch(self, request, context):
+        try:
+            rows = Sensor.sensor.rows_from_readings(request.readings)
+            count = sum(await self.persist_rows(rows))
+        except Exception as e:
+            logger.exception("Failed to persist sensor batch: %s", e)
+            await context.abort(
+                grpc.StatusCode.INTERNAL, "Failed to persist sensor batch"
+            )
+        return octo_pb2.OctoAck(
+            sequence=1, rows_persisted=count, total_rows=count, status="OK"
+        )
+
+    async def OctoMessageStream(self, request_iterator, context):
+        """
+        Wie MessageService.OctoMessageStream, allerdings committet insert_many jede
+        Nachricht einzeln. Daher wird auch jede Nachricht bestätigt, sonst würde ein
+        Client nach einem Abbruch bereits gespeicherte Nachrichten erneut senden.
+        """
+        started = time.perf_counter()
+        sequence = 0
+        total_rows = 0
+        async for request in request_iterator:
+            sequence += 1
+            try:
+                rows = Sensor.sensor.rows_from_detailed_json(request.json_message)
+                count = sum(await self.persist_rows(rows))
+            except Exception as e:
+                logger.exception("Failed to persist stream message %d: %s", sequence, e)
+                await context.abort(
+                    grpc.StatusCode.INTERNAL,
+                    f"Failed to persist message {sequence} after {total_rows} "
+                    "acknowledged rows",
+                )
+            total_rows += count
+            yield octo_pb2.OctoAck(
+                sequence=sequence,
+                rows_persisted=count,
+                total_rows=total_rows,
+                status="OK",
+            )
+        logger.info(f"Stream finished: {sequence} messages, {total_rows} rows")
+        HANDLER_SECONDS.observe(
+            time.perf_counter() - started, method="OctoMessageStream"
+        )
+        yield octo_pb2.OctoAck(
+            sequence=sequence,
+            rows_persisted=0,
+            total_rows=total_rows,
+            status="DONE",
+        )
+
+    async def GetDataFormat(self, request, context):
+        return octo_pb2.OctoResponse(json_message=json.dumps(_DATA_FORMAT))
+
+
+async def run_server_async(port):
+    """
+    Startet den grpc.aio-Server mit asynchronen Handlern und asynchronem Datenbankpool
+    und läuft bis zur Beendigung.
+    """
+    db = DatabaseControllerBase.get_instance("postgresql_async")
+    await db.open()
+    server = grpc.aio.server(
+        interceptors=(AsyncSignatureValidationInterceptor(),),
+        maximum_concurrent_rpcs=const.AsyncMaxConcurrentRpcs,
+    )
+    octo_pb2_grpc.add_MessageServiceServicer_to_server(AsyncMessageService(db), server)
+    try:
+        server_credentials = grpc.ssl_server_credentials(
+            ((_credentials.SERVER_CERTIFICATE_KEY, _credentials.SERVER_CERTIFICATE),)
+        )
+        server.add_secure_port(_LISTEN_ADDRESS_TEMPLATE % port, server_credentials)
+        await server.start()
+        logger.info(f"Async server started successfully on port {port}.")
+        await server.wait_for_termination()
+    finally:
+        await server.stop(None)
+        await db.close()
+
+
 @contextlib.contextmanager
 def run_server(port):
     server = grpc.server(
@@ -129,7 +430,24 @@ def main():
         default=const.ServerPort,
         help="The port the server will listen on.",
     )
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Run the grpc.aio server with an async database pool.",
+    )
     args = parser.parse_args()
+    metrics.start_http_server(const.MetricsPorts.get("octo_server"))
+    if args.use_async:
+        try:
+            asyncio.run(run_server_async(args.port))
+        except Exception as e:
+            logger.exception("Unexpected error in main: %s", str(e))
+        return
+    try:
+        SchemaCache.warm_up(const.SchemaWarmupTables)
+    except Exception as e:
+        logger.exception("Failed to warm up schema cache: %s", str(e))
     try:
         with run_server(args.port) as (server, _):
             logger.info("Server is listening at port %d", args.port)
@@ -0,0 +1,74 @@
+import json
+import logging
+import os
+import threading
+import grpc
+import classes.const as const
+from classes.loghandler import LogHandler
+import octopyplug.octo_pb2 as octo_pb2
+from octopyplug.octo_clientpool import OctoClientPool
+
+log_handler = LogHandler(os.path.basename(__file__)[:-3])
+logger = log_handler.get_logger()
+
+# gRPC-Statuscodes, die als eigener HTTP-Status an den Aufrufer weitergegeben werden
+RPC_HTTP_STATUS = {
+    grpc.StatusCode.DEADLINE_EXCEEDED: 504,
+    grpc.StatusCode.UNAVAILABLE: 503,
+    grpc.StatusCode.RESOURCE_EXHAUSTED: 503,
+    grpc.StatusCode.INVALID_ARGUMENT: 400,
+    grpc.StatusCode.UNAUTHENTICATED: 401,
+    grpc.StatusCode.PERMISSION_DENIED: 403,
+}
+
+_client_pool = None
+_client_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> OctoClientPool:
+    """
+    Liefert den Kanal-Pool des REST-Dienstes. Er wird beim ersten Aufruf angelegt und von
+    allen Request-Threads gemeinsam genutzt, die Kanäle bleiben über Anfragen hinweg offen.
+
+    Der Pool wiederholt fehlgeschlagene Aufrufe nicht, da jeder Versuch wieder
+    const.RestRpcTimeout Sekunden dauern darf und die REST-Anfrage sonst länger als
+    diese Frist laufen würde.
+    """
+    global _client_pool
+    with _client_pool_lock:
+        if _client_pool is None:
+            _client_pool = OctoClientPool(
+                size=const.RestClientPoolSize, timeout=const.RestRpcTimeout, retries=0
+            )
+        return _client_pool
+
+
+def forward_message(json_string: str):
+    """Sendet einen JSON-String per OctoMessage an den OctoServer.
+
+    Args:
+        json_string (str): Die Nachricht, die unverändert an den Server geht.
+
+    Returns:
+        tuple: Der JSON-Antwortkörper und der HTTP-Status. Bei Erfolg enthält
+        "received_data" die ausgewertete Antwort des Servers.
+    """
+    try:
+        response = get_client_pool().call(
+            "OctoMessage", octo_pb2.OctoRequest(json_message=json_string)
+        )
+    except grpc.RpcError as e:
+        logger.error(f"RPC failed with status: {e.code()}, details: {e.details()}")
+        return (
+            {"error": "OctoServer request failed", "code": e.code().name},
+            RPC_HTTP_STATUS.get(e.code(), 502),
+        )
+
+    try:
+        response_data = json.loads(response.json_message)
+    except json.JSONDecodeError:
+        response_data = response.json_message
+        logger.warning("Server returned non-JSON data.")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Server response: {response.json_message}")
+    return {"received_data": response_data}, 200
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import os
+from classes.loghandler import LogHandler
+import classes.metrics as metrics
+
+log_handler = LogHandler(os.path.basename(__file__)[:-3])
+logger = log_handler.get_logger()
+
+# Pflichtfelder eines Messwerts, wie sie Sensor.rows_from_detailed_json erwartet
+_READING_KEYS = ("STANDORTID", "grad", "datum", "zeit")
+# Server nicht erreichbar oder zu langsam: einzelnes Wiederholen würde nur weiter belasten
+_TRANSPORT_STATUS = (503, 504)
+
+BATCH_REQUESTS = metrics.histogram(
+    "octoplug_rest_batch_requests",
+    "REST requests merged into one upstream OctoMessage call.",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+
+
+def sensor_rows(payload):
+    """
+    Liefert die Anzahl der Messwerte, wenn payload das Format {sensor_id: [messwert, ...]}
+    der Sensordaten hat, sonst None. Nur solche Anfragen lassen sich zusammenfassen.
+    """
+    if not isinstance(payload, dict) or not payload:
+        return None
+    rows = 0
+    for readings in payload.values():
+        if not isinstance(readings, list):
+            return None
+        for reading in readings:
+            if not isinstance(reading, dict) or any(
+                key not in reading for key in _READING_KEYS
+            ):
+                return None
+        rows += len(readings)
+    return rows
+
+
+def merge_payloads(payloads):
+    """Fasst mehrere Sensordaten-Payloads wie SensorPlug.build_payload zu einem zusammen."""
+    merged = {}
+    for payload in payloads:
+        for key, readings in payload.items():
+            merged.setdefault(key, []).extend(readings)
+    return merged
+
+
+class MicroBatcher:
+    """
+    Sammelt gleichzeitig eintreffende Sensordaten-Anfragen und sendet sie gemeinsam.
+
+    Die erste Anfrage eines Blocks startet ein Zeitfenster von window_ms Millisekunden,
+    alle bis dahin eingehenden Anfragen gehen in einem einzigen OctoMessage-Aufruf an den
+    Server. Erreicht ein Block max_rows Messwerte, wird er sofort gesendet.
+
+    send ist eine blockierende Funktion, die einen JSON-String entgegennimmt und
+    (Antwortkörper, HTTP-Status) liefert, z.B. grpcbridge.forward_message. Sie läuft in
+    einem Thread, damit die Ereignisschleife frei bleibt. Jeder Aufrufer erhält die
+    Antwort des Servers für den gesamten Block samt seiner eigenen Zeilenzahl. Lehnt der
+    Server einen Block ab, werden dessen Anfragen einzeln wiederholt, damit eine
+    fehlerhafte Anfrage nicht die übrigen mitreißt.
+    """
+
+    def __init__(self, send, window_ms=5, max_rows=5000):
+        self.send = send
+        self.window = window_ms / 1000
+        self.max_rows = max_rows
+        # (Payload, Zeilenzahl, Future) der wartenden Anfragen
+        self.entries = []
+        self.rows = 0
+        self.timer = None
+        self.tasks = set()
+
+    async def submit(self, payload, rows):
+        """Reiht eine Anfrage ein und wartet auf (Antwortkörper, HTTP-Status)."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.entries.append((payload, rows, future))
+        self.rows += rows
+        if self.rows >= self.max_rows:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self.flush)
+        return await future
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        entries, self.entries, self.rows = self.entries, [], 0
+        if entries:
+            task = asyncio.get_running_loop().create_task(self.deliver(entries))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def deliver(self, entries):
+        BATCH_REQUESTS.observe(len(entries))
+        try:
+            merged = merge_payloads(payload for payload, _, _ in entries)
+            body, status = await asyncio.to_thread(self.send, json.dumps(merged))
+            if status == 200 or len(entries) == 1 or status in _TRANSPORT_STATUS:
+                total = sum(rows for _, rows, _ in entries)
+                for _, rows, future in entries:
+                    result = dict(body)
+                    if status == 200:
+                        result["rows"] = rows
+                        result["batch"] = {"requests": len(entries), "rows": total}
+                    self.resolve(future, (result, status))
+                return
+            logger.warning(
+                f"Batch of {len(entries)} requests rejected with {status}, "
+                "retrying individually"
+            )
+            results = await asyncio.gather(
+                *(
+                    asyncio.to_thread(self.send, json.dumps(payload))
+                    for payload, _, _ in entries
+                )
+            )
+            for (_, rows, future), (body, status) in zip(entries, results):
+                if status == 200:
+                    body = dict(body, rows=rows, batch={"requests": 1, "rows": rows})
+                self.resolve(future, (body, status))
+        except Exception as e:
+            logger.exception(f"Failed to deliver batch: {e}")
+            for _, _, future in entries:
+                self.resolve(future, ({"error": "Internal server error"}, 500))
+
+    @staticmethod
+    def resolve(future, result):
+        # Der Aufrufer kann die Verbindung inzwischen getrennt haben
+        if not future.done():
+            future.set_result(result)
+
+    async def close(self):
+        """Sendet den offenen Block und wartet auf alle laufenden Aufrufe."""
+        self.flush()
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
@@ -0,0 +1,166 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+import uvicorn
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+import classes.const as const
+from classes.loghandler import LogHandler
+import classes.metrics as metrics
+from rest_service.grpcbridge import forward_message, get_client_pool
+from rest_service.microbatcher import MicroBatcher, sensor_rows
+
+# ASGI-Variante von octoplugrestapi mit denselben Endpunkten. Kleine, gleichzeitige
+# POST-Anfragen mit Sensordaten werden vom MicroBatcher zu einem OctoMessage-Aufruf
+# zusammengefasst. Start z.B. mit: python -m rest_service.octoplugasgi --workers 4
+
+log_handler = LogHandler(os.path.basename(__file__)[:-3])
+LOGGER = log_handler.get_logger()
+
+HTTP_SECONDS = metrics.histogram(
+    "octoplug_http_request_seconds",
+    "REST request handling time.",
+    ("endpoint", "status"),
+)
+
+
+async def record_request(request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    endpoint = getattr(request.scope.get("endpoint"), "__name__", "unknown")
+    if endpoint != "metrics_endpoint":
+        HTTP_SECONDS.observe(
+            time.perf_counter() - started,
+            endpoint=endpoint,
+            status=response.status_code,
+        )
+    return response
+
+
+async def metrics_endpoint(request):
+    """Liefert die Kennzahlen des Prozesses im Prometheus-Textformat."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+async def get_json(request):
+    """Verarbeitet GET-Anfragen und gibt die bearbeiteten Daten zurück."""
+    try:
+        LOGGER.info(
+            f"Received GET request with keys: {list(request.query_params.keys())}"
+        )
+        data = request.query_params.get("data")
+
+        if data:
+            try:
+                json_string = json.dumps(json.loads(data))
+            except ValueError:
+                json_string = data  # Nimmt an, dass 'data' bereits ein JSON-String ist.
+                LOGGER.warning("Data is not a valid JSON string: assuming plain text.")
+
+            body, status = await asyncio.to_thread(forward_message, json_string)
+            return JSONResponse(body, status)
+
+        LOGGER.warning("No JSON data provided in GET request.")
+        return JSONResponse({"error": "No JSON data provided in the request"}, 400)
+    except Exception as e:
+        LOGGER.exception("Error processing GET request: %s", str(e))
+        return JSONResponse({"error": "Internal server error"}, 500)
+
+
+async def post_example(request):
+    """
+    Verarbeitet POST-Anfragen. Sensordaten gehen über den MicroBatcher, alle anderen
+    Nachrichten werden einzeln weitergeleitet.
+    """
+    try:
+        try:
+            data = await request.json()
+        except ValueError:
+            return JSONResponse({"error": "Request body is not valid JSON"}, 400)
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug(f"Received POST request with data: {data}")
+
+        if data:
+            rows = sensor_rows(data)
+            if rows is not None:
+                body, status = await request.app.state.batcher.submit(data, rows)
+            else:
+                body, status = await asyncio.to_thread(
+                    forward_message, json.dumps(data)
+                )
+            return JSONResponse(body, status)
+
+        LOGGER.warning("No JSON data provided in POST request.")
+        return JSONResponse({"error": "No JSON data provided in the request"}, 400)
+    except Exception as e:
+        LOGGER.exception("Error processing POST request: %s", str(e))
+        return JSONResponse({"error": "Internal server error"}, 500)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    app.state.batcher = MicroBatcher(
+        forward_message,
+        window_ms=const.RestBatchWindowMs,
+        max_rows=const.RestBatchMaxRows,
+    )
+    yield
+    await app.state.batcher.close()
+    get_client_pool().close()
+
+
+app = Starlette(
+    routes=[
+        Route("/", get_json, methods=["GET"]),
+        Route("/post_example", post_example, methods=["POST"]),
+        Route("/metrics", metrics_endpoint, methods=["GET"]),
+    ],
+    middleware=[
+        # Erlaubt Cross-Origin Requests wie CORS(app) in der Flask-Variante
+        Middleware(CORSMiddleware, allow_origins=["*"]),
+        Middleware(BaseHTTPMiddleware, dispatch=record_request),
+    ],
+    lifespan=lifespan,
+)
+
+
+def parse_arguments():
+    """Parses command-line arguments and logs the server configuration."""
+    parser = argparse.ArgumentParser(description="Starts the ASGI REST server.")
+    parser.add_argument(
+        "--host", type=str, default="0.0.0.0", help="The host of the server"
+    )
+    parser.add_argument(
+        "--port", type=int, default=const.RestPort, help="The port of the server"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=const.RestWorkers,
+        help="Number of worker processes",
+    )
+    args = parser.parse_args()
+    LOGGER.info(
+        f"Starting server at {args.host}:{args.port} with {args.workers} workers"
+    )
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    # Jeder Worker-Prozess importiert die App neu und hält eigene Kanäle und Batcher
+    uvicorn.run(
+        "rest_service.octoplugasgi:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_level="warning",
+    )
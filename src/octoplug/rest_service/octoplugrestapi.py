@@ -2,14 +2,15 @@ import argparse
 import json
 import logging
 import os
-import subprocess
+import time
 from flask_cors import CORS
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 import classes.const as const
 from classes.loghandler import (
     LogHandler,
 )  # Importiert eine benutzerdefinierte Klasse für das Logging.
-import classes.const as const
+import classes.metrics as metrics
+from rest_service.grpcbridge import forward_message
 
 app = Flask(__name__)
 CORS(app)  # Erlaubt Cross-Origin Requests für die gesamte Flask-App.
@@ -18,35 +19,34 @@ CORS(app)  # Erlaubt Cross-Origin Requests für die gesamte Flask-App.
 log_handler = LogHandler(app.name)
 LOGGER = log_handler.get_logger()
 
+HTTP_SECONDS = metrics.histogram(
+    "octoplug_http_request_seconds",
+    "REST request handling time.",
+    ("endpoint", "status"),
+)
 
-def run_subprocess(json_string: str):
-    """Führt einen externen Python-Prozess aus, basierend auf der Konfiguration.
 
-    Args:
-        json_string (str): JSON string, der als Argument an den Subprozess übergeben wird.
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
 
-    Returns:
-        str: Die Ausgabe des Subprozesses.
-    """
-    try:
-        result = subprocess.run(
-            [
-                const.python_executable,
-                const.octo_client_path,
-                str(const.ServerPort),
-                json_string,
-                "SendMessage",
-            ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
+
+@app.after_request
+def record_request(response):
+    started = g.pop("request_started", None)
+    if started is not None and request.endpoint != "metrics_endpoint":
+        HTTP_SECONDS.observe(
+            time.perf_counter() - started,
+            endpoint=request.endpoint or "unknown",
+            status=response.status_code,
         )
-        LOGGER.info(f"Subprocess executed with JSON: {json_string}")
-        LOGGER.info(f"Subprocess output: {result.stdout}")
-        return result.stdout
-    except Exception as e:
-        LOGGER.exception(f"Failed to run subprocess: {e}")
-        return ""
+    return response
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Liefert die Kennzahlen des Prozesses im Prometheus-Textformat."""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
 
 
 @app.route("/", methods=["GET"])
@@ -66,14 +66,8 @@ def get_json():
                 json_string = data  # Nimmt an, dass 'data' bereits ein JSON-String ist.
                 LOGGER.warning("Data is not a valid JSON string: assuming plain text.")
 
-            result = run_subprocess(json_string)
-
-            try:
-                response_data = json.loads(result)
-            except json.JSONDecodeError:
-                response_data = result.strip()
-                LOGGER.warning("Subprocess returned non-JSON data.")
-            return jsonify({"received_data": response_data}), 200
+            body, status = forward_message(json_string)
+            return jsonify(body), status
 
         LOGGER.warning("No JSON data provided in GET request.")
         return jsonify({"error": "No JSON data provided in the request"}), 400
@@ -87,18 +81,13 @@ def post_example():
     """Verarbeitet POST-Anfragen und gibt die bearbeiteten Daten zurück."""
     try:
         data = request.json
-        LOGGER.info(f"Received POST request with data: {data}")
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug(f"Received POST request with data: {data}")
 
         if data:
             try:
-                json_string = json.dumps(data)
-                result = run_subprocess(json_string)
-                try:
-                    response_data = json.loads(result)
-                except json.JSONDecodeError:
-                    response_data = result.strip()
-                    LOGGER.warning("Subprocess returned non-JSON data.")
-                return jsonify({"received_data": response_data}), 200
+                body, status = forward_message(json.dumps(data))
+                return jsonify(body), status
             except Exception as e:
                 LOGGER.exception("Error processing data in POST request: %s", str(e))
                 return (
@@ -132,7 +121,8 @@ def parse_arguments():
 if __name__ == "__main__":
     args = parse_arguments()
     try:
-        app.run(host=args.host, port=args.port)
+        # Mehrere Request-Threads teilen sich die Kanäle aus grpcbridge.get_client_pool
+        app.run(host=args.host, port=args.port, threaded=True)
         LOGGER.info(f"REST API running on {args.host}:{args.port}")
     except Exception as e:
         LOGGER.exception(
@@ -0,0 +1,109 @@
+"""
+Tests für DatabaseController.stream_data und AutoPersistentLst.iter_all.
+
+Benötigt eine PostgreSQL-Testdatenbank, deren Verbindungsdaten als JSON in
+OCTOPLUG_TEST_DB stehen, z.B. {"host": "localhost", "user": "postgres",
+"password": "", "database": "octoplug_test"}. Die Tabelle "SENSOR" wird dort neu
+angelegt und am Ende gelöscht.
+"""
+
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+DB_CONFIG = os.environ.get("OCTOPLUG_TEST_DB")
+pytestmark = pytest.mark.skipif(not DB_CONFIG, reason="OCTOPLUG_TEST_DB not set")
+
+ROWS = 20
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        import classes.const as const
+
+        log_dir = str(tmp_path_factory.mktemp("log"))
+        monkeypatch.setattr(const, "LogPath", log_dir)
+        from classes.base.externalfilehaendler import ExternalFileHandler
+
+        monkeypatch.setattr(
+            ExternalFileHandler, "get_log_dir_path", lambda self: log_dir
+        )
+        config = {"postgresql": dict(json.loads(DB_CONFIG), pool={"maxconn": 4})}
+        monkeypatch.setattr(
+            ExternalFileHandler,
+            "load_database_config",
+            lambda self, db_config_filename=None: config,
+        )
+        from classes.base.databasecontroller import DatabaseController
+
+        db = DatabaseController.get_instance()
+        yield db
+        with db.get_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute('DROP TABLE IF EXISTS "SENSOR"')
+            connection.commit()
+        db.close()
+
+
+@pytest.fixture
+def sensors(db):
+    with db.get_connection() as connection:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DROP TABLE IF EXISTS "SENSOR"; '
+                'CREATE TABLE "SENSOR" ("ID" serial PRIMARY KEY, "STANDORTID" int, '
+                '"TEMPERATURE" float, "NA_DAT" timestamp, "AE_DAT" timestamp)'
+            )
+        connection.commit()
+    db.insert_many(
+        "sensor",
+        ["STANDORTID", "TEMPERATURE", "NA_DAT"],
+        [[i % 3, float(i), START + timedelta(minutes=i)] for i in range(ROWS)],
+    )
+    import classes.persistent.sensorlst as SensorLst
+
+    return SensorLst
+
+
+def count(db, where):
+    return db.execute_query(f'SELECT count(*) AS n FROM "SENSOR" WHERE {where}')[0]["n"]
+
+
+def test_save_while_iterating(db, sensors):
+    saved = 0
+    for sensor in sensors.sensorlst().iter_all(itersize=3):
+        sensor.TEMPERATURE = -1.0
+        sensor.save()
+        saved += 1
+    assert saved == ROWS
+    assert count(db, '"TEMPERATURE" = -1') == ROWS
+    assert db.pool_stats()["in_use"] == 0
+
+
+def test_interleaved_iterators(db, sensors):
+    first = sensors.sensorlst().iter_all(limit=3, itersize=2)
+    second = sensors.sensorlst(columnar=True).iter_all(order_by="ID", itersize=2)
+    pairs = list(zip(first, second))
+    assert len(pairs) == 3
+    # Der zweite Iterator liest weiter, nachdem der erste seine Verbindung zurückgegeben hat
+    assert len(list(second)) == ROWS - 3
+
+
+def test_iterate_inside_transaction(db, sensors):
+    with db.transaction(max_statements=2):
+        db.insert_data("sensor", ["STANDORTID", "NA_DAT"], [9, START])
+        seen = 0
+        for record in sensors.sensorlst(columnar=True).iter_all(itersize=4):
+            db.execute_query(
+                'UPDATE "SENSOR" SET "TEMPERATURE" = 5 WHERE "ID" = %s', (record.ID,)
+            )
+            seen += 1
+    # Die noch nicht committete Zeile ist sichtbar, Group Commits beenden den Cursor nicht
+    assert seen == ROWS + 1
+    assert count(db, '"TEMPERATURE" = 5') == ROWS + 1